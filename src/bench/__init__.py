@@ -0,0 +1,6 @@
+"""
+Benchmarks for the Markdown to HTML pipeline.
+
+Run them from the src directory so the generator modules are importable,
+e.g. `cd src && python3 -m bench.links`.
+"""
@@ -0,0 +1,67 @@
+"""
+Benchmark the Markdown to HTML pipeline on a synthetic corpus.
+
+Usage: cd src && python3 -m bench [--pages N] [--shape SHAPE] [--blocks N]
+                                 [--output results.json] [--compare old.json]
+"""
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+from bench.corpus import SHAPES, generate_corpus
+from bench.pipeline import run_pipeline
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_report(result, baseline=None):
+    print(f"{'stage':<22}{'seconds':>10}{'us/page':>12}" + (f"{'vs base':>10}" if baseline else ""))
+    for stage, timing in result["stages"].items():
+        line = f"{stage:<22}{timing['seconds']:>10.4f}{timing['us_per_page']:>12.1f}"
+        if baseline and stage in baseline["stages"]:
+            line += f"{timing['seconds'] / baseline['stages'][stage]['seconds']:>9.2f}x"
+        print(line)
+    print(", ".join(f"{name}={value}" for name, value in result["counters"].items()))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m bench", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200, help="Number of pages. Defaults to 200.")
+    parser.add_argument("--shape", choices=sorted(SHAPES), default="mixed",
+                        help="Kind of content to generate. Defaults to mixed.")
+    parser.add_argument("--blocks", type=int, default=40, help="Blocks per page. Defaults to 40.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage, best is kept. Defaults to 3.")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus random seed. Defaults to 0.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    parser.add_argument("--compare", help="Earlier JSON results to compare against.")
+    args = parser.parse_args(argv)
+
+    pages = generate_corpus(args.pages, args.shape, args.blocks, args.seed)
+    result = run_pipeline(pages, args.repeat)
+    result["meta"] = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "corpus": {"pages": args.pages, "shape": args.shape, "blocks": args.blocks, "seed": args.seed},
+        "repeat": args.repeat,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("corpus") != result["meta"]["corpus"]:
+            print("warning: baseline was measured on a different corpus", file=sys.stderr)
+    print_report(result, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+if __name__ == "__main__":
+    main()
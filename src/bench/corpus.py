@@ -0,0 +1,100 @@
+"""
+Synthetic Markdown corpora for the benchmarks.
+
+Every generator is deterministic for a given seed, so results from
+different commits are measured on the same input.
+"""
+import random
+
+WORDS = ("the quick brown fox jumps over lazy dog elves of rivendell ring "
+         "mountain river forest song star light shadow road home").split()
+
+def words(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+def inline_text(rng, count):
+    # Plain words with occasional bold, italic, code and links
+    parts = []
+    for i in range(count):
+        word = rng.choice(WORDS)
+        roll = rng.random()
+        if roll < 0.04:
+            word = f"**{word}**"
+        elif roll < 0.08:
+            word = f"_{word}_"
+        elif roll < 0.10:
+            word = f"`{word}`"
+        elif roll < 0.12:
+            word = f"[{word}](/blog/{word}/{i})"
+        parts.append(word)
+    return " ".join(parts)
+
+def paragraph(rng, size):
+    lines = [inline_text(rng, 12) for _ in range(size)]
+    return "\n".join(lines)
+
+def unordered_list(rng, size):
+    return "\n".join(f"- {inline_text(rng, 8)}" for _ in range(size))
+
+def ordered_list(rng, size):
+    return "\n".join(f"{i}. {inline_text(rng, 8)}" for i in range(1, size + 1))
+
+def link_paragraph(rng, size):
+    return " ".join(f"[{rng.choice(WORDS)} {i}](https://example.com/{i})" for i in range(size))
+
+def code_block(rng, size):
+    lines = [f"    {words(rng, 6)} = {i}" for i in range(size)]
+    return "```\ndef generated():\n" + "\n".join(lines) + "\n```"
+
+def quote(rng, size):
+    return "\n".join(f"> {inline_text(rng, 10)}" for _ in range(size))
+
+# Block generators and their relative weight for each corpus shape
+SHAPES = {
+    "paragraphs": ((paragraph, 8, 20),),
+    "lists": ((unordered_list, 4, 40), (ordered_list, 4, 40)),
+    "links": ((link_paragraph, 1, 100),),
+    "code": ((code_block, 1, 200), (paragraph, 1, 3)),
+    "mixed": ((paragraph, 5, 6), (unordered_list, 2, 8), (ordered_list, 1, 6),
+              (code_block, 1, 12), (quote, 1, 3), (link_paragraph, 1, 10)),
+}
+
+def generate_page(rng, shape, blocks):
+    """
+    Build one Markdown page of the given shape.
+
+    Args:
+        rng (random.Random): Seeded random source.
+        shape (str): One of SHAPES.
+        blocks (int): Number of blocks after the title.
+
+    Returns:
+        str: The page's Markdown.
+    """
+    generators = SHAPES[shape]
+    weights = [weight for _, weight, _ in generators]
+    parts = [f"# {words(rng, 4).title()}"]
+    for _ in range(blocks):
+        generator, _, size = rng.choices(generators, weights)[0]
+        if rng.random() < 0.1:
+            parts.append(f"## {words(rng, 3)}")
+        parts.append(generator(rng, size))
+    return "\n\n".join(parts)
+
+def generate_corpus(pages, shape="mixed", blocks=40, seed=0):
+    """
+    Build a list of synthetic Markdown pages.
+
+    Args:
+        pages (int): Number of pages.
+        shape (str): One of SHAPES. Defaults to 'mixed'.
+        blocks (int): Blocks per page. Defaults to 40.
+        seed (int): Random seed. Defaults to 0.
+
+    Returns:
+        list: Markdown text of each page.
+    """
+    if shape not in SHAPES:
+        raise ValueError(f"Unknown corpus shape {shape!r}, expected one of {', '.join(SHAPES)}")
+    rng = random.Random(seed)
+    return [generate_page(rng, shape, blocks) for _ in range(pages)]
@@ -0,0 +1,46 @@
+"""
+Scaling benchmark for split_nodes_link and split_nodes_image.
+
+Times both splitters on single paragraphs holding an increasing number of
+links (or images) and prints the time per link, which stays flat when the
+splitters are linear in the paragraph length.
+
+Usage: cd src && python3 -m bench.links [max_links]
+"""
+import sys
+import time
+from inline_markdown import split_nodes_image, split_nodes_link
+from textnode import TextNode, TextType
+
+def make_paragraph(count, image=False):
+    prefix = "!" if image else ""
+    return " ".join(f"word {prefix}[link {i}](https://example.com/{i})" for i in range(count))
+
+def time_split(split, text, repeat=3):
+    best = None
+    for _ in range(repeat):
+        node = TextNode(text, TextType.TEXT)
+        start = time.perf_counter()
+        split([node])
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    max_links = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    sizes = []
+    count = 1250
+    while count < max_links:
+        sizes.append(count)
+        count *= 2
+    sizes.append(max_links)
+
+    print(f"{'splitter':<18}{'links':>8}{'total ms':>12}{'us/link':>10}")
+    for name, split, image in (("split_nodes_link", split_nodes_link, False),
+                               ("split_nodes_image", split_nodes_image, True)):
+        for size in sizes:
+            elapsed = time_split(split, make_paragraph(size, image))
+            print(f"{name:<18}{size:>8}{elapsed * 1000:>12.2f}{elapsed / size * 1e6:>10.2f}")
+
+if __name__ == "__main__":
+    main()
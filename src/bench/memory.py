@@ -0,0 +1,74 @@
+"""
+Memory benchmark for the inline node classes.
+
+Parses the Markdown under content/ (repeated to scale it up) into the
+TextNode and LeafNode objects a build allocates for every inline span, and
+reports the bytes per node measured with tracemalloc. The same nodes are
+also built as plain __dict__-based objects, the representation the node
+classes used before __slots__, for comparison.
+
+Usage: cd src && python3 -m bench.memory [content_dir] [scale]
+"""
+import os
+import sys
+import tracemalloc
+from markdown_blocks import markdown_to_blocks, block_to_block_type, BlockType
+from inline_markdown import text_to_textnodes
+from textnode import TextNode, text_node_to_html_node
+from htmlnode import LeafNode
+
+class DictTextNode:
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+class DictLeafNode:
+    def __init__(self, tag, value, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = None
+        self.props = props
+
+def load_spans(content_dir, scale):
+    # (TextNode args, LeafNode args) for every inline span in the corpus
+    spans = []
+    for root, dirs, files in os.walk(content_dir):
+        for file in files:
+            if file.endswith(".md"):
+                with open(os.path.join(root, file), encoding="utf-8") as f:
+                    for block in markdown_to_blocks(f.read()):
+                        if block_to_block_type(block) == BlockType.CODE:
+                            continue
+                        for node in text_to_textnodes(block):
+                            leaf = text_node_to_html_node(node)
+                            spans.append(((node.text, node.text_type, node.url), (leaf.tag, leaf.value, leaf.props)))
+    return spans * scale
+
+def bytes_per_node(cls, args_list):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    nodes = [cls(*args) for args in args_list]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Leave out the list that keeps the nodes alive
+    return (after - before - sys.getsizeof(nodes)) / len(nodes)
+
+def main():
+    content_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join("..", "content")
+    scale = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    spans = load_spans(content_dir, scale)
+    if not spans:
+        print(f"No Markdown found in {content_dir}")
+        return
+    text_args = [text_args for text_args, _ in spans]
+    leaf_args = [leaf_args for _, leaf_args in spans]
+
+    print(f"{len(spans)} inline spans ({scale}x {content_dir})")
+    print(f"{'node':<10}{'__dict__ B/node':>17}{'__slots__ B/node':>18}")
+    for name, dict_cls, slots_cls, args_list in (("TextNode", DictTextNode, TextNode, text_args),
+                                                  ("LeafNode", DictLeafNode, LeafNode, leaf_args)):
+        print(f"{name:<10}{bytes_per_node(dict_cls, args_list):>17.1f}{bytes_per_node(slots_cls, args_list):>18.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Per-stage timings of the Markdown to HTML pipeline.
+
+Each stage runs over the whole corpus on the previous stage's output, so a
+regression can be pinned to markdown_to_blocks, block typing, inline
+parsing, HTML node building, serialization, template fill or file writes.
+"""
+import os
+import time
+import shutil
+import tempfile
+from htmlnode import ParentNode
+from inline_markdown import text_to_textnodes
+from markdown_blocks import BlockType, markdown_to_blocks, block_to_block_type, block_to_html_node
+from markdown_utils import extract_title
+from template import Template
+
+STAGES = (
+    "markdown_to_blocks",
+    "block_to_block_type",
+    "text_to_textnodes",
+    "block_to_html_node",
+    "to_html",
+    "template_fill",
+    "file_write",
+)
+
+DEFAULT_TEMPLATE = ('<!doctype html><html><head><title>{{ Title }}</title>'
+                    '<link href="/index.css" rel="stylesheet" /></head>'
+                    '<body><article>{{ Content }}</article></body></html>')
+
+def inline_texts(block, block_type):
+    # The inline Markdown each block converter hands to text_to_textnodes
+    lines = block.split("\n")
+    if block_type == BlockType.PARAGRAPH:
+        return [" ".join(lines)]
+    if block_type == BlockType.HEADING:
+        return [block.lstrip("#")[1:]]
+    if block_type == BlockType.QUOTE:
+        return [" ".join(line.lstrip(">").strip() for line in lines)]
+    if block_type == BlockType.ULIST:
+        return [line[2:] for line in lines]
+    if block_type == BlockType.OLIST:
+        return [line[line.index(" ") + 1:] for line in lines]
+    return []
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+def run_once(pages, template, out_dir):
+    """
+    Run every stage once over the corpus.
+
+    Returns:
+        dict: Seconds spent in each stage, plus counters describing the corpus.
+    """
+    seconds = {}
+    seconds["markdown_to_blocks"], page_blocks = timed(
+        lambda: [markdown_to_blocks(page) for page in pages])
+    seconds["block_to_block_type"], page_types = timed(
+        lambda: [[block_to_block_type(block) for block in blocks] for blocks in page_blocks])
+
+    texts = [text
+             for blocks, types in zip(page_blocks, page_types)
+             for block, block_type in zip(blocks, types)
+             for text in inline_texts(block, block_type)]
+    seconds["text_to_textnodes"], text_nodes = timed(
+        lambda: [text_to_textnodes(text) for text in texts])
+
+    seconds["block_to_html_node"], page_nodes = timed(
+        lambda: [ParentNode("div", [block_to_html_node(block) for block in blocks]) for blocks in page_blocks])
+    seconds["to_html"], page_html = timed(
+        lambda: [node.to_html() for node in page_nodes])
+
+    titles = [extract_title(page) for page in pages]
+    seconds["template_fill"], documents = timed(
+        lambda: [template.render(title, html) for title, html in zip(titles, page_html)])
+
+    def write_all():
+        for i, document in enumerate(documents):
+            with open(os.path.join(out_dir, f"{i}.html"), "w", encoding="utf-8") as f:
+                f.write(document)
+    seconds["file_write"], _ = timed(write_all)
+
+    counters = {
+        "pages": len(pages),
+        "blocks": sum(len(blocks) for blocks in page_blocks),
+        "inline_nodes": sum(len(nodes) for nodes in text_nodes),
+        "markdown_bytes": sum(len(page.encode("utf-8")) for page in pages),
+        "html_bytes": sum(len(document.encode("utf-8")) for document in documents),
+    }
+    return seconds, counters
+
+def run_pipeline(pages, repeat=3, template_text=DEFAULT_TEMPLATE, basepath="/"):
+    """
+    Time each pipeline stage, keeping the best of several runs.
+
+    Args:
+        pages (list): Markdown text of each page.
+        repeat (int): Number of runs. Defaults to 3.
+        template_text (str): Template to fill. Defaults to a minimal page.
+        basepath (str): Basepath the template is compiled for.
+
+    Returns:
+        dict: {"stages": {stage: {"seconds", "us_per_page"}}, "counters": {...}}
+    """
+    template = Template(template_text, basepath)
+    out_dir = tempfile.mkdtemp(prefix="ssg-bench-")
+    best = {}
+    counters = {}
+    try:
+        for _ in range(repeat):
+            seconds, counters = run_once(pages, template, out_dir)
+            for stage, value in seconds.items():
+                best[stage] = min(best.get(stage, value), value)
+    finally:
+        shutil.rmtree(out_dir)
+
+    stages = {
+        stage: {"seconds": best[stage], "us_per_page": best[stage] / len(pages) * 1e6}
+        for stage in STAGES
+    }
+    stages["total"] = {
+        "seconds": sum(best.values()),
+        "us_per_page": sum(best.values()) / len(pages) * 1e6,
+    }
+    return {"stages": stages, "counters": counters}
@@ -0,0 +1,145 @@
+import os
+import hashlib
+import logging
+from collections import OrderedDict
+from manifest import GENERATOR_VERSION
+from render_cache import prune_directory
+
+class BlockCache:
+    """
+    Memoizes rendered HTML fragments of Markdown blocks, keyed by block text hash.
+
+    Fragments live in an in-process LRU bounded to max_entries. With a
+    store_dir they are also written to disk, so later builds (and other
+    worker processes) can reuse them. prune() caps the disk store at
+    max_bytes by deleting the least recently used fragments; disk hits
+    refresh a fragment's mtime. Keys include the generator version and
+    an optional salt for options that change how blocks render. Options that
+    only change some blocks, such as the attributes of the images a block
+    links to, are passed as a per-block extra key instead.
+    """
+
+    def __init__(self, max_entries=4096, store_dir=None, salt="", max_bytes=64 * 1024 * 1024):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.store_dir = store_dir
+        self.salt = salt
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, block, extra=""):
+        """Return the cache key of a block's Markdown text and extra key."""
+        return hashlib.sha256(f"{GENERATOR_VERSION}\0{self.salt}\0{extra}\0{block}".encode("utf-8")).hexdigest()
+
+    def get(self, block, extra=""):
+        """
+        Look up the rendered HTML of a block.
+
+        Args:
+            block (str): The block's Markdown text.
+            extra (str): Digest of other inputs the block renders from.
+
+        Returns:
+            str: The cached HTML fragment, or None on a miss.
+        """
+        key = self.key(block, extra)
+        html = self.entries.get(key)
+        if html is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return html
+        if self.store_dir is not None:
+            html = self._read_disk(key)
+            if html is not None:
+                self.disk_hits += 1
+                self._remember(key, html)
+                return html
+        self.misses += 1
+        return None
+
+    def put(self, block, html, extra=""):
+        """
+        Store the rendered HTML of a block.
+
+        Args:
+            block (str): The block's Markdown text.
+            html (str): The block's HTML fragment.
+            extra (str): Digest of other inputs the block renders from.
+        """
+        key = self.key(block, extra)
+        self._remember(key, html)
+        if self.store_dir is not None:
+            self._write_disk(key, html)
+
+    def stats(self):
+        """
+        Return hit/miss counters.
+
+        Returns:
+            dict: hits, disk_hits, misses, evictions, entries and hit_rate.
+        """
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+    def prune(self):
+        """Evict least recently used fragments until the disk store fits in max_bytes."""
+        if self.store_dir is None:
+            return
+        evicted = prune_directory(self.store_dir, self.max_bytes, ".html")
+        if evicted:
+            logging.info(f"Evicted {evicted} block(s) from cache {self.store_dir}")
+
+    def merge_stats(self, stats):
+        """Add counters reported by a cache in another process."""
+        self.hits += stats["hits"]
+        self.disk_hits += stats["disk_hits"]
+        self.misses += stats["misses"]
+        self.evictions += stats["evictions"]
+
+    def _remember(self, key, html):
+        self.entries[key] = html
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def _path(self, key):
+        return os.path.join(self.store_dir, key[:2], f"{key}.html")
+
+    def _read_disk(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                html = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return html
+
+    def _write_disk(self, key, html):
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Unique temporary name, then an atomic rename, so concurrent
+            # workers never read a half-written fragment
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(html)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f"Could not store block in cache {self.store_dir}: {str(e)}")
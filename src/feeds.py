@@ -0,0 +1,229 @@
+import os
+import re
+import html
+import json
+import heapq
+import hashlib
+import logging
+from xml.sax.saxutils import escape
+from htmlnode import RawNode
+from manifest import GENERATOR_VERSION
+from render_cache import prune_directory
+from site_index import page_url
+
+# The sitemap protocol allows at most 50,000 URLs per file
+SITEMAP_SHARD_URLS = 50000
+FEED_ENTRIES = 20
+
+TAG_PATTERN = re.compile(r"<[^>]*>")
+SITEMAP_SHARD_PATTERN = re.compile(r"^sitemap-\d+\.xml$")
+
+SITEMAP_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+SITEMAP_FOOTER = '</urlset>\n'
+
+def node_text(node):
+    """
+    Return the plain text of a block's HTML node.
+
+    The text is the content of the node's text nodes, without markup, image
+    alt texts or URLs. Inline nodes join up directly, list items with a
+    space. Already rendered fragments, such as cached blocks, are stripped
+    of their tags to the same text.
+
+    Args:
+        node (HTMLNode): The node of one block.
+
+    Returns:
+        str: The block's text.
+    """
+    texts = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.tag == "li":
+            texts.append(" ")
+        if node.children:
+            stack.extend(reversed(node.children))
+        elif isinstance(node, RawNode):
+            texts.append(html.unescape(TAG_PATTERN.sub("", node.value.replace("<li>", " <li>"))))
+        elif node.tag not in ("img", "image") and node.value:
+            texts.append(node.value)
+    return "".join(texts)
+
+class RecordCache:
+    """
+    Page records from earlier builds, keyed by the page's source hash.
+
+    A record is the title and search term counts generate_page collects
+    while rendering a page. Keeping them lets pages skipped by incremental
+    builds or copied from the render cache still be added to the sitemap,
+    feed and search index without being rendered. Like the render cache,
+    the store is capped at max_bytes by prune(), which deletes the least
+    recently used records.
+    """
+
+    def __init__(self, cache_dir, max_bytes=64 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def _path(self, source_hash):
+        key = hashlib.sha256(f"{GENERATOR_VERSION}\0{source_hash}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, source_hash):
+        """Return the record of a page's source, or None if it was never stored."""
+        path = self._path(source_hash)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return record
+
+    def put(self, source_hash, record):
+        """Store the record of a page's source."""
+        path = self._path(source_hash)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(record, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f"Could not store page record in {self.cache_dir}: {str(e)}")
+
+    def prune(self):
+        """Evict least recently used records until the store fits in max_bytes."""
+        evicted = prune_directory(self.cache_dir, self.max_bytes, ".json")
+        if evicted:
+            logging.info(f"Evicted {evicted} page record(s) from {self.cache_dir}")
+
+def _attr(text):
+    return escape(text, {'"': "&quot;"})
+
+def atom_date(date):
+    """Turn a front matter date such as 2024-05-01 into an RFC 3339 timestamp."""
+    date = str(date)
+    if "T" in date:
+        return date
+    return f"{date}T00:00:00Z"
+
+class SiteOutputs:
+    """
+    Writes sitemap.xml and an Atom feed while pages are crawled.
+
+    Sitemap URLs are streamed to disk as pages are added, so memory stays
+    flat however large the site is. The sitemap rolls over to a new file
+    every sitemap_shard_urls URLs. Only the feed_entries newest dated pages
+    are kept in memory for the feed, which is titled after the home page
+    unless a site_title is given. The search index is written from the same
+    records by SearchIndexBuilder.
+
+    Pages are added with the record generate_page collected while
+    rendering them, so no page is read or parsed a second time.
+    """
+
+    def __init__(self, dest_dir_path, site_url, basepath="/", site_title="", feed_entries=FEED_ENTRIES,
+                 sitemap_shard_urls=SITEMAP_SHARD_URLS):
+        self.dest_dir_path = dest_dir_path
+        self.site_url = site_url.rstrip("/") + basepath.rstrip("/")
+        self.site_title = site_title
+        self.feed_entries = feed_entries
+        self.sitemap_shard_urls = sitemap_shard_urls
+        self.feed = []
+        self.pages = 0
+        self.sitemap_files = []
+        self.sitemap_file = None
+        self.sitemap_urls = 0
+        os.makedirs(dest_dir_path, exist_ok=True)
+
+    def add_page(self, relative_path, metadata, record):
+        """
+        Add a page to the sitemap and feed.
+
+        Args:
+            relative_path (str): Markdown path relative to the content directory.
+            metadata (dict): The page's front matter.
+            record (dict): The page's record, as generate_page returns it.
+        """
+        url = page_url(relative_path)
+        if url == "/" and not self.site_title and record["title"]:
+            self.site_title = record["title"]
+        date = str(metadata["date"]) if "date" in metadata else None
+        self.pages += 1
+        self._add_sitemap_url(url, date)
+        if date is not None:
+            entry = (date, url, record["title"], str(metadata.get("summary", "")))
+            if len(self.feed) < self.feed_entries:
+                heapq.heappush(self.feed, entry)
+            elif self.feed_entries:
+                heapq.heappushpop(self.feed, entry)
+
+    def close(self):
+        """Finish the sitemap, delete shards left over from larger builds and write the feed."""
+        self._close_sitemap_shard()
+        # Shards of an earlier, larger build would keep advertising removed URLs
+        for name in os.listdir(self.dest_dir_path):
+            if SITEMAP_SHARD_PATTERN.match(name) and name not in self.sitemap_files:
+                logging.info(f"Removing stale sitemap shard {name}")
+                os.remove(os.path.join(self.dest_dir_path, name))
+        if len(self.sitemap_files) == 1:
+            os.replace(os.path.join(self.dest_dir_path, self.sitemap_files[0]),
+                       os.path.join(self.dest_dir_path, "sitemap.xml"))
+        else:
+            with open(os.path.join(self.dest_dir_path, "sitemap.xml"), 'w', encoding='utf-8') as f:
+                f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+                for name in self.sitemap_files:
+                    f.write(f"<sitemap><loc>{escape(self.site_url)}/{name}</loc></sitemap>\n")
+                f.write('</sitemapindex>\n')
+
+        self._write_feed()
+        logging.info(f"Wrote sitemap and feed for {self.pages} page(s)")
+
+    def _add_sitemap_url(self, url, date):
+        if self.sitemap_file is None:
+            name = f"sitemap-{len(self.sitemap_files) + 1}.xml"
+            self.sitemap_files.append(name)
+            self.sitemap_file = open(os.path.join(self.dest_dir_path, name), 'w', encoding='utf-8')
+            self.sitemap_file.write(SITEMAP_HEADER)
+        entry = f"<url><loc>{escape(self.site_url + url)}</loc>"
+        if date is not None:
+            entry += f"<lastmod>{escape(date)}</lastmod>"
+        self.sitemap_file.write(entry + "</url>\n")
+        self.sitemap_urls += 1
+        if self.sitemap_urls == self.sitemap_shard_urls:
+            self._close_sitemap_shard()
+
+    def _close_sitemap_shard(self):
+        if self.sitemap_file is None:
+            if self.sitemap_files:
+                return
+            # An empty site still gets a valid, empty sitemap
+            self.sitemap_files.append("sitemap-1.xml")
+            self.sitemap_file = open(os.path.join(self.dest_dir_path, "sitemap-1.xml"), 'w', encoding='utf-8')
+            self.sitemap_file.write(SITEMAP_HEADER)
+        self.sitemap_file.write(SITEMAP_FOOTER)
+        self.sitemap_file.close()
+        self.sitemap_file = None
+        self.sitemap_urls = 0
+
+    def _write_feed(self):
+        entries = sorted(self.feed, reverse=True)
+        updated = atom_date(entries[0][0]) if entries else "1970-01-01T00:00:00Z"
+        with open(os.path.join(self.dest_dir_path, "feed.xml"), 'w', encoding='utf-8') as f:
+            f.write('<?xml version="1.0" encoding="utf-8"?>\n<feed xmlns="http://www.w3.org/2005/Atom">\n')
+            f.write(f"<title>{escape(self.site_title)}</title>\n")
+            f.write(f'<link href="{_attr(self.site_url)}/" />\n')
+            f.write(f'<link rel="self" href="{_attr(self.site_url)}/feed.xml" />\n')
+            f.write(f"<author><name>{escape(self.site_title)}</name></author>\n")
+            f.write(f"<id>{escape(self.site_url)}/</id>\n<updated>{updated}</updated>\n")
+            for date, url, title, summary in entries:
+                link = self.site_url + url
+                f.write(f'<entry><title>{escape(title or url)}</title><link href="{_attr(link)}" /><id>{escape(link)}</id>'
+                        f"<updated>{atom_date(date)}</updated>")
+                if summary:
+                    f.write(f"<summary>{escape(summary)}</summary>")
+                f.write("</entry>\n")
+            f.write("</feed>\n")
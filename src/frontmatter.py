@@ -0,0 +1,170 @@
+import io
+import re
+from itertools import chain
+
+YAML_DELIMITER = "---"
+TOML_DELIMITER = "+++"
+
+INTEGER_PATTERN = re.compile(r"^[-+]?\d+$")
+DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+class FrontMatterError(ValueError):
+    pass
+
+def parse_value(text, toml=False):
+    """
+    Parse a scalar or inline list from front matter.
+
+    Supports quoted and bare strings, integers, booleans and [a, b] lists.
+    Anything else, including dates, is kept as a string.
+
+    Args:
+        text (str): The raw value.
+        toml (bool): Whether TOML rules apply (bare words are not strings).
+
+    Returns:
+        The parsed value.
+    """
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        return text[1:-1]
+    if text.startswith("[") and text.endswith("]"):
+        inner = text[1:-1].strip()
+        if not inner:
+            return []
+        return [parse_value(item, toml) for item in inner.split(",") if item.strip()]
+    lowered = text.lower()
+    if lowered in ("true", "false") or (not toml and lowered in ("yes", "no")):
+        return lowered in ("true", "yes")
+    if INTEGER_PATTERN.match(text):
+        return int(text)
+    if toml and not DATE_PATTERN.match(text):
+        raise FrontMatterError(f"unsupported TOML value: {text}")
+    return text
+
+def parse_front_matter(lines, toml=False):
+    """
+    Parse front matter lines (without the delimiters) into a dict.
+
+    YAML-style lines are `key: value`, with `- item` lines under an empty
+    `key:` forming a list; an empty `key:` without items is "". TOML-style
+    lines are `key = value`.
+
+    Args:
+        lines (list): The lines between the delimiters.
+        toml (bool): Whether the block was delimited by +++.
+
+    Returns:
+        dict: The metadata.
+
+    Raises:
+        FrontMatterError: If a line cannot be parsed.
+    """
+    metadata = {}
+    list_key = None
+    separator = "=" if toml else ":"
+    for number, line in enumerate(lines, start=2):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if not toml and list_key is not None and stripped.startswith("- "):
+            if not isinstance(metadata[list_key], list):
+                metadata[list_key] = []
+            metadata[list_key].append(parse_value(stripped[2:]))
+            continue
+        key, found, value = line.partition(separator)
+        key = key.strip()
+        if not found or not key:
+            raise FrontMatterError(f"invalid front matter on line {number}: {stripped}")
+        if not toml and not value.strip():
+            # Empty unless `- item` lines follow
+            metadata[key] = ""
+            list_key = key
+            continue
+        metadata[key] = parse_value(value, toml)
+        list_key = None
+    return metadata
+
+def read_front_matter(lines):
+    """
+    Consume the front matter at the start of a line iterator.
+
+    Only the front matter lines are read, so passing an open file leaves it
+    positioned at the first line of the Markdown body. A first line of ---
+    or +++ only opens front matter if a matching line closes it; otherwise
+    it is part of the body, like a thematic break. Likewise, a --- block
+    whose lines are not all `key: value` or `- item` lines is two thematic
+    breaks around body text.
+
+    Args:
+        lines (iterable): Lines of the document, e.g. an open file.
+
+    Returns:
+        tuple: (metadata dict, iterator over the remaining lines)
+
+    Raises:
+        FrontMatterError: If +++ front matter is malformed.
+    """
+    metadata, rest, _ = read_front_matter_lines(lines)
+    return metadata, rest
+
+def read_front_matter_lines(lines):
+    """
+    Like read_front_matter, also returning the line number the body starts on.
+
+    Returns:
+        tuple: (metadata dict, iterator over the remaining lines, line number
+        of the first remaining line)
+    """
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return {}, iter(()), 1
+    delimiter = first.rstrip("\r\n")
+    if delimiter not in (YAML_DELIMITER, TOML_DELIMITER):
+        return {}, _prepend(first, lines), 1
+    body = []
+    for line in lines:
+        if line.rstrip("\r\n") == delimiter:
+            try:
+                metadata = parse_front_matter([text.rstrip("\r\n") for text in body], delimiter == TOML_DELIMITER)
+            except FrontMatterError:
+                # +++ is not Markdown, but --- around prose is a pair of thematic breaks
+                if delimiter == TOML_DELIMITER:
+                    raise
+                return {}, _prepend(first, chain(body, [line], lines)), 1
+            return metadata, lines, len(body) + 3
+        body.append(line)
+    # Never closed, so the delimiter was body text
+    return {}, _prepend(first, iter(body)), 1
+
+def scan_front_matter(path):
+    """
+    Read only the front matter of a Markdown file, without its body.
+
+    Args:
+        path (str): Path to the Markdown file.
+
+    Returns:
+        dict: The metadata, empty if the file has no front matter.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        metadata, _ = read_front_matter(f)
+    return metadata
+
+def split_front_matter(markdown):
+    """
+    Split front matter off a Markdown string.
+
+    Args:
+        markdown (str): The whole document.
+
+    Returns:
+        tuple: (metadata dict, Markdown body)
+    """
+    metadata, rest = read_front_matter(io.StringIO(markdown))
+    return metadata, "".join(rest)
+
+def _prepend(first, lines):
+    yield first
+    yield from lines
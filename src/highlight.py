@@ -0,0 +1,136 @@
+import re
+from htmlnode import escape_text
+from block_cache import BlockCache
+
+# Block and render caches are salted with this when highlighting is on,
+# since it changes how code blocks render
+HIGHLIGHT_SALT = "highlight"
+
+def _lexer(*rules):
+    # One alternation of named groups, tried left to right at each position;
+    # a group's name is the CSS class of the tokens it matches
+    return re.compile("|".join(f"(?P<{css_class}>{pattern})" for css_class, pattern in rules), re.MULTILINE)
+
+def _words(*words):
+    return r"\b(?:" + "|".join(words) + r")\b"
+
+_NUMBER = r"\b(?:0[xX][0-9a-fA-F]+|\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)\b"
+_QUOTED = r'"(?:[^"\\\n]|\\.)*"|' + r"'(?:[^'\\\n]|\\.)*'"
+
+# Token classes follow Pygments' short names, so its themes also apply:
+# c comment, k keyword, kc constant, nb builtin, nd decorator,
+# nt JSON key, nv variable, s string, m number
+LEXERS = {
+    "python": _lexer(
+        ("c", r"#[^\n]*"),
+        ("s", r'(?:\b[rRbBuUfF]{1,2})?(?:"""[\s\S]*?"""|' + r"'''[\s\S]*?'''|" + _QUOTED + ")"),
+        ("nd", r"(?<!\S)@[\w.]+"),
+        ("kc", _words("True", "False", "None")),
+        ("k", _words("and", "as", "assert", "async", "await", "break", "class", "continue", "def", "del",
+                     "elif", "else", "except", "finally", "for", "from", "global", "if", "import", "in", "is",
+                     "lambda", "nonlocal", "not", "or", "pass", "raise", "return", "try", "while", "with",
+                     "yield")),
+        ("nb", _words("print", "len", "range", "open", "str", "int", "float", "list", "dict", "set", "tuple",
+                      "bool", "isinstance", "enumerate", "zip", "sorted", "min", "max", "sum", "super",
+                      "Exception", "ValueError", "TypeError")),
+        ("m", _NUMBER),
+    ),
+    "javascript": _lexer(
+        ("c", r"//[^\n]*|/\*[\s\S]*?\*/"),
+        ("s", _QUOTED + r"|`(?:[^`\\]|\\.)*`"),
+        ("kc", _words("true", "false", "null", "undefined", "this")),
+        ("k", _words("async", "await", "break", "case", "catch", "class", "const", "continue", "default",
+                     "delete", "do", "else", "export", "extends", "finally", "for", "from", "function", "if",
+                     "import", "in", "instanceof", "let", "new", "of", "return", "switch", "throw", "try",
+                     "typeof", "var", "while", "yield")),
+        ("nb", _words("console", "document", "window", "Math", "JSON", "Promise", "Object", "Array",
+                      "String", "Number", "Map", "Set", "Error", "fetch")),
+        ("m", _NUMBER),
+    ),
+    "bash": _lexer(
+        ("c", r"(?<![\w$])#[^\n]*"),
+        ("s", r'"(?:[^"\\]|\\.)*"|' + r"'[^']*'"),
+        ("nv", r"\$(?:\{[^}\n]*\}|\w+|[@*#?$!])"),
+        ("k", _words("if", "then", "else", "elif", "fi", "for", "in", "do", "done", "while", "until",
+                     "case", "esac", "function", "select", "return")),
+        ("nb", _words("echo", "cd", "export", "source", "set", "unset", "read", "printf", "exit", "test",
+                      "local", "shift", "eval", "exec")),
+        ("m", r"\b\d+\b"),
+    ),
+    "json": _lexer(
+        ("nt", r'"(?:[^"\\\n]|\\.)*"(?=\s*:)'),
+        ("s", r'"(?:[^"\\\n]|\\.)*"'),
+        ("kc", _words("true", "false", "null")),
+        ("m", r"-?" + _NUMBER),
+    ),
+}
+
+LANGUAGE_ALIASES = {
+    "py": "python",
+    "python3": "python",
+    "js": "javascript",
+    "mjs": "javascript",
+    "sh": "bash",
+    "shell": "bash",
+    "zsh": "bash",
+}
+
+def highlight(code, language):
+    """
+    Turn code into HTML with each token wrapped in a classed span.
+
+    Args:
+        code (str): The code, as plain text.
+        language (str): The language tag of the code block, e.g. "python" or "js".
+
+    Returns:
+        str: The escaped, highlighted HTML, or None if the language has no lexer.
+    """
+    language = language.lower()
+    lexer = LEXERS.get(LANGUAGE_ALIASES.get(language, language))
+    if lexer is None:
+        return None
+    parts = []
+    position = 0
+    for match in lexer.finditer(code):
+        if match.start() > position:
+            parts.append(escape_text(code[position:match.start()]))
+        parts.append(f'<span class="{match.lastgroup}">{escape_text(match.group())}</span>')
+        position = match.end()
+    parts.append(escape_text(code[position:]))
+    return "".join(parts)
+
+class Highlighter:
+    """
+    Highlights code blocks at build time, caching the HTML by language and code.
+
+    The same snippets tend to recur across many pages, so results are kept
+    in a BlockCache keyed on the language and code text, in memory and, with
+    a store_dir, on disk for later builds. Code in a language without a
+    lexer is cached as such too.
+    """
+
+    def __init__(self, max_entries=1024, store_dir=None):
+        self.cache = BlockCache(max_entries, store_dir, HIGHLIGHT_SALT)
+
+    def settings(self):
+        """Return the arguments that build an equivalent Highlighter, e.g. in a worker process."""
+        return self.cache.max_entries, self.cache.store_dir
+
+    def highlight(self, code, language):
+        """
+        Return the highlighted HTML of code, or None if the language has no lexer.
+
+        Args:
+            code (str): The code, as plain text.
+            language (str): The language tag of the code block.
+        """
+        entry = f"{language}\0{code}"
+        html = self.cache.get(entry)
+        if html is None:
+            html = highlight(code, language)
+            # An empty entry marks a language without a lexer
+            self.cache.put(entry, "" if html is None else html)
+        elif html == "" and code:
+            return None
+        return html
@@ -1,4 +1,24 @@
+def escape_text(text):
+    """
+    Escape &, < and > for use as HTML text.
+
+    Text without any of them, which is most text, is returned as is after
+    three substring checks, so escaping costs next to nothing.
+    """
+    if "&" not in text and "<" not in text and ">" not in text:
+        return text
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+def escape_attr(value):
+    """Escape &, <, > and " for use in a double-quoted HTML attribute value."""
+    if "&" not in value and "<" not in value and ">" not in value and '"' not in value:
+        return value
+    return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
 class HTMLNode:
+    # Millions of nodes are built on large sites; slots drop the per-instance __dict__
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
@@ -7,11 +27,21 @@ class HTMLNode:
         
     def to_html(self):
         raise NotImplementedError()
+
+    def iter_html(self):
+        """Yield the node's HTML in chunks; joined they equal to_html()."""
+        raise NotImplementedError()
+
+    def write_html(self, fp):
+        """Stream the node's HTML into a writable text file object."""
+        write = fp.write
+        for chunk in self.iter_html():
+            write(chunk)
     
     def props_to_html(self):
         if not self.props:
             return ""
-        return "".join(f' {key}="{value}"' for key, value in self.props.items())
+        return "".join(f' {key}="{escape_attr(value)}"' for key, value in self.props.items())
     
     def __repr__(self):
         return (
@@ -20,18 +50,45 @@ class HTMLNode:
         )
     
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, None, props)
     
     def to_html(self):
         if self.value == None: raise ValueError()
-        if self.tag == None: return self.value
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+        if self.tag == None: return escape_text(self.value)
+        return f"<{self.tag}{self.props_to_html()}>{escape_text(self.value)}</{self.tag}>"
+
+    def iter_html(self):
+        yield self.to_html()
     
     def __repr__(self):
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
     
+class RawNode(LeafNode):
+    """
+    An HTML fragment that is already rendered, such as a cached block, written out as is.
+
+    leaves is the number of leaf nodes the fragment was rendered from, so
+    profiles count a cached block like the node tree it replaces.
+    """
+
+    __slots__ = ("leaves",)
+
+    def __init__(self, html, leaves=1):
+        super().__init__(None, html)
+        self.leaves = leaves
+
+    def to_html(self):
+        return self.value
+
+    def __repr__(self):
+        return f"RawNode({self.value!r})"
+
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, value=None, props=None):
         if not isinstance(children, list):
             raise TypeError("children must be a list")
@@ -42,6 +99,14 @@ class ParentNode(HTMLNode):
         if self.children is None: raise ValueError("children is required for ParentNode")
         return f"<{self.tag}{self.props_to_html()}>{''.join(child.to_html() for child in self.children)}</{self.tag}>"
 
+    def iter_html(self):
+        if self.tag is None: raise ValueError("tag is required for ParentNode")
+        if self.children is None: raise ValueError("children is required for ParentNode")
+        yield f"<{self.tag}{self.props_to_html()}>"
+        for child in self.children:
+            yield from child.iter_html()
+        yield f"</{self.tag}>"
+
     def __repr__(self):
         return f"ParentNode({self.tag}, {self.children}, {self.value}, {self.props})"
 
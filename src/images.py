@@ -0,0 +1,253 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from manifest import GENERATOR_VERSION, file_digest
+from inline_markdown import IMAGE_PATTERN
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+VARIANT_WIDTHS = (480, 960, 1600)
+# Images fill the content column, which index.css caps at 800px
+IMAGE_SIZES = "(max-width: 840px) 100vw, 800px"
+JPEG_QUALITY = 82
+
+def variant_path(path, width, ext):
+    """Return the path or URL of an image's variant, e.g. images/tom-480w.jpg for images/tom.png."""
+    return f"{os.path.splitext(path)[0]}-{width}w{ext}"
+
+def _is_opaque(image):
+    if image.mode in ("RGBA", "LA"):
+        return image.getchannel("A").getextrema()[0] == 255
+    return "transparency" not in image.info
+
+def encode_variants(source_path, cache_path, widths):
+    """
+    Resize an image to each width narrower than it and recompress the results.
+
+    Variants of JPEGs and of PNGs without transparent pixels are saved as
+    JPEG, which suits photos far better than PNG; other PNGs stay PNG.
+    Variants that come out no smaller than the image itself are dropped.
+    They are written to cache_path as <width><ext> next to a meta.json
+    holding the image's size, the variants' extension and their widths.
+    Runs in pool workers.
+
+    Args:
+        source_path (str): Path of the image.
+        cache_path (str): Directory to write the variants to.
+        widths (tuple): Widths to resize to, in pixels.
+
+    Returns:
+        dict: {"width", "height", "ext", "variants": [width, ...]}
+    """
+    source_size = os.path.getsize(source_path)
+    os.makedirs(cache_path, exist_ok=True)
+    variants = []
+    with Image.open(source_path) as image:
+        width, height = image.size
+        as_jpeg = image.format == "JPEG" or _is_opaque(image)
+        ext = ".jpg" if as_jpeg else ".png"
+        for target in sorted(widths):
+            if target >= width:
+                continue
+            resized = image.resize((target, max(1, round(height * target / width))), Image.LANCZOS)
+            tmp_path = os.path.join(cache_path, f"{target}{ext}.{os.getpid()}.tmp")
+            if as_jpeg:
+                resized.convert("RGB").save(tmp_path, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+            else:
+                resized.save(tmp_path, "PNG", optimize=True)
+            if os.path.getsize(tmp_path) >= source_size:
+                os.remove(tmp_path)
+                continue
+            os.replace(tmp_path, os.path.join(cache_path, f"{target}{ext}"))
+            variants.append(target)
+    meta = {"width": width, "height": height, "ext": ext, "variants": variants}
+    tmp_path = os.path.join(cache_path, f"meta.json.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, os.path.join(cache_path, "meta.json"))
+    return meta
+
+class ResponsiveImages:
+    """
+    The size and resized variants of each image, for the attributes of <img> tags.
+
+    Images are keyed by their root-relative URL, such as /images/tom.png,
+    the way Markdown links to them. key() digests the attributes of the
+    images a block or page links to, so the block cache, the render cache
+    and the build manifest only miss for the blocks and pages whose images
+    changed.
+    """
+
+    def __init__(self, images, basepath="/", cache_dir=None):
+        self.images = images
+        self.basepath = basepath.rstrip("/")
+        self.cache_dir = cache_dir
+        self.encoded = 0
+        self.reused = 0
+        self.failed = 0
+
+    def props(self, src):
+        """
+        Return the attributes to add to an image, or None if src is not a known image.
+
+        Args:
+            src (str): The image's src, e.g. /images/tom.png.
+
+        Returns:
+            dict: width, height and loading, plus srcset and sizes when the
+            image has variants. srcset URLs include the basepath, which the
+            template only adds to href and src.
+        """
+        info = self.images.get(src)
+        if info is None:
+            return None
+        props = {"width": str(info["width"]), "height": str(info["height"])}
+        if info["variants"]:
+            candidates = [f"{self.basepath}{variant_path(src, width, info['ext'])} {width}w"
+                          for width in info["variants"]]
+            candidates.append(f"{self.basepath}{src} {info['width']}w")
+            props["srcset"] = ", ".join(candidates)
+            props["sizes"] = IMAGE_SIZES
+        props["loading"] = "lazy"
+        return props
+
+    def key(self, markdown):
+        """
+        Return a digest of the attributes of the images some Markdown links to.
+
+        Args:
+            markdown (str): A block or a whole page.
+
+        Returns:
+            str: Hex digest of each linked image's props(), which include the
+            basepath through srcset, or "" if the Markdown links to no image.
+        """
+        if "![" not in markdown:
+            return ""
+        srcs = sorted({src for _, src in IMAGE_PATTERN.findall(markdown)})
+        if not srcs:
+            return ""
+        props = [[src, self.props(src)] for src in srcs]
+        return hashlib.sha256(json.dumps(props, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def file_key(self, path):
+        """Return key() of a Markdown file."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return self.key(f.read())
+
+    def annotate(self, node):
+        """Add the attributes to every known image in an HTML node tree."""
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.children:
+                stack.extend(node.children)
+            elif node.tag in ("img", "image") and node.props:
+                props = self.props(node.props.get("src"))
+                if props is not None:
+                    node.props.update(props)
+
+    def copy_variants(self, dest_dir_path):
+        """
+        Copy the cached variants next to their images in the output directory.
+
+        Variants whose output already matches the cached file's size and
+        modification time are left alone.
+
+        Args:
+            dest_dir_path (str): Output directory static files are copied to.
+        """
+        for url, info in self.images.items():
+            relative_path = url.lstrip("/")
+            for width in info["variants"]:
+                cached_path = os.path.join(self.cache_dir, info["key"][:2], info["key"], f"{width}{info['ext']}")
+                dst_path = os.path.join(dest_dir_path, variant_path(relative_path, width, info["ext"]))
+                cached = os.stat(cached_path)
+                try:
+                    existing = os.stat(dst_path)
+                    if (existing.st_size, existing.st_mtime_ns) == (cached.st_size, cached.st_mtime_ns):
+                        continue
+                except FileNotFoundError:
+                    pass
+                os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+                shutil.copy2(cached_path, dst_path)
+
+def _try_encode_variants(source_path, cache_path, widths):
+    # Runs in pool workers; an unreadable image must not abort the build
+    try:
+        return encode_variants(source_path, cache_path, widths)
+    except Exception as e:
+        logging.warning(f"Could not make variants of {source_path}, leaving it without them: {str(e)}")
+        return None
+
+def build_image_variants(static_dir, cache_dir, basepath="/", widths=VARIANT_WIDTHS, jobs=1):
+    """
+    Make resized variants of every image under static_dir, reusing cached ones.
+
+    Variants are cached in cache_dir by the image's content hash and the
+    widths, so images that did not change are never re-encoded. Images that
+    need encoding are spread over a pool of jobs worker processes. Images
+    Pillow cannot read are logged and left out, so their tags get no extra
+    attributes; they are tried again on the next build.
+
+    Args:
+        static_dir (str): Directory of static files.
+        cache_dir (str): Directory holding the encoded variants.
+        basepath (str): Base path for URLs (e.g., '/' or '/my-site/'). Defaults to '/'.
+        widths (tuple): Variant widths in pixels. Images are never scaled up.
+        jobs (int): Number of worker processes. Defaults to 1 (serial).
+
+    Returns:
+        ResponsiveImages: The images found, or None if Pillow is not installed.
+    """
+    if Image is None:
+        logging.warning("Pillow is not installed, skipping responsive image variants")
+        return None
+
+    images = {}
+    pending = []
+    failed = 0
+    for root, dirs, files in os.walk(static_dir):
+        for file in sorted(files):
+            if not file.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            source_path = os.path.join(root, file)
+            relative_path = os.path.relpath(source_path, static_dir)
+            key = hashlib.sha256(f"{GENERATOR_VERSION}\0{widths}\0{file_digest(source_path)}".encode("utf-8")).hexdigest()
+            cache_path = os.path.join(cache_dir, key[:2], key)
+            url = "/" + relative_path.replace(os.sep, "/")
+            try:
+                with open(os.path.join(cache_path, "meta.json"), 'r', encoding='utf-8') as f:
+                    images[url] = dict(json.load(f), key=key)
+            except (OSError, ValueError):
+                pending.append((url, source_path, cache_path, key))
+
+    if pending:
+        arguments = ([source_path for _, source_path, _, _ in pending],
+                     [cache_path for _, _, cache_path, _ in pending],
+                     [widths] * len(pending))
+        if jobs > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                metas = list(executor.map(_try_encode_variants, *arguments))
+        else:
+            metas = list(map(_try_encode_variants, *arguments))
+        for (url, _, _, key), meta in zip(pending, metas):
+            if meta is None:
+                failed += 1
+            else:
+                images[url] = dict(meta, key=key)
+
+    result = ResponsiveImages(dict(sorted(images.items())), basepath, cache_dir)
+    result.failed = failed
+    result.encoded = len(pending) - failed
+    result.reused = len(images) - result.encoded
+    logging.info(f"Image variants: {len(images)} image(s), {result.encoded} encoded, {result.reused} reused from cache, "
+                 f"{result.failed} unreadable")
+    return result
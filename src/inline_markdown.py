@@ -2,18 +2,94 @@ import re
 
 from textnode import TextNode, TextType
 
-def text_to_textnodes(text):
-    nodes = [TextNode(text, TextType.TEXT)]
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+# Images and links in one alternation; a "[" preceded by "!" can only start an image
+IMAGE_OR_LINK_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)|(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
 
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
+# Delimiters in the order the split passes apply them; text inside an
+# earlier delimiter is never split by a later one
+INLINE_DELIMITERS = (("`", TextType.CODE), ("**", TextType.BOLD), ("_", TextType.ITALIC))
 
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    
+def text_to_textnodes(text):
+    """
+    Split inline Markdown into TextNodes in a single walk over the text.
+
+    Produces the same nodes as running split_nodes_image, split_nodes_link
+    and split_nodes_delimiter for code, bold and italic one after another,
+    without building an intermediate node list for each pass. Delimiters
+    are found with str.find on (start, end) ranges of the original text and
+    the nodes are spans into it, so no text is copied until it is read.
+    """
+    nodes = []
+    position = 0
+    for match in IMAGE_OR_LINK_PATTERN.finditer(text):
+        if match.start() > position:
+            _split_inline_delimiters(text, position, match.start(), nodes, 0)
+        if match.start(1) != -1:
+            nodes.append(TextNode.span(text, match.start(1), match.end(1), TextType.IMAGE, url=match.group(2)))
+        else:
+            nodes.append(TextNode.span(text, match.start(3), match.end(3), TextType.LINK, url=match.group(4)))
+        position = match.end()
+
+    # Text without any image or link is split even when empty, like the passes do
+    if position < len(text) or not nodes:
+        _split_inline_delimiters(text, position, len(text), nodes, 0)
     return nodes
 
+# Ranges up to this length are split as strings: str.split beats walking
+# offsets in Python, and copying a short range costs little
+SPLIT_MAX_LENGTH = 256
+
+def _split_inline_delimiters(text, start, end, nodes, level):
+    # Same parts as text[start:end].split(delimiter), as (start, end) ranges
+    if end - start <= SPLIT_MAX_LENGTH:
+        _split_inline_text(text[start:end], nodes, level)
+        return
+
+    delimiter, text_type = INLINE_DELIMITERS[level]
+    count = text.count(delimiter, start, end)
+    if count % 2 == 1:
+        raise Exception("Invalid Markdown syntax: unmatched or missing closing delimiter")
+    if count == 0:
+        # Nothing to split at this level, hand the whole range on
+        if level + 1 < len(INLINE_DELIMITERS):
+            _split_inline_delimiters(text, start, end, nodes, level + 1)
+        else:
+            nodes.append(TextNode.span(text, start, end, TextType.TEXT))
+        return
+
+    size = len(delimiter)
+    inside = False
+    while True:
+        found = text.find(delimiter, start, end)
+        part_end = end if found == -1 else found
+        if inside:
+            nodes.append(TextNode.span(text, start, part_end, text_type))
+        elif level + 1 < len(INLINE_DELIMITERS):
+            _split_inline_delimiters(text, start, part_end, nodes, level + 1)
+        else:
+            nodes.append(TextNode.span(text, start, part_end, TextType.TEXT))
+        if found == -1:
+            break
+        start = found + size
+        inside = not inside
+
+def _split_inline_text(text, nodes, level):
+    delimiter, text_type = INLINE_DELIMITERS[level]
+    parts = text.split(delimiter)
+    if len(parts) % 2 == 0:
+        raise Exception("Invalid Markdown syntax: unmatched or missing closing delimiter")
+
+    for i, part in enumerate(parts):
+        if i % 2 == 1:
+            nodes.append(TextNode(part, text_type))
+        elif level + 1 < len(INLINE_DELIMITERS):
+            _split_inline_text(part, nodes, level + 1)
+        else:
+            nodes.append(TextNode(part, TextType.TEXT))
+
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     new_nodes = []
 
@@ -35,69 +111,39 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
     return new_nodes
 
 def split_nodes_image(old_nodes):
-    new_nodes = []
-    
-    for node in old_nodes:
-        if node.text_type != TextType.TEXT:
-            new_nodes.append(node)
-            continue
-
-        images = extract_markdown_images(node.text)
-        
-        if not images:
-            new_nodes.append(node)
-            continue
-
-        current_text = node.text
-
-        for alt_text, url in images:
-            markdown_image = f"![{alt_text}]({url})"
-            sections = current_text.split(markdown_image, 1)
-
-            if sections[0]:
-                new_nodes.append(TextNode(sections[0], TextType.TEXT))
-
-            new_nodes.append(TextNode(alt_text, TextType.IMAGE, url=url))
-            current_text = sections[1]
-
-        if current_text:
-            new_nodes.append(TextNode(current_text, TextType.TEXT))
-
-    return new_nodes
+    return _split_nodes_pattern(old_nodes, IMAGE_PATTERN, TextType.IMAGE)
 
 def split_nodes_link(old_nodes):
+    return _split_nodes_pattern(old_nodes, LINK_PATTERN, TextType.LINK)
+
+def _split_nodes_pattern(old_nodes, pattern, text_type):
+    # Slice text nodes around each match span; linear in the text length
     new_nodes = []
-    
+
     for node in old_nodes:
         if node.text_type != TextType.TEXT:
             new_nodes.append(node)
             continue
 
-        links = extract_markdown_links(node.text)
-        
-        if not links:
-            new_nodes.append(node)
-            continue
-
-        current_text = node.text
-
-        for link_text, url in links:
-            markdown_link = f"[{link_text}]({url})"
-            sections = current_text.split(markdown_link, 1)
+        text = node.text
+        position = 0
 
-            if sections[0]:
-                new_nodes.append(TextNode(sections[0], TextType.TEXT))
+        for match in pattern.finditer(text):
+            if match.start() > position:
+                new_nodes.append(TextNode(text[position:match.start()], TextType.TEXT))
 
-            new_nodes.append(TextNode(link_text, TextType.LINK, url=url))
-            current_text = sections[1]
+            new_nodes.append(TextNode(match.group(1), text_type, url=match.group(2)))
+            position = match.end()
 
-        if current_text:
-            new_nodes.append(TextNode(current_text, TextType.TEXT))
+        if position == 0:
+            new_nodes.append(node)
+        elif position < len(text):
+            new_nodes.append(TextNode(text[position:], TextType.TEXT))
 
     return new_nodes
 
 def extract_markdown_images(text):
-    return re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    return IMAGE_PATTERN.findall(text)
 
 def extract_markdown_links(text):
-    return re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    return LINK_PATTERN.findall(text)
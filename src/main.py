@@ -1,8 +1,19 @@
 import os
 import shutil
 import logging
-import sys
+import time
+import argparse
 from markdown_utils import generate_pages_recursive
+from manifest import BuildManifest, file_digest, remove_empty_parents
+from watch import SiteWatcher
+from profiling import BuildProfiler
+from block_cache import BlockCache
+from render_cache import RenderCache
+from site_index import SiteIndex, generate_listings
+from feeds import RecordCache, SiteOutputs
+from search_index import SearchIndexBuilder
+from highlight import HIGHLIGHT_SALT, Highlighter
+from images import build_image_variants
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 
@@ -47,6 +58,175 @@ def copy_directory(src, dst):
             logging.info(f"Copying directory: {src_path}")
             copy_directory(src_path, dst_path)
 
+def sync_directory(src, dst, manifest, checksum=False, link=False):
+    """
+    Incrementally sync all contents from src directory into dst directory.
+
+    Only files that are new or whose size or modification time differ are
+    copied, and files synced by a previous build that no longer exist in src
+    are removed. Other files in dst, such as generated pages, are left alone.
+
+    Args:
+        src (str): Path to source directory
+        dst (str): Path to destination directory
+        manifest (BuildManifest): Manifest recording which assets were synced
+        checksum (bool): Compare content hashes before copying files whose
+            modification time changed but whose size did not.
+        link (bool): Hardlink files into dst instead of copying them, falling
+            back to a copy when the filesystem does not allow it.
+    """
+    # Check if source directory exists
+    if not os.path.exists(src):
+        logging.error(f"Source directory {src} does not exist")
+        raise FileNotFoundError(f"Source directory {src} does not exist")
+
+    seen = set()
+    copied = 0
+    for root, dirs, files in os.walk(src):
+        for file in files:
+            src_path = os.path.join(root, file)
+            relative_path = os.path.relpath(src_path, src)
+            dst_path = os.path.join(dst, relative_path)
+            seen.add(relative_path)
+
+            if _asset_changed(src_path, dst_path, checksum):
+                os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+                _copy_file(src_path, dst_path, link)
+                copied += 1
+                logging.info(f"Synced file: {src_path} to {dst_path}")
+            manifest.assets.add(relative_path)
+
+    # Remove assets deleted from the source since the last sync
+    for relative_path in [path for path in manifest.assets if path not in seen]:
+        manifest.assets.discard(relative_path)
+        dst_path = os.path.join(dst, relative_path)
+        if os.path.exists(dst_path):
+            logging.info(f"Removing deleted asset: {dst_path}")
+            os.remove(dst_path)
+            remove_empty_parents(os.path.dirname(dst_path), dst)
+
+    logging.info(f"Synced {copied} of {len(seen)} static file(s) into {dst}")
+
+def _asset_changed(src_path, dst_path, checksum):
+    try:
+        dst_stat = os.stat(dst_path)
+    except FileNotFoundError:
+        return True
+    src_stat = os.stat(src_path)
+    if src_stat.st_size != dst_stat.st_size:
+        return True
+    if src_stat.st_mtime_ns == dst_stat.st_mtime_ns:
+        return False
+    if checksum and file_digest(src_path) == file_digest(dst_path):
+        # Same bytes with a new timestamp, e.g. after a git checkout
+        shutil.copystat(src_path, dst_path)
+        return False
+    return True
+
+def _copy_file(src_path, dst_path, link):
+    """
+    Copy a file without duplicating bytes where the filesystem allows it.
+
+    Tries a hardlink when requested, then os.copy_file_range (which reflinks on
+    filesystems such as btrfs and XFS), then falls back to shutil.copyfile.
+    The source timestamps are copied so later syncs can compare mtimes.
+    """
+    if os.path.lexists(dst_path):
+        # Never write through an existing hardlink into the source file
+        os.remove(dst_path)
+    if link:
+        try:
+            os.link(src_path, dst_path)
+            return
+        except OSError:
+            pass
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src_path, 'rb') as fsrc, open(dst_path, 'wb') as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    sent = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if sent == 0:
+                        break
+                    remaining -= sent
+            if remaining == 0:
+                shutil.copystat(src_path, dst_path)
+                return
+        except OSError:
+            pass
+    shutil.copyfile(src_path, dst_path)
+    shutil.copystat(src_path, dst_path)
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments.
+
+    Args:
+        argv (list): Arguments to parse. Defaults to sys.argv[1:].
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Generate the static site from content/ into docs/.")
+    parser.add_argument("basepath", nargs="?", default="/",
+                        help="Base path for URLs, e.g. '/my-site/'. Defaults to '/'.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Keep docs/ and only re-render pages whose inputs changed.")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Number of worker processes used to render pages. "
+                             "Use 0 for one per CPU core. Defaults to 1.")
+    parser.add_argument("--checksum", action="store_true",
+                        help="With --incremental, compare static files by content hash "
+                             "when their modification time changed.")
+    parser.add_argument("--link-assets", action="store_true",
+                        help="With --incremental, hardlink static files into docs/ "
+                             "instead of copying them.")
+    parser.add_argument("--drafts", action="store_true",
+                        help="Also build pages whose front matter sets draft: true.")
+    parser.add_argument("--listings", action="store_true",
+                        help="Generate section archives and tag pages from the dates and tags "
+                             "in page front matter.")
+    parser.add_argument("--per-page", type=int, default=10, metavar="N",
+                        help="Posts per archive or tag page. Defaults to 10.")
+    parser.add_argument("--site-url", metavar="URL",
+                        help="Also write sitemap.xml, an Atom feed (feed.xml) and the search index "
+                             "for the site published at URL, e.g. https://example.com.")
+    parser.add_argument("--search-index", action="store_true",
+                        help="Also write a full-text search index (search-index/) and its "
+                             "loader (search.js) for client-side search. Implied by --site-url.")
+    parser.add_argument("--highlight", action="store_true",
+                        help="Syntax-highlight fenced code blocks that name their language "
+                             "(python, javascript, bash, json) at build time, caching results "
+                             "in .cache/highlight.")
+    parser.add_argument("--images", action="store_true",
+                        help="Make resized variants of the PNG and JPEG images in static/ (needs Pillow) "
+                             "and give image tags srcset, width, height and loading=lazy. Variants "
+                             "are cached in .cache/images.")
+    parser.add_argument("--block-cache", type=int, default=0, metavar="N",
+                        help="Cache up to N rendered Markdown blocks in memory and reuse them "
+                             "for identical blocks. Defaults to 0 (off).")
+    parser.add_argument("--block-cache-disk", action="store_true",
+                        help="With --block-cache, also keep rendered blocks in .cache/blocks "
+                             "for later builds.")
+    parser.add_argument("--block-cache-size", type=int, default=64, metavar="MB",
+                        help="Size cap of .cache/blocks in megabytes; the least recently used "
+                             "blocks are evicted. Defaults to 64.")
+    parser.add_argument("--render-cache", metavar="DIR",
+                        help="Reuse finished pages from a content-addressed cache in DIR, "
+                             "which can be shared by builds and CI runners.")
+    parser.add_argument("--render-cache-size", type=int, default=512, metavar="MB",
+                        help="Size cap of the render cache in megabytes. Defaults to 512.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Time each build stage and page and print a summary at the end.")
+    parser.add_argument("--profile-output", metavar="PATH",
+                        help="With --profile, also write the report as JSON to PATH.")
+    parser.add_argument("--profile-top", type=int, default=10, metavar="N",
+                        help="Number of slowest pages to report. Defaults to 10.")
+    parser.add_argument("--watch", action="store_true",
+                        help="After building, keep running and rebuild only what changes "
+                             "in content/, static/ and template.html.")
+    return parser.parse_args(argv)
+
 def main():
     """
     Main function to generate the static site.
@@ -54,28 +234,118 @@ def main():
     - Copies static files from static to docs.
     - Generates HTML pages for all Markdown files in content/ using template.html.
     - Uses a configurable basepath from CLI argument (defaults to '/').
+    - With --incremental, keeps docs and uses a build manifest in .cache/ to
+      sync only changed static files and re-render only changed pages.
+    - With --jobs N, renders pages in N worker processes.
+    - With --listings, generates archive and tag pages from page front matter.
+    - With --site-url, writes a sitemap, an Atom feed and the search index.
+    - With --search-index, writes a client-side full-text search index.
+    - With --highlight, syntax-highlights tagged code blocks at build time.
+    - With --images, writes resized image variants and responsive image tags.
+    - With --profile, prints per-stage timings, counters and the slowest pages.
+    - With --watch, keeps rebuilding changed pages and assets until interrupted.
     """
     public_dir = "docs"
     static_dir = "static"
     content_dir = "content"
     template_path = "template.html"
-    basepath = sys.argv[1] if len(sys.argv) > 1 else "/"
+    manifest_path = os.path.join(".cache", "manifest.json")
+    site_index_path = os.path.join(".cache", "site_index.json")
+    args = parse_args()
+    basepath = args.basepath
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    profiler = BuildProfiler() if args.profile else None
+    highlighter = Highlighter(store_dir=os.path.join(".cache", "highlight")) if args.highlight else None
+    images = None
+    if args.images:
+        images_started = time.perf_counter()
+        images = build_image_variants(static_dir, os.path.join(".cache", "images"), basepath, jobs=jobs)
+        if profiler is not None and images is not None:
+            profiler.add_stage("images", time.perf_counter() - images_started)
+            profiler.count("images_encoded", images.encoded)
+    # Options that change how pages render keep cached blocks and pages apart.
+    # Images are keyed per block and per page instead, by the images they link to.
+    salt = HIGHLIGHT_SALT if args.highlight else ""
+    block_cache = None
+    if args.block_cache > 0:
+        store_dir = os.path.join(".cache", "blocks") if args.block_cache_disk else None
+        block_cache = BlockCache(args.block_cache, store_dir, salt, args.block_cache_size * 1024 * 1024)
+    render_cache = None
+    if args.render_cache:
+        render_cache = RenderCache(args.render_cache, args.render_cache_size * 1024 * 1024, salt)
+    site_index = SiteIndex.load(site_index_path) if args.listings else None
 
     try:
-        # Delete the docs directory if it exists
-        if os.path.exists(public_dir):
+        if profiler is not None:
+            build_started = time.perf_counter()
+        manifest = None
+        if args.incremental:
+            manifest = BuildManifest.load(manifest_path, salt)
+        elif os.path.exists(public_dir):
+            # Delete the docs directory if it exists
             logging.info(f"Removing existing docs directory: {public_dir}")
             shutil.rmtree(public_dir)
 
-        # Copy static files to docs
-        copy_directory(static_dir, public_dir)
+        # Copy static files to docs, or sync only the changed ones
+        if profiler is not None:
+            copy_started = time.perf_counter()
+            profiler.add_stage("clean", copy_started - build_started)
+        if manifest is not None:
+            sync_directory(static_dir, public_dir, manifest, args.checksum, args.link_assets)
+        else:
+            copy_directory(static_dir, public_dir)
+        if images is not None:
+            images.copy_variants(public_dir)
+        if profiler is not None:
+            profiler.add_stage("copy_static", time.perf_counter() - copy_started)
 
         # Generate HTML pages for all Markdown files with basepath
-        generate_pages_recursive(content_dir, template_path, public_dir, basepath)
+        if profiler is not None:
+            pages_started = time.perf_counter()
+        site_outputs = None
+        if args.site_url:
+            site_outputs = SiteOutputs(public_dir, args.site_url, basepath)
+        search_index = None
+        if args.search_index or args.site_url:
+            search_index = SearchIndexBuilder(public_dir, basepath)
+        record_cache = None
+        if search_index is not None and (args.incremental or args.render_cache):
+            record_cache = RecordCache(os.path.join(".cache", "page_records"))
+        generate_pages_recursive(content_dir, template_path, public_dir, basepath, manifest, jobs, profiler,
+                                 block_cache, render_cache, args.drafts, site_index, site_outputs, search_index,
+                                 highlighter, images, record_cache)
+        if profiler is not None:
+            outputs_started = time.perf_counter()
+            profiler.add_stage("pages", outputs_started - pages_started)
+        if site_outputs is not None:
+            site_outputs.close()
+        if search_index is not None:
+            stats = search_index.close()
+            if profiler is not None:
+                profiler.count("search_index_bytes", stats["bytes"])
+        if profiler is not None and (site_outputs is not None or search_index is not None):
+            profiler.add_stage("site_outputs", time.perf_counter() - outputs_started)
+
+        # Generate archive and tag pages from the site index
+        if site_index is not None:
+            listings_started = time.perf_counter()
+            written = generate_listings(site_index, template_path, public_dir, basepath, args.per_page)
+            if profiler is not None:
+                profiler.add_stage("listings", time.perf_counter() - listings_started)
+                profiler.count("listings_written", written)
+
+        if profiler is not None:
+            print(profiler.summary(args.profile_top))
+            if args.profile_output:
+                profiler.write_report(args.profile_output, args.profile_top)
 
     except Exception as e:
         logging.error(f"Error during site generation: {str(e)}")
         raise
 
+    if args.watch:
+        SiteWatcher(content_dir, static_dir, template_path, public_dir, basepath, manifest, jobs,
+                    args.drafts, highlighter, images, block_cache, render_cache).run()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
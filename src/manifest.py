@@ -0,0 +1,155 @@
+import os
+import json
+import hashlib
+import logging
+
+# Bump whenever a change to the generator alters the HTML it produces, so
+# that every page recorded by an older version is rebuilt. Bump it in the
+# same commit as the change; TestGeneratorVersion in test_manifest.py
+# records a fixture's HTML for the current version to catch missed bumps.
+GENERATOR_VERSION = "5"
+
+def file_digest(path):
+    """
+    Compute the SHA-256 hex digest of a file's contents.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        str: Hex digest of the file bytes.
+    """
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+class BuildManifest:
+    """
+    On-disk record of the inputs each generated page was built from.
+
+    The manifest maps a page's Markdown path (relative to the content
+    directory) to the source hash, template hash, basepath, image attributes
+    and generator version used to render it, plus the output path it was
+    written to.
+    It also lists the paths of the static assets synced into the output
+    directory, so assets deleted from the source can be removed without
+    touching pages.
+    A salt names build options that change how pages render; pages recorded
+    under another salt are rebuilt.
+    """
+
+    def __init__(self, path, pages=None, assets=None, salt=""):
+        self.path = path
+        self.pages = pages if pages is not None else {}
+        self.assets = set(assets) if assets is not None else set()
+        self.salt = salt
+
+    @classmethod
+    def load(cls, path, salt=""):
+        """
+        Load a manifest from disk, starting empty if it is missing or unreadable.
+
+        Args:
+            path (str): Path to the manifest JSON file.
+            salt (str): Rendering options of this build, as for BlockCache.
+
+        Returns:
+            BuildManifest: The loaded manifest.
+        """
+        if not os.path.exists(path):
+            return cls(path, salt=salt)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable build manifest {path}: {str(e)}")
+            return cls(path, salt=salt)
+        # Synced assets do not depend on the generator, so they survive a version bump
+        assets = data.get("assets", [])
+        if data.get("version") != GENERATOR_VERSION:
+            logging.info(f"Build manifest {path} is from another generator version, rebuilding")
+            return cls(path, assets=assets, salt=salt)
+        if data.get("salt", "") != salt:
+            logging.info(f"Build manifest {path} was built with other options, rebuilding")
+            return cls(path, assets=assets, salt=salt)
+        return cls(path, data.get("pages", {}), assets, salt)
+
+    def save(self):
+        """Write the manifest to disk atomically."""
+        dirname = os.path.dirname(self.path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": GENERATOR_VERSION, "salt": self.salt, "pages": self.pages,
+                       "assets": sorted(self.assets)},
+                      f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def is_fresh(self, key, source_hash, template_hash, basepath, dest_path, images=""):
+        """
+        Check whether a page's recorded inputs match and its output still exists.
+
+        Args:
+            key (str): Markdown path relative to the content directory.
+            source_hash (str): Digest of the Markdown file.
+            template_hash (str): Digest of the template file.
+            basepath (str): Base path the page would be rendered with.
+            dest_path (str): Path the page would be written to.
+            images (str): ResponsiveImages.key() of the page, or "" when it
+                links to no known image or images are not processed.
+
+        Returns:
+            bool: True if the page can be skipped.
+        """
+        entry = self.pages.get(key)
+        return (
+            entry is not None
+            and entry["source"] == source_hash
+            and entry["template"] == template_hash
+            and entry["basepath"] == basepath
+            and entry["output"] == dest_path
+            and entry.get("images", "") == images
+            and os.path.exists(dest_path)
+        )
+
+    def record(self, key, source_hash, template_hash, basepath, dest_path, images=""):
+        """Record the inputs a page was just rendered from."""
+        self.pages[key] = {
+            "source": source_hash,
+            "template": template_hash,
+            "basepath": basepath,
+            "output": dest_path,
+            "images": images,
+        }
+
+    def remove_stale(self, seen_keys, dest_dir_path):
+        """
+        Delete outputs whose source Markdown no longer exists and forget them.
+
+        Args:
+            seen_keys (set): Keys of all Markdown files found in this build.
+            dest_dir_path (str): Output root; emptied directories below it are removed.
+        """
+        for key in [key for key in self.pages if key not in seen_keys]:
+            output = self.pages.pop(key)["output"]
+            if os.path.exists(output):
+                logging.info(f"Removing stale output {output} (source {key} was deleted)")
+                os.remove(output)
+                remove_empty_parents(os.path.dirname(output), dest_dir_path)
+
+def remove_empty_parents(dir_path, root):
+    """
+    Remove dir_path and its parents while they are empty, stopping at root.
+
+    Args:
+        dir_path (str): Directory a file was just removed from.
+        root (str): Output root, which is never removed.
+    """
+    root = os.path.abspath(root)
+    while (os.path.abspath(dir_path).startswith(root + os.sep)
+           and os.path.isdir(dir_path) and not os.listdir(dir_path)):
+        os.rmdir(dir_path)
+        dir_path = os.path.dirname(dir_path)
@@ -1,7 +1,33 @@
+import re
+import logging
 from enum import Enum
 from htmlnode import *
 from inline_markdown import text_to_textnodes
 from textnode import text_node_to_html_node, TextNode, TextType
+from profiling import count_leaves
+
+
+# Shared tag strings, so headings don't each allocate their own "hN"
+HEADING_TAGS = {level: f"h{level}" for level in range(1, 7)}
+
+FENCE = "```"
+
+# Inline markup needs one of these characters; "!" only starts an image
+# before a "[", so text without them is a single plain text run
+INLINE_MARKUP = re.compile(r"[`*_\[]")
+
+# Runs of inline text that took the plain text path or were parsed, for
+# generate_page's profile counters
+INLINE_STATS = {"plain_text": 0, "parsed": 0}
+
+
+class MarkdownError(ValueError):
+    """A block that could not be converted, with where it starts in the source."""
+
+    def __init__(self, message, source=None, line=None):
+        super().__init__(message)
+        self.source = source
+        self.line = line
 
 
 class BlockType(Enum):
@@ -14,69 +40,288 @@ class BlockType(Enum):
 
 
 def block_to_block_type(block):
-    lines = block.split("\n")
-    #print(f"\nBLock: {block!r}, Lines: {lines!r}")
+    return classify_block(block)[0]
+
 
+# Ordered list item prefixes, so checking an item doesn't format its number
+OLIST_PREFIXES = [f"{i}. " for i in range(1, 101)]
+
+
+def classify_block(block):
+    """
+    Work out a block's type, dispatching on its first character.
+
+    Only blocks whose first character can start a heading, code, quote or
+    list are checked further, and their lines are validated in one pass.
+
+    Args:
+        block (str): The Markdown block.
+
+    Returns:
+        tuple: (BlockType, lines), where lines is the block split into lines
+        for the converter, or None for headings, which don't need them.
+    """
+    classifier = BLOCK_CLASSIFIERS.get(block[:1])
+    if classifier is not None:
+        return classifier(block)
+    return BlockType.PARAGRAPH, block.split("\n")
+
+
+def _classify_heading(block):
     if block.startswith(("# ", "## ", "### ", "#### ", "##### ", "###### ")):
-        return BlockType.HEADING
+        return BlockType.HEADING, None
+    return BlockType.PARAGRAPH, block.split("\n")
+
+
+def _classify_code(block):
+    lines = block.split("\n")
     if len(lines) > 1 and lines[0].startswith("```") and lines[-1].startswith("```"):
-        return BlockType.CODE
-    if block.startswith(">"):
-        for line in lines:
-            if not line.startswith(">"):
-                return BlockType.PARAGRAPH
-        return BlockType.QUOTE
-    if block.startswith("- "):
-        for line in lines:
-            if not line.startswith("- "):
-                return BlockType.PARAGRAPH
-        return BlockType.ULIST
-    if block.startswith("1. "):
-        i = 1
-        for line in lines:
-            if not line.startswith(f"{i}. "):
-                return BlockType.PARAGRAPH
-            i += 1
-        return BlockType.OLIST
-    return BlockType.PARAGRAPH
-
-
-def markdown_to_html_node(markdown):
+        return BlockType.CODE, lines
+    return BlockType.PARAGRAPH, lines
+
+
+def _classify_quote(block):
+    lines = block.split("\n")
+    for line in lines:
+        if not line.startswith(">"):
+            return BlockType.PARAGRAPH, lines
+    return BlockType.QUOTE, lines
+
+
+def _classify_ulist(block):
+    lines = block.split("\n")
+    for line in lines:
+        if not line.startswith("- "):
+            return BlockType.PARAGRAPH, lines
+    return BlockType.ULIST, lines
+
+
+def _classify_olist(block):
+    lines = block.split("\n")
+    for i, line in enumerate(lines):
+        prefix = OLIST_PREFIXES[i] if i < len(OLIST_PREFIXES) else f"{i + 1}. "
+        if not line.startswith(prefix):
+            return BlockType.PARAGRAPH, lines
+    return BlockType.OLIST, lines
+
+
+BLOCK_CLASSIFIERS = {
+    "#": _classify_heading,
+    "`": _classify_code,
+    ">": _classify_quote,
+    "-": _classify_ulist,
+    "1": _classify_olist,
+}
+
+
+def markdown_to_html_node(markdown, block_cache=None, highlighter=None, images=None):
     blocks = markdown_to_blocks(markdown)
-    children = []
-    for block in blocks:
-        html_node = block_to_html_node(block)
-        children.append(html_node)
+    children = list(blocks_to_html_nodes(blocks, block_cache, highlighter, images))
     return ParentNode("div", children, None)
 
-def markdown_to_blocks(markdown):
-    blocks = markdown.split("\n\n")
-    filtered_blocks = []
+
+def blocks_to_html_nodes(blocks, block_cache=None, highlighter=None, images=None):
+    # Lazily convert an iterable of blocks, one node per block
     for block in blocks:
-        cleaned_block = block.strip()
-        if cleaned_block:
-            filtered_blocks.append(cleaned_block)
-    return filtered_blocks
-
-
-def block_to_html_node(block):
-    block_type = block_to_block_type(block)
-    if block_type == BlockType.PARAGRAPH:
-        return paragraph_to_html_node(block)
-    if block_type == BlockType.HEADING:
-        return heading_to_html_node(block)
-    if block_type == BlockType.CODE:
-        return code_to_html_node(block)
-    if block_type == BlockType.OLIST:
-        return olist_to_html_node(block)
-    if block_type == BlockType.ULIST:
-        return ulist_to_html_node(block)
-    if block_type == BlockType.QUOTE:
-        return quote_to_html_node(block)
-    raise ValueError("invalid block type")
+        if block_cache is not None:
+            yield cached_block_to_html_node(block, block_cache, highlighter, images)
+        else:
+            yield block_to_html_node(block, highlighter, images)
+
+
+def located_blocks_to_html_nodes(located, block_cache=None, source=None, highlighter=None, images=None):
+    """
+    Lazily convert (line number, block) pairs, as scan_blocks yields them.
+
+    Args:
+        located (iterable): (line number, block) pairs.
+        block_cache (BlockCache): Optional cache of rendered blocks.
+        source (str): Name of the source for error messages, e.g. its path.
+        highlighter (Highlighter): Optional build-time highlighter for fenced
+            code blocks with a language tag.
+        images (ResponsiveImages): Optional sizes and variants of images, added
+            to their tags.
+
+    Yields:
+        HTMLNode: One node per block.
+
+    Raises:
+        MarkdownError: If a block cannot be converted. The message starts
+            with the source and the line the block starts on.
+    """
+    for line_number, block in located:
+        try:
+            if block_cache is not None:
+                node = cached_block_to_html_node(block, block_cache, highlighter, images)
+            else:
+                node = block_to_html_node(block, highlighter, images)
+        except Exception as e:
+            raise MarkdownError(f"{source or '<markdown>'}, line {line_number}: {e}", source, line_number) from e
+        yield node
+
+
+def cached_block_to_html_node(block, block_cache, highlighter=None, images=None):
+    # Cached blocks come back as a raw HTML fragment rather than a node tree,
+    # stored after the number of leaves the tree had so profiles still count
+    # them. Blocks linking to images are keyed on those images' attributes too.
+    extra = images.key(block) if images is not None else ""
+    entry = block_cache.get(block, extra)
+    if entry is None:
+        node = block_to_html_node(block, highlighter, images)
+        entry = f"{count_leaves(node)} {node.to_html()}"
+        block_cache.put(block, entry, extra)
+    leaves, html = entry.split(" ", 1)
+    return RawNode(html, int(leaves))
+
+def markdown_to_blocks(markdown):
+    return [block for _, block in scan_markdown(markdown)]
+
+
+def scan_markdown(markdown, source=None):
+    """
+    Lazily split a Markdown string into stripped blocks with their line numbers.
+
+    Blocks are separated by blank lines, except inside a fenced code block,
+    which stays one block even if it contains blank lines. The source is
+    only sliced once per block. A fence that is never closed is reported
+    and split on blank lines like ordinary text.
+
+    Args:
+        markdown (str): The Markdown text.
+        source (str): Name of the source for warnings, e.g. its path.
+
+    Yields:
+        tuple: (line number the block starts on, block text)
+    """
+    length = len(markdown)
+    pos = 0
+    line = 1
+    counted = 0
+    while pos < length:
+        end = markdown.find("\n\n", pos)
+        if end == -1:
+            end = length
+        block = markdown[pos:end].strip()
+        if block.startswith(FENCE):
+            # An even number of later fence lines means the fence is still open
+            markers = block.count("\n" + FENCE)
+            extended = end
+            while markers % 2 == 0 and extended < length:
+                next_end = markdown.find("\n\n", extended + 2)
+                if next_end == -1:
+                    next_end = length
+                markers += markdown.count("\n" + FENCE, extended, next_end)
+                extended = next_end
+            if markers % 2 == 0:
+                start = markdown.find(FENCE, pos)
+                _warn_unclosed_fence(source, line + markdown.count("\n", counted, start))
+            elif extended != end:
+                end = extended
+                block = markdown[pos:end].strip()
+        if block:
+            # Only whitespace comes before the block's first character
+            start = markdown.find(block[0], pos)
+            line += markdown.count("\n", counted, start)
+            counted = start
+            yield line, block
+        pos = end + 2
+
+
+def scan_blocks(lines, first_line=1, source=None):
+    """
+    Lazily group lines into stripped blocks with their line numbers.
+
+    The blocks are the ones scan_markdown finds in the joined text. Only the
+    current block is held in memory, so a file object can be passed straight
+    in; an open code fence holds its lines until it is closed.
+
+    Args:
+        lines (iterable): Lines of Markdown, with or without trailing newlines.
+        first_line (int): Line number of the first line. Defaults to 1.
+        source (str): Name of the source for warnings, e.g. its path.
+
+    Yields:
+        tuple: (line number the block starts on, block text)
+    """
+    current = []
+    current_line = first_line
+    fenced = None
+    markers = 0
+    for number, line in enumerate(lines, first_line):
+        if line.endswith("\n"):
+            line = line[:-1]
+        if not line:
+            if not current:
+                continue
+            if fenced and markers % 2 == 0:
+                # A blank line inside an open fence belongs to the code
+                current.append(line)
+                continue
+            yield from _join_lines(current, current_line)
+            current = []
+            fenced = None
+            continue
+        if not current:
+            current_line = number
+        current.append(line)
+        if fenced is None:
+            if line.strip():
+                fenced = line.lstrip().startswith(FENCE)
+                markers = 0
+        elif fenced and line.startswith(FENCE):
+            markers += 1
+    if current:
+        if not (fenced and markers % 2 == 0):
+            yield from _join_lines(current, current_line)
+            return
+        # Never closed, so the fence's blank lines separate blocks after all
+        _warn_unclosed_fence(source, current_line + next(i for i, line in enumerate(current) if line.strip()))
+        group_start = 0
+        for i, line in enumerate(current + [""]):
+            if not line:
+                yield from _join_lines(current[group_start:i], current_line + group_start)
+                group_start = i + 1
+
+
+def _join_lines(lines, first_line):
+    block = "\n".join(lines).strip()
+    if block:
+        yield first_line + next(i for i, line in enumerate(lines) if line.strip()), block
+
+
+def _warn_unclosed_fence(source, line):
+    logging.warning(f"Unclosed code fence at line {line}" + (f" of {source}" if source else ""))
+
+
+def iter_blocks(lines):
+    """
+    Lazily group lines into the same blocks markdown_to_blocks returns.
+
+    Args:
+        lines (iterable): Lines of Markdown, with or without trailing newlines.
+
+    Yields:
+        str: Each non-empty block.
+    """
+    for _, block in scan_blocks(lines):
+        yield block
+
+
+def block_to_html_node(block, highlighter=None, images=None):
+    block_type, lines = classify_block(block)
+    if highlighter is not None and block_type is BlockType.CODE:
+        return code_to_html_node(block, lines, highlighter)
+    node = BLOCK_CONVERTERS[block_type](block, lines)
+    if images is not None and "![" in block:
+        images.annotate(node)
+    return node
 
 
 def text_to_children(text):
+    if INLINE_MARKUP.search(text) is None:
+        INLINE_STATS["plain_text"] += 1
+        return [LeafNode(None, text, None)]
+    INLINE_STATS["parsed"] += 1
     text_nodes = text_to_textnodes(text)
     children = []
     for text_node in text_nodes:
@@ -85,63 +330,91 @@ def text_to_children(text):
     return children
 
 
-def paragraph_to_html_node(block):
-    lines = block.split("\n")
+def paragraph_to_html_node(block, lines=None):
+    if lines is None:
+        lines = block.split("\n")
     paragraph = " ".join(lines)
     children = text_to_children(paragraph)
     return ParentNode("p", children)
 
 
-def heading_to_html_node(block):
+def heading_to_html_node(block, lines=None):
     level = 0
     for char in block:
         if char == "#":
             level += 1
         else:
             break
-    if level + 1 >= len(block):
+    if level not in HEADING_TAGS or level + 1 >= len(block):
         raise ValueError(f"invalid heading level: {level}")
     text = block[level + 1 :]
     children = text_to_children(text)
-    return ParentNode(f"h{level}", children)
+    return ParentNode(HEADING_TAGS[level], children)
 
 
-def code_to_html_node(block):
+def code_to_html_node(block, lines=None, highlighter=None):
     if not block.startswith("```") or not block.endswith("```"):
         raise ValueError("invalid code block")
-    text = block[4:-3]
-    raw_text_node = TextNode(text, TextType.TEXT)
-    child = text_node_to_html_node(raw_text_node)
-    code = ParentNode("code", [child])
+    # The opening fence may name the language, e.g. ```python
+    info_end = block.find("\n")
+    if info_end == -1:
+        language, text = "", block[4:-3]
+    else:
+        info = block[3:info_end].split()
+        language, text = (info[0] if info else ""), block[info_end + 1:-3]
+    html = None
+    if highlighter is not None and language:
+        html = highlighter.highlight(text, language)
+    if html is not None:
+        child = RawNode(html)
+    else:
+        child = text_node_to_html_node(TextNode(text, TextType.TEXT))
+    props = {"class": f"language-{language}"} if language else None
+    code = ParentNode("code", [child], None, props)
     return ParentNode("pre", [code])
 
-def olist_to_html_node(block):
-    items = block.split("\n")
+def olist_to_html_node(block, lines=None):
+    if lines is None:
+        lines = block.split("\n")
     html_items = []
-    for item in items:
+    for item in lines:
         text = item[3:]
         children = text_to_children(text)
         html_items.append(ParentNode("li", children))
     return ParentNode("ol", html_items)
 
 
-def ulist_to_html_node(block):
-    items = block.split("\n")
+def ulist_to_html_node(block, lines=None):
+    if lines is None:
+        lines = block.split("\n")
     html_items = []
-    for item in items:
+    for item in lines:
         text = item[2:]
         children = text_to_children(text)
         html_items.append(ParentNode("li", children))
     return ParentNode("ul", html_items)
 
 
-def quote_to_html_node(block):
-    lines = block.split("\n")
+def quote_to_html_node(block, lines=None):
+    # Lines from classify_block were already checked to start with ">"
+    checked = lines is not None
+    if lines is None:
+        lines = block.split("\n")
     new_lines = []
     for line in lines:
-        if not line.startswith(">"):
+        if not checked and not line.startswith(">"):
             raise ValueError("invalid quote block")
         new_lines.append(line.lstrip(">").strip())
     content = " ".join(new_lines)
     children = text_to_children(content)
     return ParentNode("blockquote", children)
+
+
+BLOCK_CONVERTERS = {
+    BlockType.PARAGRAPH: paragraph_to_html_node,
+    BlockType.HEADING: heading_to_html_node,
+    BlockType.CODE: code_to_html_node,
+    BlockType.OLIST: olist_to_html_node,
+    BlockType.ULIST: ulist_to_html_node,
+    BlockType.QUOTE: quote_to_html_node,
+}
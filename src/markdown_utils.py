@@ -1,6 +1,17 @@
 import os
+import time
 import logging
-from markdown_blocks import markdown_to_html_node
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import chain
+from markdown_blocks import INLINE_STATS, iter_blocks, scan_blocks, located_blocks_to_html_nodes
+from manifest import file_digest
+from template import Template
+from profiling import TimedWriter, count_leaves
+from block_cache import BlockCache
+from highlight import Highlighter
+from frontmatter import read_front_matter, read_front_matter_lines, scan_front_matter
+from feeds import node_text
+from search_index import count_terms
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 
@@ -19,77 +30,280 @@ def extract_title(markdown):
     """
     blocks = markdown.split("\n\n")
     for block in blocks:
-        lines = block.strip().split("\n")
-        for line in lines:
-            line = line.strip()
-            if line.startswith("# ") and not line.startswith("##"):
-                return line[2:].strip()
+        title = block_title(block)
+        if title is not None:
+            return title
     raise ValueError("No h1 header found in Markdown")
 
-def generate_page(from_path, template_path, dest_path, basepath="/"):
+def read_title(from_path):
+    """
+    Read a page's title from its front matter or first h1 header.
+
+    Only reads the file as far as the title.
+
+    Args:
+        from_path (str): Path to the Markdown file.
+
+    Returns:
+        str: The page title.
+
+    Raises:
+        ValueError: If there is no title in the front matter and no h1 header.
+    """
+    with open(from_path, 'r', encoding='utf-8') as markdown_file:
+        metadata, lines = read_front_matter(markdown_file)
+        if metadata.get("title", "") != "":
+            return str(metadata["title"])
+        for block in iter_blocks(lines):
+            title = block_title(block)
+            if title is not None:
+                return title
+    raise ValueError("No h1 header found in Markdown")
+
+def block_title(block):
+    """
+    Extracts the h1 header from a single Markdown block.
+
+    Args:
+        block (str): The Markdown block to search.
+
+    Returns:
+        str: The text of the first h1 header line in the block, or None.
+    """
+    lines = block.strip().split("\n")
+    for line in lines:
+        line = line.strip()
+        if line.startswith("# ") and not line.startswith("##"):
+            return line[2:].strip()
+    return None
+
+def generate_page(from_path, template_path, dest_path, basepath="/", template=None, profile=False,
+                  block_cache=None, highlighter=None, images=None, record=False):
     """
     Generate an HTML page from a Markdown file using a template.
 
+    The Markdown is read and converted one block at a time and the HTML is
+    streamed into the output, so memory is bounded by the largest block
+    rather than the file. Only the blocks up to the one holding the h1 title
+    are held back, since the title is written before the content.
+
+    Front matter at the top of the file (between --- or +++ lines) is split
+    off the body. A non-empty `title` replaces the h1 title and `template` names
+    another template, relative to the directory of template_path.
+
     Args:
         from_path (str): Path to the input Markdown file.
         template_path (str): Path to the HTML template file.
         dest_path (str): Path where the output HTML file will be written.
         basepath (str): Base path for URLs (e.g., '/' or '/my-site/'). Defaults to '/'.
+        template (Template): Template already compiled for this basepath. When
+            omitted, template_path is read and compiled for this page only.
+        profile (bool): Whether to time the page's stages. Defaults to False.
+        block_cache (BlockCache): Optional cache of rendered blocks.
+        highlighter (Highlighter): Optional build-time highlighter for fenced
+            code blocks with a language tag.
+        images (ResponsiveImages): Optional sizes and variants of images, added
+            to their tags.
+        record (bool): Whether to collect the page's title and search term
+            counts while rendering it, for the sitemap, feed and search
+            index. Defaults to False.
+
+    Returns:
+        dict: With profile, the page's timings and counters for
+        BuildProfiler.add_page. With record, a "record" key holding
+        {"title", "terms": {term: count}}. None if neither was asked for.
 
     Raises:
         FileNotFoundError: If the Markdown or template file does not exist.
         ValueError: If the Markdown file has no h1 header or other parsing errors.
+            Blocks that fail to convert raise MarkdownError, naming the file
+            and line the block starts on.
     """
     logging.info(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    if profile:
+        started = time.perf_counter()
+        stats = {"parse": 0.0, "blocks": 0, "inline_nodes": 0}
+        inline_stats = dict(INLINE_STATS)
 
-    # Read the Markdown file
+    # Read and compile the template file unless the caller shares one
+    if template is None:
+        template = Template.from_file(template_path, basepath)
+
+    # Open the Markdown file
     if not os.path.exists(from_path):
         logging.error(f"Markdown file {from_path} does not exist")
         raise FileNotFoundError(f"Markdown file {from_path} does not exist")
-    with open(from_path, 'r', encoding='utf-8') as f:
-        markdown_content = f.read()
 
-    # Read the template file
-    if not os.path.exists(template_path):
-        logging.error(f"Template file {template_path} does not exist")
-        raise FileNotFoundError(f"Template file {template_path} does not exist")
-    with open(template_path, 'r', encoding='utf-8') as f:
-        template_content = f.read()
+    # Create destination directory if it doesn't exist
+    dest_dir = os.path.dirname(dest_path)
+    if dest_dir:
+        os.makedirs(dest_dir, exist_ok=True)
 
-    # Convert Markdown to HTML
-    html_node = markdown_to_html_node(markdown_content)
-    html_content = html_node.to_html()
+    tmp_path = f"{dest_path}.tmp"
+    with open(from_path, 'r', encoding='utf-8') as markdown_file:
+        metadata, lines, first_line = read_front_matter_lines(markdown_file)
+        blocks = scan_blocks(lines, first_line, from_path)
+        if "template" in metadata:
+            template = Template.from_file(page_template_path(template_path, metadata), basepath)
 
-    # Extract the title
-    title = extract_title(markdown_content)
+        # Extract the title from the front matter or the first blocks; an
+        # empty `title:` counts as missing
+        head = []
+        title = metadata.get("title")
+        title = str(title) if title is not None and title != "" else None
+        if title is None:
+            for located in blocks:
+                head.append(located)
+                title = block_title(located[1])
+                if title is not None:
+                    break
+        if title is None:
+            raise ValueError("No h1 header found in Markdown")
 
-    # Replace placeholders in the template
-    final_content = template_content.replace("{{ Title }}", title)
-    final_content = final_content.replace("{{ Content }}", html_content)
+        html_nodes = located_blocks_to_html_nodes(chain(head, blocks), block_cache, from_path, highlighter, images)
+        if record:
+            terms = {}
+            html_nodes = _recorded_nodes(html_nodes, terms)
+        if profile:
+            html_nodes = _profiled_nodes(html_nodes, stats)
 
-    # Replace href="/ and src="/ with basepath
-    final_content = final_content.replace('href="/', f'href="{basepath}')
-    final_content = final_content.replace('src="/', f'src="{basepath}')
+        def content_chunks():
+            # The same chunks as markdown_to_html_node(...).iter_html()
+            yield "<div>"
+            for html_node in html_nodes:
+                yield from html_node.iter_html()
+            yield "</div>"
 
-    # Create destination directory if it doesn't exist
-    dest_dir = os.path.dirname(dest_path)
-    if dest_dir:
-        os.makedirs(dest_dir, exist_ok=True)
+        if profile:
+            stream_started = time.perf_counter()
 
-    # Write the final HTML to the destination
-    with open(dest_path, 'w', encoding='utf-8') as f:
-        f.write(final_content)
+        # Stream the filled template (rewriting href="/ and src="/ with basepath)
+        # into a temporary file, so a failed page never leaves a partial output
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                out = TimedWriter(f) if profile else f
+                template.write(out, title, content_chunks())
+            os.replace(tmp_path, dest_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
     logging.info(f"Generated HTML file at {dest_path}")
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/"):
+    result = None
+    if profile:
+        finished = time.perf_counter()
+        stream_seconds = finished - stream_started
+        result = {
+            "path": from_path,
+            "seconds": finished - started,
+            "stages": {
+                # Opening the file and reading the front matter count as parsing
+                "parse": stream_started - started + stats["parse"],
+                "serialize": stream_seconds - stats["parse"] - out.seconds,
+                "write": out.seconds,
+            },
+            "counters": {
+                "blocks": stats["blocks"],
+                "inline_nodes": stats["inline_nodes"],
+                "plain_text_runs": INLINE_STATS["plain_text"] - inline_stats["plain_text"],
+                "parsed_text_runs": INLINE_STATS["parsed"] - inline_stats["parsed"],
+                "bytes_written": os.path.getsize(dest_path),
+            },
+        }
+    if record:
+        result = result if result is not None else {}
+        result["record"] = {"title": title, "terms": terms}
+    return result
+
+def page_template_path(template_path, metadata):
+    """
+    Return the template a page renders with.
+
+    Args:
+        template_path (str): Path to the default HTML template file.
+        metadata (dict): The page's front matter.
+
+    Returns:
+        str: The `template` named in the front matter, relative to the default
+        template's directory, or template_path itself.
+    """
+    if "template" not in metadata:
+        return template_path
+    return os.path.join(os.path.dirname(template_path), str(metadata["template"]))
+
+def _recorded_nodes(html_nodes, terms):
+    # Count the search terms in the text of each block for the page's record
+    for html_node in html_nodes:
+        count_terms(node_text(html_node), terms)
+        yield html_node
+
+def _profiled_nodes(html_nodes, stats):
+    # Time the reading and converting of each block and count what it produced
+    while True:
+        parse_started = time.perf_counter()
+        html_node = next(html_nodes, None)
+        stats["parse"] += time.perf_counter() - parse_started
+        if html_node is None:
+            return
+        stats["blocks"] += 1
+        stats["inline_nodes"] += count_leaves(html_node)
+        yield html_node
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/", manifest=None, jobs=1,
+                             profiler=None, block_cache=None, render_cache=None, include_drafts=False,
+                             site_index=None, site_outputs=None, search_index=None, highlighter=None,
+                             images=None, record_cache=None):
     """
     Recursively crawl the content directory and generate HTML pages for each Markdown file.
 
+    When a build manifest is given, pages whose Markdown, template, basepath,
+    linked images and generator version are unchanged since the last build
+    are skipped, and outputs of Markdown files that have been deleted are
+    removed. The manifest is saved once the crawl finishes.
+
+    When a render cache is given, every page that still needs building is first
+    looked up in it and copied from there on a hit; rendered pages are added
+    to it.
+
+    With jobs > 1, pages are rendered in a pool of worker processes. The output
+    is identical to a serial build.
+
+    Only the front matter of each file is read while crawling, to leave out
+    drafts and to notice pages that use another template.
+
     Args:
         dir_path_content (str): Path to the content directory containing Markdown files.
         template_path (str): Path to the HTML template file.
         dest_dir_path (str): Path to the destination directory for generated HTML files.
         basepath (str): Base path for URLs (e.g., '/' or '/my-site/'). Defaults to '/'.
+        manifest (BuildManifest): Optional manifest enabling incremental builds.
+        jobs (int): Number of worker processes. Defaults to 1 (serial).
+        profiler (BuildProfiler): Optional profiler collecting per-page timings.
+        block_cache (BlockCache): Optional cache of rendered blocks. Worker
+            processes each get their own cache with the same settings and
+            report their hit/miss counts back into this one.
+        render_cache (RenderCache): Optional cache of finished pages.
+        include_drafts (bool): Whether to build pages marked `draft: true`.
+            Defaults to False.
+        site_index (SiteIndex): Optional index of page metadata to bring up
+            to date. Only pages whose source changed are read for it.
+        site_outputs (SiteOutputs): Optional sitemap and feed writer that
+            every built page is added to, in crawl order, with the record
+            generate_page collects while rendering it. The caller closes it.
+        search_index (SearchIndexBuilder): Optional full-text index that every
+            built page is added to like site_outputs. The caller closes it.
+        highlighter (Highlighter): Optional build-time highlighter for fenced
+            code blocks. Worker processes each get their own, like the block
+            cache. Caches and the manifest must be salted to match.
+        images (ResponsiveImages): Optional sizes and variants of images, added
+            to their tags. Each page and block is cached under the attributes
+            of the images it links to, so changed images only rebuild the
+            pages that show them.
+        record_cache (RecordCache): Optional store of page records, so pages
+            that are skipped or copied from the render cache can still be
+            added to site_outputs and search_index. Without it, or when a
+            page's record is missing, such pages are rendered again.
 
     Raises:
         FileNotFoundError: If the content directory or template file does not exist.
@@ -100,10 +314,18 @@ def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, bas
         logging.error(f"Content directory {dir_path_content} does not exist")
         raise FileNotFoundError(f"Content directory {dir_path_content} does not exist")
 
-    # Check if template file exists
-    if not os.path.exists(template_path):
-        logging.error(f"Template file {template_path} does not exist")
-        raise FileNotFoundError(f"Template file {template_path} does not exist")
+    # Compile the template once for every page
+    template = Template.from_file(template_path, basepath)
+
+    hashing = (manifest is not None or render_cache is not None or site_index is not None
+               or record_cache is not None)
+    template_hash = file_digest(template_path) if hashing else None
+    seen_keys = set()
+    indexed_keys = set()
+    pages = []
+    skipped = 0
+    cached = 0
+    records = _RecordQueue([output for output in (site_outputs, search_index) if output is not None])
 
     # Crawl the content directory
     for root, dirs, files in os.walk(dir_path_content):
@@ -117,9 +339,211 @@ def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, bas
                 html_filename = os.path.splitext(relative_path)[0] + ".html"
                 dest_path = os.path.join(dest_dir_path, html_filename)
 
-                # Generate the HTML page
                 try:
-                    generate_page(markdown_path, template_path, dest_path, basepath)
+                    # Leave out drafts using a header-only scan of the front matter
+                    metadata = scan_front_matter(markdown_path)
+                    if metadata.get("draft") is True and not include_drafts:
+                        logging.info(f"Skipping draft {markdown_path}")
+                        continue
+
+                    # Skip pages whose inputs have not changed since the last build
+                    source_hash = file_digest(markdown_path) if hashing else None
+                    if site_index is not None:
+                        indexed_keys.add(relative_path)
+                        if not site_index.is_fresh(relative_path, source_hash):
+                            site_index.update(relative_path, source_hash, read_title(markdown_path), metadata)
+                    page_template_hash = template_hash
+                    if hashing and "template" in metadata:
+                        page_template_hash = file_digest(page_template_path(template_path, metadata))
+                    images_key = images.file_key(markdown_path) if hashing and images is not None else ""
                 except Exception as e:
                     logging.error(f"Failed to generate page for {markdown_path}: {str(e)}")
-                    raise
\ No newline at end of file
+                    raise
+                # Pages that are not rendered need a record from an earlier build
+                number = records.reserve() if records.consumers else None
+                record = None
+                if manifest is not None:
+                    seen_keys.add(relative_path)
+                    if manifest.is_fresh(relative_path, source_hash, page_template_hash, basepath, dest_path,
+                                         images_key):
+                        if number is not None and record_cache is not None:
+                            record = record_cache.get(source_hash)
+                        if number is None or record is not None:
+                            skipped += 1
+                            if number is not None:
+                                records.add(number, relative_path, metadata, record)
+                            continue
+
+                # Reuse a page rendered by an earlier build with the same inputs
+                cache_key = None
+                if render_cache is not None:
+                    cache_key = render_cache.key(source_hash, page_template_hash, basepath, images_key)
+                    if number is not None and record is None and record_cache is not None:
+                        record = record_cache.get(source_hash)
+                    if (number is None or record is not None) and render_cache.fetch(cache_key, dest_path):
+                        logging.info(f"Copied {dest_path} from render cache")
+                        cached += 1
+                        if manifest is not None:
+                            manifest.record(relative_path, source_hash, page_template_hash, basepath, dest_path,
+                                            images_key)
+                        if number is not None:
+                            records.add(number, relative_path, metadata, record)
+                        continue
+
+                pages.append((relative_path, markdown_path, dest_path, (source_hash, page_template_hash, images_key),
+                              cache_key, (number, metadata)))
+
+    # Generate the HTML pages
+    profile = profiler is not None
+    for page, result in _render_pages(pages, template_path, template, basepath, jobs, profile, block_cache,
+                                      highlighter, images, bool(records.consumers)):
+        relative_path, markdown_path, dest_path, hashes, cache_key, (number, metadata) = page
+        source_hash, page_template_hash, images_key = hashes
+        if number is not None:
+            record = result.pop("record")
+            records.add(number, relative_path, metadata, record)
+            if record_cache is not None:
+                record_cache.put(source_hash, record)
+        if profile:
+            profiler.add_page(result)
+        if manifest is not None:
+            manifest.record(relative_path, source_hash, page_template_hash, basepath, dest_path, images_key)
+        if render_cache is not None:
+            render_cache.store(cache_key, dest_path)
+
+    if manifest is not None:
+        manifest.remove_stale(seen_keys, dest_dir_path)
+        manifest.save()
+        logging.info(f"Skipped {skipped} unchanged page(s)")
+        if profile:
+            profiler.count("pages_skipped", skipped)
+
+    if site_index is not None:
+        site_index.retain(indexed_keys)
+
+    if render_cache is not None:
+        render_cache.prune()
+    if record_cache is not None:
+        record_cache.prune()
+        logging.info(f"Render cache: {cached} page(s) reused, {len(pages)} rendered")
+        if profile:
+            profiler.count("render_cache_hits", cached)
+
+    if block_cache is not None:
+        block_cache.prune()
+        stats = block_cache.stats()
+        logging.info(f"Block cache: {stats['hits']} hit(s), {stats['disk_hits']} disk hit(s), "
+                     f"{stats['misses']} miss(es), hit rate {stats['hit_rate']:.1%}")
+        if profile:
+            for name in ("hits", "disk_hits", "misses"):
+                profiler.count(f"block_cache_{name}", stats[name])
+
+    if highlighter is not None:
+        highlighter.cache.prune()
+        stats = highlighter.cache.stats()
+        logging.info(f"Highlight cache: {stats['hits']} hit(s), {stats['disk_hits']} disk hit(s), "
+                     f"{stats['misses']} miss(es), hit rate {stats['hit_rate']:.1%}")
+        if profile:
+            for name in ("hits", "disk_hits", "misses"):
+                profiler.count(f"highlight_cache_{name}", stats[name])
+
+class _RecordQueue:
+    """Hands page records to their consumers in crawl order, whatever order pages finish in."""
+
+    def __init__(self, consumers):
+        self.consumers = consumers
+        self.reserved = 0
+        self.next = 0
+        self.waiting = {}
+
+    def reserve(self):
+        """Return the position of the next page in crawl order."""
+        self.reserved += 1
+        return self.reserved - 1
+
+    def add(self, number, relative_path, metadata, record):
+        """Pass on the record of the page at a position, once every earlier page's was."""
+        self.waiting[number] = (relative_path, metadata, record)
+        while self.next in self.waiting:
+            relative_path, metadata, record = self.waiting.pop(self.next)
+            for consumer in self.consumers:
+                consumer.add_page(relative_path, metadata, record)
+            self.next += 1
+
+def _render_pages(pages, template_path, template, basepath, jobs, profile=False, block_cache=None,
+                  highlighter=None, images=None, record=False):
+    """
+    Render pages serially or across a process pool.
+
+    Yields (page, result) once each page is written, where result is what
+    generate_page returned.
+
+    On failure the offending Markdown path is logged, pending pages are
+    cancelled and the original exception is re-raised.
+    """
+    if jobs <= 1 or len(pages) <= 1:
+        for page in pages:
+            markdown_path, dest_path = page[1], page[2]
+            try:
+                result = generate_page(markdown_path, template_path, dest_path, basepath, template, profile,
+                                       block_cache, highlighter, images, record)
+            except Exception as e:
+                logging.error(f"Failed to generate page for {markdown_path}: {str(e)}")
+                raise
+            yield page, result
+        return
+
+    logging.info(f"Rendering {len(pages)} page(s) with {jobs} worker processes")
+    cache_settings = None
+    if block_cache is not None:
+        cache_settings = (block_cache.max_entries, block_cache.store_dir, block_cache.salt)
+    highlight_settings = highlighter.settings() if highlighter is not None else None
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(cache_settings, highlight_settings, images)) as executor:
+        futures = {
+            executor.submit(_generate_page_in_worker, page[1], template_path, page[2], basepath, template, profile,
+                            record): page
+            for page in pages
+        }
+        for future in as_completed(futures):
+            page = futures[future]
+            try:
+                result, cache_stats, highlight_stats = future.result()
+            except Exception as e:
+                logging.error(f"Failed to generate page for {page[1]}: {str(e)}")
+                for pending in futures:
+                    pending.cancel()
+                raise
+            if cache_stats is not None:
+                block_cache.merge_stats(cache_stats)
+            if highlight_stats is not None:
+                highlighter.cache.merge_stats(highlight_stats)
+            yield page, result
+
+# Per-process block cache, highlighter and image sizes of a pool worker, set up by _init_worker
+_worker_block_cache = None
+_worker_highlighter = None
+_worker_images = None
+
+def _init_worker(cache_settings, highlight_settings=None, images=None):
+    global _worker_block_cache, _worker_highlighter, _worker_images
+    if cache_settings is not None:
+        _worker_block_cache = BlockCache(*cache_settings)
+    if highlight_settings is not None:
+        _worker_highlighter = Highlighter(*highlight_settings)
+    _worker_images = images
+
+def _generate_page_in_worker(from_path, template_path, dest_path, basepath, template, profile, record=False):
+    # Returns what generate_page returned and this page's block and highlight cache hit/miss counts
+    caches = [_worker_block_cache, _worker_highlighter.cache if _worker_highlighter is not None else None]
+    before = [cache.stats() if cache is not None else None for cache in caches]
+    result = generate_page(from_path, template_path, dest_path, basepath, template, profile,
+                           _worker_block_cache, _worker_highlighter, _worker_images, record)
+    deltas = []
+    for cache, stats in zip(caches, before):
+        if cache is None:
+            deltas.append(None)
+        else:
+            after = cache.stats()
+            deltas.append({name: after[name] - stats[name] for name in ("hits", "disk_hits", "misses", "evictions")})
+    return result, deltas[0], deltas[1]
@@ -0,0 +1,134 @@
+import json
+import time
+
+# Page stages in the order generate_page runs them. Markdown is read as it
+# is parsed, so reading counts towards parse.
+PAGE_STAGES = ("parse", "serialize", "write")
+
+class TimedWriter:
+    """Wrap a text file object, adding up the time spent inside its write calls."""
+
+    __slots__ = ("fp", "seconds")
+
+    def __init__(self, fp):
+        self.fp = fp
+        self.seconds = 0.0
+
+    def write(self, text):
+        start = time.perf_counter()
+        self.fp.write(text)
+        self.seconds += time.perf_counter() - start
+
+def count_leaves(node):
+    """
+    Count the leaf nodes, i.e. inline spans and raw text, in an HTML node tree.
+
+    Args:
+        node (HTMLNode): Root of the tree.
+
+    Returns:
+        int: Number of nodes without children. A RawNode counts as the
+        leaves it was rendered from.
+    """
+    count = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.children:
+            stack.extend(node.children)
+        else:
+            count += getattr(node, "leaves", 1)
+    return count
+
+class BuildProfiler:
+    """
+    Collects per-stage timings, counters and per-page profiles for one build.
+
+    Build stages, such as copying static files or rendering all pages, are
+    wall-clock time. Page stages are added up over every page, so with
+    worker processes they are CPU time summed across workers and can exceed
+    the wall time of the pages stage.
+
+    Build code only calls into a profiler when one was passed in, so builds
+    without --profile skip the timing calls entirely.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.page_stages = {}
+        self.counters = {}
+        self.pages = []
+
+    def add_stage(self, name, seconds):
+        """Add wall-clock time spent in a build stage such as copying static files."""
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def count(self, name, amount=1):
+        """Increase a build counter."""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_page(self, page):
+        """
+        Record the profile returned by generate_page for one page.
+
+        Args:
+            page (dict): {"path", "seconds", "stages": {...}, "counters": {...}}
+        """
+        self.pages.append(page)
+        for name, seconds in page["stages"].items():
+            self.page_stages[name] = self.page_stages.get(name, 0.0) + seconds
+        for name, amount in page["counters"].items():
+            self.count(name, amount)
+        self.count("pages")
+
+    def slowest_pages(self, top=10):
+        """Return the top slowest page profiles, slowest first."""
+        return sorted(self.pages, key=lambda page: page["seconds"], reverse=True)[:top]
+
+    def to_dict(self, top=10):
+        """Return the report as JSON-serializable data."""
+        return {
+            "stages": self.stages,
+            "page_stages": self.page_stages,
+            "counters": self.counters,
+            "slowest_pages": self.slowest_pages(top),
+            "pages": self.pages,
+        }
+
+    def summary(self, top=10):
+        """
+        Format the report as a plain-text table.
+
+        Args:
+            top (int): Number of slowest pages to list. Defaults to 10.
+
+        Returns:
+            str: The summary table.
+        """
+        lines = _stage_table("stage (wall)", self.stages)
+        if self.page_stages:
+            lines.append("")
+            lines.extend(_stage_table("page stage (cpu)", self.page_stages))
+            lines.append("page stages are summed over pages, across all worker processes")
+        lines.append("")
+        lines.append(", ".join(f"{name}={amount}" for name, amount in self.counters.items()))
+        if self.pages:
+            lines.append("")
+            lines.append(f"slowest {min(top, len(self.pages))} page(s):")
+            for page in self.slowest_pages(top):
+                lines.append(f"{page['seconds'] * 1000:>10.2f} ms  {page['path']}")
+        return "\n".join(lines)
+
+    def write_report(self, path, top=10):
+        """Write the report as JSON."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(top), f, indent=2)
+
+def _stage_table(heading, stages):
+    total = sum(stages.values())
+    lines = [f"{heading:<20}{'seconds':>10}{'share':>8}"]
+    for name, seconds in stages.items():
+        share = seconds / total * 100 if total else 0.0
+        lines.append(f"{name:<20}{seconds:>10.4f}{share:>7.1f}%")
+    lines.append(f"{'total':<20}{total:>10.4f}")
+    return lines
@@ -0,0 +1,140 @@
+import os
+import shutil
+import hashlib
+import logging
+from manifest import GENERATOR_VERSION
+
+class RenderCache:
+    """
+    Content-addressed store of finished page HTML, shared across builds.
+
+    Pages are keyed on their Markdown bytes, template bytes, basepath, the
+    attributes of the images they link to and the generator version, so any
+    machine or build with the same inputs can reuse the output. Entries are
+    written through a temporary file and an atomic rename, which lets
+    parallel workers and concurrent builds share one local directory. The total size is capped by evicting the least recently used
+    entries; every hit refreshes an entry's mtime.
+    """
+
+    def __init__(self, cache_dir, max_bytes=512 * 1024 * 1024, salt=""):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.salt = salt
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, source_hash, template_hash, basepath, images=""):
+        """
+        Return the cache key of a page.
+
+        Args:
+            source_hash (str): Digest of the Markdown file.
+            template_hash (str): Digest of the template file.
+            basepath (str): Base path the page is rendered with.
+            images (str): ResponsiveImages.key() of the page, if any.
+
+        Returns:
+            str: Hex digest identifying the page output.
+        """
+        parts = (GENERATOR_VERSION, self.salt, source_hash, template_hash, basepath, images)
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.html")
+
+    def fetch(self, key, dest_path):
+        """
+        Copy a cached page to dest_path if present.
+
+        Args:
+            key (str): Cache key from key().
+            dest_path (str): Where the page should be written.
+
+        Returns:
+            bool: True on a hit, False on a miss.
+        """
+        path = self._path(key)
+        tmp_path = f"{dest_path}.tmp"
+        try:
+            dest_dir = os.path.dirname(dest_path)
+            if dest_dir:
+                os.makedirs(dest_dir, exist_ok=True)
+            shutil.copyfile(path, tmp_path)
+        except FileNotFoundError:
+            # Missing, or evicted by another build between lookup and copy
+            self.misses += 1
+            return False
+        os.replace(tmp_path, dest_path)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return True
+
+    def store(self, key, page_path):
+        """
+        Add a freshly rendered page to the cache.
+
+        Args:
+            key (str): Cache key from key().
+            page_path (str): Path of the rendered page.
+        """
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            shutil.copyfile(page_path, tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f"Could not store {page_path} in render cache {self.cache_dir}: {str(e)}")
+
+    def prune(self):
+        """Evict least recently used entries until the cache fits in max_bytes."""
+        evicted = prune_directory(self.cache_dir, self.max_bytes, ".html")
+        if evicted:
+            logging.info(f"Evicted {evicted} page(s) from render cache {self.cache_dir}")
+
+def prune_directory(cache_dir, max_bytes, extension):
+    """
+    Delete the least recently used entries of a cache directory until it fits in max_bytes.
+
+    Entries are ordered by mtime, so caches refresh it on every hit.
+
+    Args:
+        cache_dir (str): Directory holding the entries, in any layout.
+        max_bytes (int): Size cap of the entries in bytes.
+        extension (str): Extension of entry files, e.g. ".html". Other
+            files, such as temporary files of writes in progress, are left
+            alone.
+
+    Returns:
+        int: Number of entries deleted.
+    """
+    entries = []
+    total = 0
+    for root, dirs, files in os.walk(cache_dir):
+        for file in files:
+            if not file.endswith(extension):
+                continue
+            path = os.path.join(root, file)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+    if total <= max_bytes:
+        return 0
+    entries.sort()
+    evicted = 0
+    for mtime, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        evicted += 1
+    return evicted
@@ -0,0 +1,93 @@
+// Client-side search over the index written by `main.py --search-index`
+// (or --site-url).
+//
+//   import { search } from "/search.js";
+//   const results = await search("tom bombadil"); // [{url, title, score}, ...]
+//
+// Only meta.json, one term shard per query term and the document blocks of
+// the results are fetched. Pages must contain every query term.
+
+const indexUrl = new URL("search-index/", import.meta.url);
+const cache = new Map();
+
+function fetchJson(path) {
+  if (!cache.has(path)) {
+    cache.set(path, fetch(new URL(path, indexUrl)).then((response) => response.json()));
+  }
+  return cache.get(path);
+}
+
+// Same as tokenize() in search_index.py: NFC, lowercase, runs of letters and
+// digits, at most 40 code points long
+export function tokenize(text) {
+  return (text.normalize("NFC").toLowerCase().match(/[\p{L}\p{N}]+/gu) || [])
+    .filter((term) => [...term].length <= 40);
+}
+
+// FNV-1a of the term's UTF-8 bytes, as term_shard() in search_index.py
+function termShard(term, shards) {
+  let hash = 0x811c9dc5;
+  for (const byte of new TextEncoder().encode(term)) {
+    hash = Math.imul(hash ^ byte, 0x01000193) >>> 0;
+  }
+  return hash % shards;
+}
+
+// Postings are base64 varint pairs of (document id gap, term count)
+export function decodePostings(encoded) {
+  const bytes = Uint8Array.from(atob(encoded), (c) => c.charCodeAt(0));
+  const postings = new Map();
+  let doc = -1;
+  let i = 0;
+  const next = () => {
+    let value = 0;
+    let scale = 1;
+    let byte;
+    do {
+      byte = bytes[i++];
+      value += (byte & 0x7f) * scale;
+      scale *= 128;
+    } while (byte & 0x80);
+    return value;
+  };
+  while (i < bytes.length) {
+    doc += next();
+    postings.set(doc, next());
+  }
+  return postings;
+}
+
+export async function search(query, limit = 20) {
+  const terms = [...new Set(tokenize(query))];
+  if (terms.length === 0) {
+    return [];
+  }
+  const meta = await fetchJson("meta.json");
+  const lists = await Promise.all(terms.map(async (term) => {
+    const shard = await fetchJson(`terms/${termShard(term, meta.shards)}.json`);
+    return shard[term] ? decodePostings(shard[term]) : new Map();
+  }));
+  lists.sort((a, b) => a.size - b.size);
+
+  const scores = [];
+  for (const [doc, count] of lists[0]) {
+    let score = count;
+    for (const postings of lists.slice(1)) {
+      if (!postings.has(doc)) {
+        score = 0;
+        break;
+      }
+      score += postings.get(doc);
+    }
+    if (score > 0) {
+      scores.push([doc, score]);
+    }
+  }
+  scores.sort((a, b) => b[1] - a[1] || a[0] - b[0]);
+
+  return Promise.all(scores.slice(0, limit).map(async ([doc, score]) => {
+    const block = await fetchJson(`docs/${Math.floor(doc / meta.doc_block)}.json`);
+    const [url, title] = block[doc % meta.doc_block];
+    return { url, title, score };
+  }));
+}
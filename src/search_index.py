@@ -0,0 +1,173 @@
+import os
+import re
+import json
+import math
+import time
+import base64
+import shutil
+import logging
+import unicodedata
+from site_index import page_url
+
+# Runs of letters and digits, as [\p{L}\p{N}]+ in search.js
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+MAX_TOKEN_LENGTH = 40
+TERM_SHARD_BYTES = 64 * 1024
+DOC_BLOCK_SIZE = 500
+LOADER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "search.js")
+
+def tokenize(text):
+    """
+    Split text into lowercase search terms.
+
+    Text is NFC-normalized first, so composed and decomposed accents give
+    the same terms. Terms are runs of letters and digits; underscores and
+    other punctuation split them. search.js tokenizes queries the same
+    way, counting term length in code points as here.
+
+    Args:
+        text (str): Plain text.
+
+    Returns:
+        list: The terms, in order, with repeats.
+    """
+    text = unicodedata.normalize("NFC", text).lower()
+    return [token for token in TOKEN_PATTERN.findall(text) if len(token) <= MAX_TOKEN_LENGTH]
+
+def count_terms(text, terms):
+    """Add the count of each search term in text to a dict of term counts."""
+    for term in tokenize(text):
+        terms[term] = terms.get(term, 0) + 1
+
+def encode_varint(value, out):
+    """Append an unsigned integer to a bytearray as a LEB128 varint."""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def decode_postings(data):
+    """
+    Decode a term's postings.
+
+    Postings are (document id gap, term count) varint pairs. The first gap
+    counts from -1, so every gap is at least 1.
+
+    Args:
+        data (bytes): The encoded postings.
+
+    Returns:
+        list: (document id, term count) tuples in document order.
+    """
+    postings = []
+    values = []
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            values.append(value)
+            value = shift = 0
+    doc_id = -1
+    for gap, count in zip(values[::2], values[1::2]):
+        doc_id += gap
+        postings.append((doc_id, count))
+    return postings
+
+def term_shard(term, shards):
+    """
+    Return the shard a term is stored in: FNV-1a of its UTF-8 bytes, modulo shards.
+
+    search.js computes the same function to find a query term's shard.
+    """
+    h = 0x811C9DC5
+    for byte in term.encode("utf-8"):
+        h = ((h ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return h % shards
+
+class SearchIndexBuilder:
+    """
+    Builds the site's client-side inverted index of every page's text while pages are crawled.
+
+    Pages are added with the term counts generate_page collects while
+    rendering them, and their counts are appended to per-term postings,
+    which are delta-encoded as varints as they grow. When
+    closed, terms are hashed into as many shards as keep each shard around
+    TERM_SHARD_BYTES, and the page URLs and titles are written in blocks of
+    DOC_BLOCK_SIZE, so the browser fetches one small shard per query term
+    and only the document blocks of the results. search.js is copied next to
+    the index to run queries.
+    """
+
+    def __init__(self, dest_dir_path, basepath="/"):
+        self.dest_dir_path = dest_dir_path
+        self.basepath = basepath.rstrip("/")
+        self.postings = {}
+        self.docs = []
+        self.seconds = 0.0
+
+    def add_page(self, relative_path, metadata, record):
+        """
+        Add a page's terms to the index.
+
+        Args:
+            relative_path (str): Markdown path relative to the content directory.
+            metadata (dict): The page's front matter.
+            record (dict): The page's title and term counts, as generate_page
+                returns them.
+        """
+        started = time.perf_counter()
+        doc_id = len(self.docs)
+        self.docs.append([self.basepath + page_url(relative_path), record["title"]])
+        for term, count in record["terms"].items():
+            entry = self.postings.get(term)
+            if entry is None:
+                entry = self.postings[term] = [-1, bytearray()]
+            encode_varint(doc_id - entry[0], entry[1])
+            encode_varint(count, entry[1])
+            entry[0] = doc_id
+        self.seconds += time.perf_counter() - started
+
+    def close(self):
+        """
+        Write the index files and the loader, and log the index's build time and size.
+
+        Returns:
+            dict: pages, terms, bytes and seconds of the index.
+        """
+        started = time.perf_counter()
+        index_dir = os.path.join(self.dest_dir_path, "search-index")
+        if os.path.exists(index_dir):
+            shutil.rmtree(index_dir)
+        os.makedirs(os.path.join(index_dir, "terms"))
+        os.makedirs(os.path.join(index_dir, "docs"))
+
+        encoded_size = sum(len(term) + len(entry[1]) * 4 // 3 for term, entry in self.postings.items())
+        shards = max(1, math.ceil(encoded_size / TERM_SHARD_BYTES))
+        sharded = [{} for _ in range(shards)]
+        for term, (_, data) in self.postings.items():
+            sharded[term_shard(term, shards)][term] = base64.b64encode(bytes(data)).decode("ascii")
+
+        total = 0
+        for number, terms in enumerate(sharded):
+            total += self._write_json(os.path.join(index_dir, "terms", f"{number}.json"), terms)
+        for number, start in enumerate(range(0, len(self.docs), DOC_BLOCK_SIZE)):
+            total += self._write_json(os.path.join(index_dir, "docs", f"{number}.json"),
+                                      self.docs[start:start + DOC_BLOCK_SIZE])
+        total += self._write_json(os.path.join(index_dir, "meta.json"),
+                                  {"docs": len(self.docs), "doc_block": DOC_BLOCK_SIZE, "shards": shards})
+        shutil.copyfile(LOADER_PATH, os.path.join(self.dest_dir_path, "search.js"))
+        self.seconds += time.perf_counter() - started
+
+        pages = len(self.docs)
+        per_1k = 1000 / pages if pages else 0.0
+        logging.info(f"Search index: {pages} page(s), {len(self.postings)} term(s), {shards} shard(s), "
+                     f"{total / 1024:.1f} KiB in {self.seconds:.3f} s "
+                     f"({total / 1024 * per_1k:.1f} KiB and {self.seconds * per_1k:.3f} s per 1k pages)")
+        return {"pages": pages, "terms": len(self.postings), "bytes": total, "seconds": self.seconds}
+
+    def _write_json(self, path, data):
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return len(text.encode("utf-8"))
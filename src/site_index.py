@@ -0,0 +1,233 @@
+import os
+import re
+import json
+import hashlib
+import logging
+from manifest import GENERATOR_VERSION, remove_empty_parents
+from htmlnode import LeafNode, ParentNode
+from template import Template
+
+SLUG_PATTERN = re.compile(r"[^a-z0-9]+")
+
+def page_url(relative_path):
+    """
+    Return the site URL of a page from its Markdown path.
+
+    Args:
+        relative_path (str): Path of the Markdown file relative to content/.
+
+    Returns:
+        str: '/' for the home page, '/blog/tom' for blog/tom/index.md and
+        '/about.html' for about.md.
+    """
+    stem, _ = os.path.splitext(relative_path.replace(os.sep, "/"))
+    if stem == "index":
+        return "/"
+    if stem.endswith("/index"):
+        return "/" + stem[:-len("/index")]
+    return f"/{stem}.html"
+
+def slugify(text):
+    """Turn a tag into a lowercase URL path segment."""
+    return SLUG_PATTERN.sub("-", str(text).lower()).strip("-") or "tag"
+
+class SiteIndex:
+    """
+    Metadata of every page, collected while crawling content/ and kept between builds.
+
+    Entries are keyed by the page's Markdown path relative to the content
+    directory and remember the source hash they were read from, so a build
+    only reads the pages that changed. Listing pages are generated from the
+    index alone. A digest of each listing's content is recorded too, so only
+    the listings whose entries changed are rendered again.
+    """
+
+    def __init__(self, path=None, entries=None, listings=None):
+        self.path = path
+        self.entries = entries if entries is not None else {}
+        self.listings = listings if listings is not None else {}
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load an index from disk, starting empty if it is missing or unreadable.
+
+        Args:
+            path (str): Path to the index JSON file.
+
+        Returns:
+            SiteIndex: The loaded index.
+        """
+        if not os.path.exists(path):
+            return cls(path)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable site index {path}: {str(e)}")
+            return cls(path)
+        if data.get("version") != GENERATOR_VERSION:
+            return cls(path)
+        return cls(path, data.get("entries", {}), data.get("listings", {}))
+
+    def save(self):
+        """Write the index to disk atomically."""
+        dirname = os.path.dirname(self.path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": GENERATOR_VERSION, "entries": self.entries, "listings": self.listings},
+                      f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def is_fresh(self, key, source_hash):
+        """Check whether the entry of a page was read from the same source."""
+        entry = self.entries.get(key)
+        return entry is not None and entry["source_hash"] == source_hash
+
+    def update(self, key, source_hash, title, metadata):
+        """
+        Record the metadata of a page.
+
+        Args:
+            key (str): Markdown path relative to the content directory.
+            source_hash (str): Digest of the Markdown file.
+            title (str): The page title.
+            metadata (dict): The page's front matter.
+        """
+        tags = metadata.get("tags", [])
+        if not isinstance(tags, list):
+            tags = [tags] if tags != "" else []
+        self.entries[key] = {
+            "source_hash": source_hash,
+            "url": page_url(key),
+            "title": title,
+            "date": str(metadata["date"]) if "date" in metadata else None,
+            "tags": [str(tag) for tag in tags],
+            "summary": str(metadata["summary"]) if "summary" in metadata else None,
+        }
+
+    def retain(self, seen_keys):
+        """Drop the entries of pages that were deleted or are now drafts."""
+        for key in set(self.entries) - seen_keys:
+            del self.entries[key]
+
+    def listing_pages(self, per_page=10):
+        """
+        Work out every listing page from the entries.
+
+        Dated pages are posts. Each top-level section holding posts (e.g.
+        blog/) gets a paginated archive at <section>/archive/, and each tag
+        gets a paginated page at tags/<tag>/, next to a tags/ overview. Posts
+        are newest first.
+
+        Listings are built as HTML nodes rather than Markdown, so titles,
+        tags and summaries appear exactly as written and are escaped when
+        serialized.
+
+        Args:
+            per_page (int): Posts per listing page. Defaults to 10.
+
+        Returns:
+            list: (relative output path, title, content HTML) tuples.
+        """
+        posts = sorted((entry for entry in self.entries.values() if entry["date"]),
+                       key=lambda entry: (entry["date"], entry["url"]), reverse=True)
+        sections = {}
+        tags = {}
+        for entry in posts:
+            section = entry["url"].strip("/").split("/")[0]
+            if "/" in entry["url"].strip("/"):
+                sections.setdefault(section, []).append(entry)
+            for tag in entry["tags"]:
+                tags.setdefault(tag, []).append(entry)
+
+        listings = []
+        for section, entries in sorted(sections.items()):
+            listings.extend(_paginate(f"{section}/archive", f"{section.capitalize()} archive",
+                                      entries, per_page))
+        if tags:
+            items = [ParentNode("li", [_link(f"/tags/{slugify(tag)}", tag), LeafNode(None, f" ({len(entries)})")])
+                     for tag, entries in sorted(tags.items())]
+            content = ParentNode("div", [ParentNode("h1", [LeafNode(None, "Tags")]), ParentNode("ul", items)])
+            listings.append(("tags/index.html", "Tags", content.to_html()))
+            for tag, entries in sorted(tags.items()):
+                listings.extend(_paginate(f"tags/{slugify(tag)}", f"Tagged {tag}", entries, per_page))
+        return listings
+
+def _link(url, text):
+    return LeafNode("a", text, {"href": url})
+
+def _paginate(directory, title, entries, per_page):
+    pages = [entries[i:i + per_page] for i in range(0, len(entries), per_page)]
+    listings = []
+    for number, chunk in enumerate(pages, start=1):
+        url = f"/{directory}" if number == 1 else f"/{directory}/{number}"
+        heading = title if number == 1 else f"{title} (page {number})"
+        items = []
+        for entry in chunk:
+            children = [LeafNode(None, f"{entry['date']} "), _link(entry["url"], entry["title"])]
+            if entry["summary"]:
+                children.append(LeafNode(None, f" - {entry['summary']}"))
+            items.append(ParentNode("li", children))
+        children = [ParentNode("h1", [LeafNode(None, heading)]), ParentNode("ul", items)]
+        links = []
+        if number > 1:
+            links.append(_link(f"/{directory}" + ("" if number == 2 else f"/{number - 1}"), "Newer"))
+        if number < len(pages):
+            links.append(_link(f"/{directory}/{number + 1}", "Older"))
+        if links:
+            if len(links) == 2:
+                links.insert(1, LeafNode(None, " | "))
+            children.append(ParentNode("p", links))
+        listings.append((url.lstrip("/") + "/index.html", heading, ParentNode("div", children).to_html()))
+    return listings
+
+def generate_listings(site_index, template_path, dest_dir_path, basepath="/", per_page=10):
+    """
+    Write the listing pages of a site index into the output directory.
+
+    Listings whose Markdown, template and basepath are unchanged since the
+    last build and whose output still exists are left alone, and listings
+    that no longer exist are removed.
+
+    Args:
+        site_index (SiteIndex): Index updated by generate_pages_recursive.
+        template_path (str): Path to the HTML template file.
+        dest_dir_path (str): Output directory, e.g. docs/.
+        basepath (str): Base path for URLs (e.g., '/' or '/my-site/').
+        per_page (int): Posts per listing page. Defaults to 10.
+
+    Returns:
+        int: Number of listing pages written.
+    """
+    with open(template_path, 'r', encoding='utf-8') as f:
+        template_text = f.read()
+    template = None
+    written = 0
+    listings = {}
+    for relative_path, title, content in site_index.listing_pages(per_page):
+        digest = hashlib.sha256("\0".join((content, template_text, basepath)).encode("utf-8")).hexdigest()
+        listings[relative_path] = digest
+        dest_path = os.path.join(dest_dir_path, relative_path)
+        if site_index.listings.get(relative_path) == digest and os.path.exists(dest_path):
+            continue
+        if template is None:
+            template = Template(template_text, basepath)
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        with open(dest_path, 'w', encoding='utf-8') as f:
+            f.write(template.render(title, content))
+        logging.info(f"Generated listing {dest_path}")
+        written += 1
+
+    for relative_path in set(site_index.listings) - set(listings):
+        dest_path = os.path.join(dest_dir_path, relative_path)
+        if os.path.exists(dest_path):
+            logging.info(f"Removing stale listing {dest_path}")
+            os.remove(dest_path)
+            remove_empty_parents(os.path.dirname(dest_path), dest_dir_path)
+    site_index.listings = listings
+    if site_index.path is not None:
+        site_index.save()
+    return written
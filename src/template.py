@@ -0,0 +1,148 @@
+import os
+import re
+import logging
+from htmlnode import escape_text
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{ (Title|Content) \}\}")
+
+def rewrite_basepath(html, basepath):
+    """
+    Point root-relative href and src attributes at the basepath.
+
+    Args:
+        html (str): HTML text to rewrite.
+        basepath (str): Base path for URLs (e.g., '/' or '/my-site/').
+
+    Returns:
+        str: The rewritten HTML.
+    """
+    if basepath == "/":
+        return html
+    html = html.replace('href="/', f'href="{basepath}')
+    return html.replace('src="/', f'src="{basepath}')
+
+# Longest suffix that could still grow into href="/ or src="/ in the next chunk
+_PATTERN_PREFIXES = tuple(sorted(
+    {pattern[:i] for pattern in ('href="/', 'src="/') for i in range(1, len(pattern))},
+    key=len, reverse=True,
+))
+
+def rewrite_basepath_chunks(chunks, basepath):
+    """
+    Apply rewrite_basepath to a stream of HTML chunks.
+
+    A chunk tail that may be the start of href="/ or src="/ is held back until
+    the next chunk arrives, so the result equals rewriting the joined text.
+
+    Args:
+        chunks (iterable): HTML text chunks.
+        basepath (str): Base path for URLs (e.g., '/' or '/my-site/').
+
+    Yields:
+        str: Rewritten chunks.
+    """
+    if basepath == "/":
+        yield from chunks
+        return
+    pending = ""
+    for chunk in chunks:
+        text = pending + chunk
+        pending = ""
+        for prefix in _PATTERN_PREFIXES:
+            if text.endswith(prefix):
+                pending = prefix
+                text = text[:-len(prefix)]
+                break
+        if text:
+            yield rewrite_basepath(text, basepath)
+    if pending:
+        yield pending
+
+class Template:
+    """
+    An HTML template compiled once per build and shared by every page.
+
+    The template text is split into static segments and the {{ Title }} and
+    {{ Content }} slots. The basepath rewrite of the static segments is done
+    at compile time, so rendering a page only rewrites the page's own values
+    and joins the pieces together.
+    """
+
+    def __init__(self, text, basepath="/"):
+        self.basepath = basepath
+        self.segments = []
+        self.slots = []
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(text):
+            self.segments.append(rewrite_basepath(text[position:match.start()], basepath))
+            self.slots.append((len(self.segments), match.group(1)))
+            self.segments.append(None)
+            position = match.end()
+        self.segments.append(rewrite_basepath(text[position:], basepath))
+
+    @classmethod
+    def from_file(cls, template_path, basepath="/"):
+        """
+        Read and compile a template file.
+
+        Args:
+            template_path (str): Path to the HTML template file.
+            basepath (str): Base path for URLs. Defaults to '/'.
+
+        Returns:
+            Template: The compiled template.
+
+        Raises:
+            FileNotFoundError: If the template file does not exist.
+        """
+        if not os.path.exists(template_path):
+            logging.error(f"Template file {template_path} does not exist")
+            raise FileNotFoundError(f"Template file {template_path} does not exist")
+        with open(template_path, 'r', encoding='utf-8') as f:
+            return cls(f.read(), basepath)
+
+    def render(self, title, content):
+        """
+        Fill the template with a page's title and HTML content.
+
+        Args:
+            title (str): The page title, as plain text; it is HTML-escaped.
+            content (str): The page's HTML content.
+
+        Returns:
+            str: The final page HTML.
+        """
+        values = {
+            "Title": rewrite_basepath(escape_text(title), self.basepath),
+            "Content": rewrite_basepath(content, self.basepath),
+        }
+        parts = self.segments[:]
+        for index, name in self.slots:
+            parts[index] = values[name]
+        return "".join(parts)
+
+    def write(self, fp, title, content_chunks):
+        """
+        Stream the filled template into a file without building the page string.
+
+        Args:
+            fp: Writable text file object.
+            title (str): The page title, as plain text; it is HTML-escaped.
+            content_chunks (iterable): The page's HTML content in chunks, e.g.
+                from HTMLNode.iter_html(). Consumed once, at the first
+                {{ Content }} slot; later {{ Content }} slots reuse it.
+        """
+        content_chunks = rewrite_basepath_chunks(content_chunks, self.basepath)
+        if [name for _, name in self.slots].count("Content") > 1:
+            # Only a template repeating {{ Content }} needs the whole string
+            content_chunks = ["".join(content_chunks)]
+
+        slot_names = dict(self.slots)
+        for index, segment in enumerate(self.segments):
+            if segment is not None:
+                fp.write(segment)
+            elif slot_names[index] == "Title":
+                fp.write(rewrite_basepath(escape_text(title), self.basepath))
+            else:
+                for chunk in content_chunks:
+                    fp.write(chunk)
@@ -0,0 +1,27 @@
+import unittest
+from bench.corpus import SHAPES, generate_corpus
+from bench.pipeline import STAGES, run_pipeline
+from markdown_blocks import markdown_to_html_node
+
+class TestBenchmarkHarness(unittest.TestCase):
+    def test_corpus_is_deterministic(self):
+        self.assertEqual(generate_corpus(3, seed=7), generate_corpus(3, seed=7))
+        self.assertNotEqual(generate_corpus(3, seed=7), generate_corpus(3, seed=8))
+
+    def test_every_shape_renders(self):
+        for shape in SHAPES:
+            for page in generate_corpus(2, shape, blocks=5):
+                markdown_to_html_node(page).to_html()
+
+    def test_unknown_shape(self):
+        with self.assertRaises(ValueError):
+            generate_corpus(1, "tables")
+
+    def test_run_pipeline_reports_every_stage(self):
+        result = run_pipeline(generate_corpus(2, blocks=5), repeat=1)
+        self.assertEqual(set(result["stages"]), set(STAGES) | {"total"})
+        self.assertEqual(result["counters"]["pages"], 2)
+        self.assertGreater(result["counters"]["inline_nodes"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import os
+import shutil
+import tempfile
+from block_cache import BlockCache
+from markdown_blocks import markdown_to_html_node
+
+MARKDOWN = """# Title
+
+Shared **footer** with a [link](/about)
+
+- one
+- two
+
+Shared **footer** with a [link](/about)
+"""
+
+class TestBlockCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_miss_then_hit(self):
+        cache = BlockCache()
+        self.assertIsNone(cache.get("block"))
+        cache.put("block", "<p>block</p>")
+        self.assertEqual(cache.get("block"), "<p>block</p>")
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_lru_eviction(self):
+        cache = BlockCache(max_entries=2)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        cache.get("a")
+        cache.put("c", "C")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "A")
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(cache.stats()["entries"], 2)
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            BlockCache(max_entries=0)
+
+    def test_disk_store_is_reused(self):
+        BlockCache(store_dir=self.tmp).put("block", "<p>block</p>")
+        cache = BlockCache(store_dir=self.tmp)
+        self.assertEqual(cache.get("block"), "<p>block</p>")
+        self.assertEqual(cache.stats()["disk_hits"], 1)
+
+    def test_disk_store_is_pruned_least_recently_used_first(self):
+        cache = BlockCache(max_entries=1, store_dir=self.tmp, max_bytes=250)
+        for age, block in enumerate(("a", "b", "c")):
+            cache.put(block, block * 100)
+            os.utime(cache._path(cache.key(block)), (1000 + age, 1000 + age))
+        # A disk hit refreshes "a", so "b" is the least recently used
+        self.assertEqual(cache.get("a"), "a" * 100)
+        with self.assertLogs(level="INFO"):
+            cache.prune()
+        cache = BlockCache(max_entries=1, store_dir=self.tmp)
+        self.assertEqual([cache.get(block) is not None for block in ("a", "b", "c")], [True, False, True])
+
+    def test_salt_changes_key(self):
+        self.assertNotEqual(BlockCache(salt="a").key("block"), BlockCache(salt="b").key("block"))
+
+    def test_markdown_to_html_node_output_unchanged(self):
+        cache = BlockCache()
+        expected = markdown_to_html_node(MARKDOWN).to_html()
+        self.assertEqual(markdown_to_html_node(MARKDOWN, cache).to_html(), expected)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(markdown_to_html_node(MARKDOWN, cache).to_html(), expected)
+        self.assertEqual(cache.stats()["hits"], 5)
+
+    def test_cached_fragments_are_not_escaped_again(self):
+        cache = BlockCache()
+        markdown = "[< Back](/?a=1&b=2)\n\n```\nif a < b:\n```"
+        expected = markdown_to_html_node(markdown).to_html()
+        self.assertIn('<a href="/?a=1&amp;b=2">&lt; Back</a>', expected)
+        markdown_to_html_node(markdown, cache)
+        self.assertEqual(markdown_to_html_node(markdown, cache).to_html(), expected)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+import unittest
+import os
+import shutil
+import tempfile
+import xml.etree.ElementTree as ElementTree
+from feeds import RecordCache, SiteOutputs, atom_date, node_text
+from htmlnode import RawNode
+from manifest import BuildManifest
+from markdown_blocks import block_to_html_node
+from markdown_utils import generate_pages_recursive
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+SITEMAP = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+class TestFeeds(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.content = os.path.join(self.tmp, "content")
+        self.dest = os.path.join(self.tmp, "docs")
+        os.makedirs(self.content)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def add_pages(self, outputs, count):
+        for i in range(count):
+            record = {"title": f"Post {i}", "terms": {"post": 1, str(i): 1}}
+            outputs.add_page(f"post{i}.md", {"date": f"2024-01-{i + 1:02d}"}, record)
+        outputs.close()
+
+    def test_node_text(self):
+        for block in ("Some **bold** [link](/x) ![alt](/a.png) & more", "- one\n- two _2_"):
+            node = block_to_html_node(block)
+            self.assertEqual(node_text(RawNode(node.to_html())), node_text(node))
+        self.assertEqual(node_text(block_to_html_node("Some **bold** [link](/x) ![alt](/a.png) & more")),
+                         "Some bold link  & more")
+        self.assertEqual(node_text(block_to_html_node("- one\n- two _2_")), " one two 2")
+
+    def test_record_cache(self):
+        cache = RecordCache(os.path.join(self.tmp, "records"))
+        self.assertIsNone(cache.get("abc"))
+        cache.put("abc", {"title": "Home", "terms": {"welcome": 1}})
+        self.assertEqual(cache.get("abc"), {"title": "Home", "terms": {"welcome": 1}})
+
+    def test_record_cache_is_pruned(self):
+        cache = RecordCache(os.path.join(self.tmp, "records"), max_bytes=160)
+        for age, source_hash in enumerate(("a", "b", "c")):
+            cache.put(source_hash, {"title": source_hash * 50, "terms": {}})
+            os.utime(cache._path(source_hash), (1000 + age, 1000 + age))
+        # A hit refreshes "a", so "b" is the least recently used
+        self.assertIsNotNone(cache.get("a"))
+        with self.assertLogs(level="INFO"):
+            cache.prune()
+        self.assertEqual([cache.get(source_hash) is not None for source_hash in ("a", "b", "c")], [True, False, True])
+
+    def test_atom_date(self):
+        self.assertEqual(atom_date("2024-05-01"), "2024-05-01T00:00:00Z")
+        self.assertEqual(atom_date("2024-05-01T10:00:00Z"), "2024-05-01T10:00:00Z")
+
+    def test_sitemap_and_feed(self):
+        outputs = SiteOutputs(self.dest, "https://example.com/", "/site/", feed_entries=2)
+        self.add_pages(outputs, 3)
+        sitemap = ElementTree.parse(os.path.join(self.dest, "sitemap.xml")).getroot()
+        locs = [loc.text for loc in sitemap.iter(f"{SITEMAP}loc")]
+        self.assertEqual(locs[0], "https://example.com/site/post0.html")
+        self.assertEqual(len(locs), 3)
+        feed = ElementTree.parse(os.path.join(self.dest, "feed.xml")).getroot()
+        titles = [entry.find(f"{ATOM}title").text for entry in feed.iter(f"{ATOM}entry")]
+        self.assertEqual(titles, ["Post 2", "Post 1"])
+        self.assertEqual(feed.find(f"{ATOM}updated").text, "2024-01-03T00:00:00Z")
+
+    def test_sitemap_is_sharded(self):
+        outputs = SiteOutputs(self.dest, "https://example.com", sitemap_shard_urls=2)
+        self.add_pages(outputs, 3)
+        index = ElementTree.parse(os.path.join(self.dest, "sitemap.xml")).getroot()
+        self.assertEqual([loc.text for loc in index.iter(f"{SITEMAP}loc")],
+                         ["https://example.com/sitemap-1.xml", "https://example.com/sitemap-2.xml"])
+        shard = ElementTree.parse(os.path.join(self.dest, "sitemap-2.xml")).getroot()
+        self.assertEqual(len(list(shard.iter(f"{SITEMAP}url"))), 1)
+
+    def test_stale_sitemap_shards_are_removed(self):
+        self.add_pages(SiteOutputs(self.dest, "https://example.com", sitemap_shard_urls=2), 3)
+        self.add_pages(SiteOutputs(self.dest, "https://example.com"), 1)
+        self.assertEqual(sorted(name for name in os.listdir(self.dest) if name.startswith("sitemap")), ["sitemap.xml"])
+        sitemap = ElementTree.parse(os.path.join(self.dest, "sitemap.xml")).getroot()
+        self.assertEqual(len(list(sitemap.iter(f"{SITEMAP}url"))), 1)
+
+    def test_generate_pages_recursive_adds_pages(self):
+        template = os.path.join(self.tmp, "template.html")
+        self.write(template, "{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "draft.md"), "---\ndraft: true\n---\n# Draft")
+        outputs = SiteOutputs(self.dest, "https://example.com")
+        with self.assertLogs(level="INFO"):
+            generate_pages_recursive(self.content, template, self.dest, site_outputs=outputs)
+            outputs.close()
+        self.assertEqual(outputs.pages, 1)
+        feed = ElementTree.parse(os.path.join(self.dest, "feed.xml")).getroot()
+        self.assertEqual(feed.find(f"{ATOM}title").text, "Home")
+
+    def build(self, template, **kwargs):
+        outputs = SiteOutputs(self.dest, "https://example.com")
+        with self.assertLogs(level="INFO") as logs:
+            generate_pages_recursive(self.content, template, self.dest, site_outputs=outputs, **kwargs)
+            outputs.close()
+        sitemap = ElementTree.parse(os.path.join(self.dest, "sitemap.xml")).getroot()
+        feed = ElementTree.parse(os.path.join(self.dest, "feed.xml")).getroot()
+        return ([loc.text for loc in sitemap.iter(f"{SITEMAP}loc")]
+                + [entry.find(f"{ATOM}title").text for entry in feed.iter(f"{ATOM}entry")]), logs.output
+
+    def test_records_come_from_rendering_in_crawl_order(self):
+        template = os.path.join(self.tmp, "template.html")
+        self.write(template, "{{ Content }}")
+        for i in range(6):
+            self.write(os.path.join(self.content, f"post{i}.md"), f"---\ndate: 2024-01-0{i + 1}\n---\n# Post {i}")
+        serial, _ = self.build(template)
+        parallel, _ = self.build(template, jobs=3)
+        self.assertEqual(parallel, serial)
+        self.assertIn("Post 3", serial)
+
+    def test_skipped_pages_use_cached_records(self):
+        template = os.path.join(self.tmp, "template.html")
+        self.write(template, "{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "---\ndate: 2024-01-01\n---\n# Home\n\nWelcome")
+        manifest_path = os.path.join(self.tmp, "manifest.json")
+        record_cache = RecordCache(os.path.join(self.tmp, "records"))
+        first, _ = self.build(template, manifest=BuildManifest.load(manifest_path), record_cache=record_cache)
+        second, logs = self.build(template, manifest=BuildManifest.load(manifest_path), record_cache=record_cache)
+        self.assertEqual(second, first)
+        self.assertFalse(any("Generated HTML file" in line for line in logs))
+        # Without its record, a skipped page is rendered again
+        second, logs = self.build(template, manifest=BuildManifest.load(manifest_path))
+        self.assertEqual(second, first)
+        self.assertTrue(any("Generated HTML file" in line for line in logs))
+
+    def test_failing_page_is_named(self):
+        template = os.path.join(self.tmp, "template.html")
+        self.write(template, "{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nBroken **bold")
+        outputs = SiteOutputs(self.dest, "https://example.com")
+        with self.assertLogs(level="INFO") as logs, self.assertRaises(ValueError):
+            generate_pages_recursive(self.content, template, self.dest, site_outputs=outputs)
+        self.assertTrue(any("Failed to generate page for" in line and "index.md" in line for line in logs.output))
+
+if __name__ == "__main__":
+    unittest.main()
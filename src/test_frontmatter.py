@@ -0,0 +1,151 @@
+import unittest
+import io
+import os
+import shutil
+import tempfile
+from frontmatter import FrontMatterError, read_front_matter, scan_front_matter, split_front_matter
+from markdown_utils import generate_page, generate_pages_recursive, read_title
+
+class TestSplitFrontMatter(unittest.TestCase):
+    def test_yaml(self):
+        metadata, body = split_front_matter(
+            "---\ntitle: \"Hello: World\"\ndate: 2024-05-01\ndraft: false\norder: 3\n---\n# Body\n"
+        )
+        self.assertEqual(metadata, {"title": "Hello: World", "date": "2024-05-01", "draft": False, "order": 3})
+        self.assertEqual(body, "# Body\n")
+
+    def test_yaml_lists(self):
+        metadata, _ = split_front_matter("---\ntags: [a, b]\nauthors:\n  - Ann\n  - Bo\n---\n")
+        self.assertEqual(metadata, {"tags": ["a", "b"], "authors": ["Ann", "Bo"]})
+
+    def test_toml(self):
+        metadata, body = split_front_matter("+++\ntitle = \"Hi\"\ndraft = true\ntags = [\"x\"]\n+++\ntext")
+        self.assertEqual(metadata, {"title": "Hi", "draft": True, "tags": ["x"]})
+        self.assertEqual(body, "text")
+
+    def test_toml_bare_word_is_an_error(self):
+        with self.assertRaises(FrontMatterError):
+            split_front_matter("+++\ntitle = Hi\n+++\n")
+
+    def test_no_front_matter(self):
+        self.assertEqual(split_front_matter("# Title\n---\n"), ({}, "# Title\n---\n"))
+        self.assertEqual(split_front_matter(""), ({}, ""))
+
+    def test_unclosed_delimiter_is_body(self):
+        self.assertEqual(split_front_matter("---\ntitle: x\n# Title\n"), ({}, "---\ntitle: x\n# Title\n"))
+        self.assertEqual(split_front_matter("---\n\n# Title\n\nText"), ({}, "---\n\n# Title\n\nText"))
+
+    def test_empty_value_is_empty_string(self):
+        metadata, _ = split_front_matter("---\nsummary:\ntags:\n  - a\ntitle: x\n---\n")
+        self.assertEqual(metadata, {"summary": "", "tags": ["a"], "title": "x"})
+
+    def test_malformed_line_reports_line_number(self):
+        with self.assertRaises(FrontMatterError) as context:
+            split_front_matter("+++\ntitle = \"x\"\nnot metadata\n+++\n")
+        self.assertIn("line 3", str(context.exception))
+
+    def test_rules_around_prose_are_body(self):
+        markdown = "---\n\n# Heading\n\nText\n\n---\n\nMore"
+        self.assertEqual(split_front_matter(markdown), ({}, markdown))
+        self.assertEqual(split_front_matter("---\ntitle: x\nnot metadata\n---\n"),
+                         ({}, "---\ntitle: x\nnot metadata\n---\n"))
+
+    def test_read_leaves_body_unread(self):
+        f = io.StringIO("---\ntitle: x\n---\n# Body\n")
+        read_front_matter(f)
+        self.assertEqual(f.readline(), "# Body\n")
+
+class TestFrontMatterPages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.content = os.path.join(self.tmp, "content")
+        self.dest = os.path.join(self.tmp, "docs")
+        self.template = os.path.join(self.tmp, "template.html")
+        os.makedirs(self.content)
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_scan_reads_only_the_header(self):
+        path = os.path.join(self.content, "big.md")
+        # The end of the body is not valid UTF-8, so reading it would fail
+        with open(path, "wb") as f:
+            f.write(b"---\ndraft: true\n---\n" + b"text\n" * 100000 + b"\xff")
+        self.assertEqual(scan_front_matter(path), {"draft": True})
+
+    def test_title_and_body(self):
+        source = os.path.join(self.content, "index.md")
+        self.write(source, "---\ntitle: From metadata\n---\nJust text\n\n# Heading")
+        dest = os.path.join(self.dest, "index.html")
+        with self.assertLogs(level="INFO"):
+            generate_page(source, self.template, dest)
+        self.assertEqual(self.read(dest),
+                         "<title>From metadata</title><div><p>Just text</p><h1>Heading</h1></div>")
+
+    def test_page_starting_with_thematic_break(self):
+        source = os.path.join(self.content, "index.md")
+        self.write(source, "---\n\n# Heading\n\nText")
+        self.assertEqual(scan_front_matter(source), {})
+        dest = os.path.join(self.dest, "index.html")
+        with self.assertLogs(level="INFO"):
+            generate_page(source, self.template, dest)
+        self.assertEqual(self.read(dest), "<title>Heading</title><div><p>---</p><h1>Heading</h1><p>Text</p></div>")
+
+    def test_leading_rule_with_later_rule(self):
+        # The generator has no thematic break block, so the rules stay
+        # paragraphs exactly as before front matter was supported
+        source = os.path.join(self.content, "index.md")
+        self.write(source, "---\n\n# Heading\n\nText\n\n---\n\nMore")
+        self.assertEqual(scan_front_matter(source), {})
+        dest = os.path.join(self.dest, "index.html")
+        with self.assertLogs(level="INFO"):
+            generate_pages_recursive(self.content, self.template, self.dest)
+        self.assertEqual(self.read(dest), "<title>Heading</title><div><p>---</p><h1>Heading</h1><p>Text</p>"
+                                          "<p>---</p><p>More</p></div>")
+
+    def test_empty_title_falls_back_to_heading(self):
+        source = os.path.join(self.content, "index.md")
+        self.write(source, "---\ntitle:\n---\n# Heading")
+        dest = os.path.join(self.dest, "index.html")
+        with self.assertLogs(level="INFO"):
+            generate_page(source, self.template, dest)
+        self.assertEqual(self.read(dest), "<title>Heading</title><div><h1>Heading</h1></div>")
+        self.assertEqual(read_title(source), "Heading")
+
+    def test_front_matter_error_names_the_page(self):
+        self.write(os.path.join(self.content, "index.md"), "+++\ntitle = Hi\n+++\n# Heading")
+        with self.assertLogs(level="INFO") as logs, self.assertRaises(FrontMatterError):
+            generate_pages_recursive(self.content, self.template, self.dest)
+        self.assertTrue(any("Failed to generate page for" in line and "index.md" in line for line in logs.output))
+
+    def test_template_override(self):
+        self.write(os.path.join(self.tmp, "post.html"), "<article>{{ Content }}</article>")
+        source = os.path.join(self.content, "index.md")
+        self.write(source, "---\ntemplate: post.html\n---\n# Post")
+        dest = os.path.join(self.dest, "index.html")
+        with self.assertLogs(level="INFO"):
+            generate_page(source, self.template, dest)
+        self.assertEqual(self.read(dest), "<article><div><h1>Post</h1></div></article>")
+
+    def test_drafts_are_skipped_unless_included(self):
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "draft.md"), "---\ndraft: true\n---\n# Draft")
+        with self.assertLogs(level="INFO"):
+            generate_pages_recursive(self.content, self.template, self.dest)
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "draft.html")))
+        with self.assertLogs(level="INFO"):
+            generate_pages_recursive(self.content, self.template, self.dest, include_drafts=True)
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "draft.html")))
+
+if __name__ == "__main__":
+    unittest.main()
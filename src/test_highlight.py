@@ -0,0 +1,85 @@
+import unittest
+import os
+import shutil
+import tempfile
+from highlight import Highlighter, highlight
+from markdown_blocks import markdown_to_html_node
+from markdown_utils import generate_pages_recursive
+from block_cache import BlockCache
+
+CODE = '@cached\ndef f(x=1):  # "a" < b\n    return "x" if x is None else 0x1F\n'
+
+class TestHighlight(unittest.TestCase):
+    def test_python(self):
+        self.assertEqual(
+            highlight(CODE, "python"),
+            '<span class="nd">@cached</span>\n<span class="k">def</span> f(x=<span class="m">1</span>):  '
+            '<span class="c"># "a" &lt; b</span>\n    <span class="k">return</span> <span class="s">"x"</span> '
+            '<span class="k">if</span> x <span class="k">is</span> <span class="kc">None</span> '
+            '<span class="k">else</span> <span class="m">0x1F</span>\n',
+        )
+
+    def test_aliases_and_other_languages(self):
+        self.assertEqual(highlight("let s = `a<b` // c", "JS"),
+                         '<span class="k">let</span> s = <span class="s">`a&lt;b`</span> <span class="c">// c</span>')
+        self.assertEqual(highlight('echo "$HOME" ${x} # c', "sh"),
+                         '<span class="nb">echo</span> <span class="s">"$HOME"</span> <span class="nv">${x}</span> '
+                         '<span class="c"># c</span>')
+        self.assertEqual(highlight('{"a": [-1, "b", null]}', "json"),
+                         '{<span class="nt">"a"</span>: [<span class="m">-1</span>, <span class="s">"b"</span>, '
+                         '<span class="kc">null</span>]}')
+
+    def test_unknown_language(self):
+        self.assertIsNone(highlight("x", "cobol"))
+        highlighter = Highlighter()
+        self.assertIsNone(highlighter.highlight("x", "cobol"))
+        self.assertIsNone(highlighter.highlight("x", "cobol"))
+
+    def test_code_blocks(self):
+        highlighter = Highlighter()
+        md = f"```python\n{CODE}```\n\n```\nplain < text\n```\n\n```cobol\nA < B\n```"
+        html = markdown_to_html_node(md, highlighter=highlighter).to_html()
+        self.assertIn(f'<pre><code class="language-python">{highlight(CODE, "python")}</code></pre>', html)
+        self.assertIn("<pre><code>plain &lt; text\n</code></pre>", html)
+        self.assertIn('<pre><code class="language-cobol">A &lt; B\n</code></pre>', html)
+        # Cached blocks keep the highlighted HTML as it is
+        cached = markdown_to_html_node(md, BlockCache(), highlighter).to_html()
+        self.assertEqual(cached, html)
+
+    def test_results_are_cached_by_language_and_code(self):
+        highlighter = Highlighter()
+        md = f"```python\n{CODE}```"
+        markdown_to_html_node(f"{md}\n\n{md}\n\n```py\n{CODE}```", highlighter=highlighter)
+        stats = highlighter.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+
+class TestHighlightBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.content = os.path.join(self.tmp, "content")
+        self.template = os.path.join(self.tmp, "template.html")
+        for i in range(3):
+            page_dir = os.path.join(self.content, f"post{i}")
+            os.makedirs(page_dir)
+            with open(os.path.join(page_dir, "index.md"), "w") as f:
+                f.write(f"# Post {i}\n\n```python\n{CODE}```")
+        with open(self.template, "w") as f:
+            f.write("{{ Content }}")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_parallel_build_uses_worker_highlighters(self):
+        store_dir = os.path.join(self.tmp, "highlight")
+        highlighter = Highlighter(store_dir=store_dir)
+        dest = os.path.join(self.tmp, "docs")
+        with self.assertLogs(level="INFO") as logs:
+            generate_pages_recursive(self.content, self.template, dest, jobs=2, highlighter=highlighter)
+        self.assertTrue(any("Highlight cache:" in line for line in logs.output))
+        self.assertEqual(sum(highlighter.cache.stats()[name] for name in ("hits", "disk_hits", "misses")), 3)
+        with open(os.path.join(dest, "post1", "index.html")) as f:
+            self.assertIn('<span class="nd">@cached</span>', f.read())
+        self.assertTrue(os.listdir(store_dir))
+
+if __name__ == "__main__":
+    unittest.main()
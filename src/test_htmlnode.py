@@ -1,5 +1,6 @@
 import unittest
-from htmlnode import HTMLNode, LeafNode, ParentNode
+import io
+from htmlnode import HTMLNode, LeafNode, ParentNode, RawNode, escape_attr, escape_text
 
 class TestHTMLNode(unittest.TestCase):
     def test_none(self):
@@ -41,7 +42,46 @@ class TestHTMLNode(unittest.TestCase):
             parent_node.to_html(),
             "<div><span><b>grandchild</b></span></div>",
         )
-        
+
+
+    def test_write_html_matches_to_html(self):
+        node = ParentNode("div", [
+            ParentNode("p", [LeafNode(None, "Hi "), LeafNode("b", "there"), LeafNode("a", "x", {"href": "/x"})]),
+            ParentNode("ul", [ParentNode("li", [LeafNode(None, "one")]), ParentNode("li", [])]),
+        ])
+        fp = io.StringIO()
+        node.write_html(fp)
+        self.assertEqual(fp.getvalue(), node.to_html())
+
+    def test_iter_html_yields_chunks(self):
+        node = ParentNode("p", [LeafNode("b", "x"), LeafNode(None, "y")])
+        self.assertEqual(list(node.iter_html()), ["<p>", "<b>x</b>", "y", "</p>"])
+
+    def test_iter_html_requires_tag(self):
+        with self.assertRaises(ValueError):
+            list(ParentNode(None, [LeafNode(None, "x")]).iter_html())
+
+    def test_slots(self):
+        for node in (HTMLNode("p"), LeafNode("b", "x"), ParentNode("div", [])):
+            self.assertFalse(hasattr(node, "__dict__"))
+
+    def test_escaping(self):
+        node = ParentNode("p", [LeafNode(None, "1 < 2 & \"3\""), LeafNode("a", "<b>", {"href": '/x?a=1&b="2"'})])
+        self.assertEqual(node.to_html(), '<p>1 &lt; 2 &amp; "3"<a href="/x?a=1&amp;b=&quot;2&quot;">&lt;b&gt;</a></p>')
+        self.assertEqual("".join(node.iter_html()), node.to_html())
+
+    def test_escape_returns_plain_strings_as_is(self):
+        text = "plain text"
+        self.assertIs(escape_text(text), text)
+        self.assertIs(escape_attr(text), text)
+        self.assertEqual(escape_text("&amp;"), "&amp;amp;")
+
+    def test_raw_node(self):
+        node = ParentNode("div", [RawNode("<p>a &amp; b</p>"), LeafNode(None, "<")])
+        self.assertEqual(node.to_html(), "<div><p>a &amp; b</p>&lt;</div>")
+
+    def test_repr(self):
+        self.assertEqual(repr(LeafNode("b", "x")), "LeafNode(b, x, None)")
 
 
 if __name__ == "__main__":
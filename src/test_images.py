@@ -0,0 +1,201 @@
+import unittest
+import os
+import json
+import shutil
+import tempfile
+from unittest import mock
+from images import Image, ResponsiveImages, build_image_variants, variant_path
+from markdown_blocks import markdown_to_html_node
+from markdown_utils import generate_pages_recursive
+from block_cache import BlockCache
+from manifest import BuildManifest
+from render_cache import RenderCache
+
+IMAGES = {
+    "/images/big.png": {"width": 1200, "height": 600, "ext": ".jpg", "variants": [480, 960], "key": "ab12"},
+    "/images/small.png": {"width": 300, "height": 200, "ext": ".png", "variants": [], "key": "cd34"},
+}
+
+class TestResponsiveImages(unittest.TestCase):
+    def test_variant_path(self):
+        self.assertEqual(variant_path("/images/tom.png", 480, ".jpg"), "/images/tom-480w.jpg")
+
+    def test_props(self):
+        images = ResponsiveImages(IMAGES, "/site/")
+        self.assertEqual(images.props("/images/big.png"), {
+            "width": "1200",
+            "height": "600",
+            "srcset": "/site/images/big-480w.jpg 480w, /site/images/big-960w.jpg 960w, /site/images/big.png 1200w",
+            "sizes": "(max-width: 840px) 100vw, 800px",
+            "loading": "lazy",
+        })
+        self.assertEqual(images.props("/images/small.png"), {"width": "300", "height": "200", "loading": "lazy"})
+        self.assertIsNone(images.props("https://example.com/x.png"))
+
+    def test_image_tags(self):
+        images = ResponsiveImages(IMAGES)
+        md = "![Small](/images/small.png) and ![Remote](https://example.com/x.png)"
+        expected = ('<div><p><image src="/images/small.png" alt="Small" width="300" height="200" loading="lazy">'
+                    '</image> and <image src="https://example.com/x.png" alt="Remote"></image></p></div>')
+        self.assertEqual(markdown_to_html_node(md, images=images).to_html(), expected)
+        self.assertEqual(markdown_to_html_node(md, BlockCache(), images=images).to_html(), expected)
+
+    def test_key_follows_linked_images_only(self):
+        images = ResponsiveImages(IMAGES)
+        block = "![Big](/images/big.png)"
+        self.assertEqual(images.key("No images [here](/x)"), "")
+        self.assertEqual(ResponsiveImages(dict(IMAGES)).key(block), images.key(block))
+        self.assertNotEqual(ResponsiveImages(IMAGES, "/site/").key(block), images.key(block))
+        # Other images and the basepath of images without variants do not matter
+        self.assertEqual(ResponsiveImages({"/images/big.png": IMAGES["/images/big.png"]}).key(block), images.key(block))
+        small = "![Small](/images/small.png)"
+        self.assertEqual(ResponsiveImages(IMAGES, "/site/").key(small), images.key(small))
+        resized = dict(IMAGES, **{"/images/big.png": dict(IMAGES["/images/big.png"], variants=[480])})
+        self.assertNotEqual(ResponsiveImages(resized).key(block), images.key(block))
+
+    def test_block_cache_is_keyed_by_image_attributes(self):
+        cache = BlockCache()
+        md = "![Big](/images/big.png)"
+        first = markdown_to_html_node(md, cache, images=ResponsiveImages(IMAGES)).to_html()
+        second = markdown_to_html_node(md, cache, images=ResponsiveImages(IMAGES, "/site/")).to_html()
+        self.assertIn('srcset="/images/big-480w.jpg', first)
+        self.assertIn('srcset="/site/images/big-480w.jpg', second)
+        self.assertEqual(markdown_to_html_node("Text", cache, images=ResponsiveImages(IMAGES)).to_html(),
+                         markdown_to_html_node("Text", cache, images=ResponsiveImages(IMAGES, "/site/")).to_html())
+        self.assertEqual(cache.stats()["hits"], 1)
+
+class TestImageDependencies(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.content = os.path.join(self.tmp, "content")
+        self.dest = os.path.join(self.tmp, "docs")
+        self.template = os.path.join(self.tmp, "template.html")
+        self.manifest_path = os.path.join(self.tmp, "manifest.json")
+        os.makedirs(self.content)
+        for name, text in (("index.md", "# Home\n\n![Big](/images/big.png)"),
+                           ("small.md", "# Small\n\n![Small](/images/small.png)"),
+                           ("text.md", "# Text\n\nNo images")):
+            with open(os.path.join(self.content, name), "w") as f:
+                f.write(text)
+        with open(self.template, "w") as f:
+            f.write("{{ Content }}")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def build(self, images, **kwargs):
+        with self.assertLogs(level="INFO") as logs:
+            generate_pages_recursive(self.content, self.template, self.dest, "/",
+                                     BuildManifest.load(self.manifest_path), images=images, **kwargs)
+        return sorted(os.path.basename(line.split()[-1]) for line in logs.output if "Generated HTML file" in line)
+
+    def test_only_pages_showing_a_changed_image_are_rebuilt(self):
+        self.assertEqual(self.build(ResponsiveImages(IMAGES)), ["index.html", "small.html", "text.html"])
+        self.assertEqual(self.build(ResponsiveImages(IMAGES)), [])
+        resized = dict(IMAGES, **{"/images/big.png": dict(IMAGES["/images/big.png"], variants=[480])})
+        self.assertEqual(self.build(ResponsiveImages(resized)), ["index.html"])
+        with open(os.path.join(self.dest, "index.html")) as f:
+            self.assertNotIn("big-960w.jpg", f.read())
+        # Turning images off changes only the pages that show one
+        self.assertEqual(self.build(None), ["index.html", "small.html"])
+
+    def test_render_cache_is_keyed_by_image_attributes(self):
+        render_cache = RenderCache(os.path.join(self.tmp, "pages"))
+        self.build(ResponsiveImages(IMAGES), render_cache=render_cache)
+        os.remove(self.manifest_path)
+        self.assertEqual(self.build(ResponsiveImages(IMAGES, "/site/"), render_cache=render_cache), ["index.html"])
+
+class TestBuildImageVariants(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.static = os.path.join(self.tmp, "static")
+        self.cache = os.path.join(self.tmp, "cache")
+        self.dest = os.path.join(self.tmp, "docs")
+        os.makedirs(os.path.join(self.static, "images"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write_image(self, name, data):
+        with open(os.path.join(self.static, "images", name), "wb") as f:
+            f.write(data)
+
+    def build(self, **kwargs):
+        # Stand-in for Pillow: "broken" images fail like an unreadable file,
+        # every other image gets one variant and a meta.json in the cache
+        def encode(source_path, cache_path, widths):
+            with open(source_path, "rb") as f:
+                if f.read() == b"broken":
+                    raise OSError(f"cannot identify image file {source_path!r}")
+            os.makedirs(cache_path, exist_ok=True)
+            with open(os.path.join(cache_path, "480.jpg"), "wb") as f:
+                f.write(b"variant")
+            meta = {"width": 1000, "height": 500, "ext": ".jpg", "variants": [480]}
+            with open(os.path.join(cache_path, "meta.json"), "w") as f:
+                json.dump(meta, f)
+            return meta
+        with mock.patch("images.Image", object()), \
+                mock.patch("images.encode_variants", side_effect=encode) as encode_variants, \
+                self.assertLogs(level="INFO") as logs:
+            images = build_image_variants(self.static, self.cache, **kwargs)
+        return images, encode_variants.call_count, logs.output
+
+    def test_variants_are_cached_by_content(self):
+        self.write_image("a.png", b"a")
+        self.write_image("b.jpg", b"b")
+        images, calls, _ = self.build(basepath="/site/")
+        self.assertEqual((calls, images.encoded, images.reused), (2, 2, 0))
+        self.assertEqual(images.props("/images/a.png")["srcset"],
+                         "/site/images/a-480w.jpg 480w, /site/images/a.png 1000w")
+        node = markdown_to_html_node("![A](/images/a.png)", images=images)
+        self.assertIn('width="1000" height="500"', node.to_html())
+
+        self.write_image("b.jpg", b"changed")
+        again, calls, _ = self.build(basepath="/site/")
+        self.assertEqual((calls, again.encoded, again.reused), (1, 1, 1))
+        self.assertEqual(again.images["/images/a.png"], images.images["/images/a.png"])
+
+        again.copy_variants(self.dest)
+        with open(os.path.join(self.dest, "images", "a-480w.jpg"), "rb") as f:
+            self.assertEqual(f.read(), b"variant")
+
+    def test_unreadable_image_is_left_without_variants(self):
+        self.write_image("a.png", b"a")
+        self.write_image("broken.png", b"broken")
+        images, _, logs = self.build()
+        self.assertEqual(list(images.images), ["/images/a.png"])
+        self.assertEqual((images.encoded, images.failed), (1, 1))
+        self.assertTrue(any("WARNING" in line and "broken.png" in line for line in logs))
+        node = markdown_to_html_node("![Broken](/images/broken.png)", images=images)
+        self.assertEqual(node.to_html(), '<div><p><image src="/images/broken.png" alt="Broken"></image></p></div>')
+        # The image is tried again on the next build
+        again, calls, _ = self.build()
+        self.assertEqual((calls, again.failed), (1, 1))
+
+    @unittest.skipIf(Image is not None, "Pillow is installed")
+    def test_skipped_without_pillow(self):
+        with self.assertLogs(level="WARNING"):
+            self.assertIsNone(build_image_variants(self.static, self.cache))
+
+    @unittest.skipUnless(Image is not None, "Pillow is not installed")
+    def test_variants_are_encoded_once(self):
+        Image.effect_noise((1000, 500), 64).convert("RGB").save(os.path.join(self.static, "images", "photo.png"))
+        Image.new("RGBA", (600, 300), (0, 0, 0, 0)).save(os.path.join(self.static, "images", "icon.png"))
+        with self.assertLogs(level="INFO"):
+            images = build_image_variants(self.static, self.cache, jobs=2)
+        self.assertEqual(images.encoded, 2)
+        photo = images.images["/images/photo.png"]
+        self.assertEqual((photo["width"], photo["height"], photo["ext"], photo["variants"]), (1000, 500, ".jpg", [480, 960]))
+        self.assertEqual(images.images["/images/icon.png"]["ext"], ".png")
+
+        images.copy_variants(self.dest)
+        with Image.open(os.path.join(self.dest, "images", "photo-480w.jpg")) as variant:
+            self.assertEqual(variant.size, (480, 240))
+
+        with self.assertLogs(level="INFO"):
+            again = build_image_variants(self.static, self.cache)
+        self.assertEqual((again.encoded, again.reused), (0, 2))
+        self.assertEqual(again.images, images.images)
+
+if __name__ == "__main__":
+    unittest.main()
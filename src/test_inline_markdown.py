@@ -1,4 +1,6 @@
 import unittest
+import random
+import tracemalloc
 from inline_markdown import (
     split_nodes_delimiter,
     split_nodes_image,
@@ -6,6 +8,7 @@ from inline_markdown import (
     text_to_textnodes,
     extract_markdown_links,
     extract_markdown_images,
+    INLINE_DELIMITERS,
 )
 
 from textnode import TextNode, TextType
@@ -125,6 +128,27 @@ class TestInlineMarkdown(unittest.TestCase):
             new_nodes
         )
 
+    def test_split_links_repeated_and_trailing_text(self):
+        node = TextNode("[a](/x)[a](/x) tail", TextType.TEXT)
+        self.assertEqual(
+            split_nodes_link([node]),
+            [
+                TextNode("a", TextType.LINK, "/x"),
+                TextNode("a", TextType.LINK, "/x"),
+                TextNode(" tail", TextType.TEXT),
+            ],
+        )
+
+    def test_split_links_ignores_images(self):
+        node = TextNode("![img](/i.png) and [link](/l)", TextType.TEXT)
+        self.assertEqual(
+            split_nodes_link([node]),
+            [
+                TextNode("![img](/i.png) and ", TextType.TEXT),
+                TextNode("link", TextType.LINK, "/l"),
+            ],
+        )
+
     def test_text_to_textnodes(self):
         text = ("This is **text** with an _italic_ word and a `code block` and an ![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)")
         new_nodes = text_to_textnodes(text)
@@ -143,5 +167,77 @@ class TestInlineMarkdown(unittest.TestCase):
         ], new_nodes
         )
 
+
+class TestSinglePassMatchesSplitPasses(unittest.TestCase):
+    def split_passes(self, text):
+        # The pipeline text_to_textnodes replaced: one full pass per syntax
+        nodes = [TextNode(text, TextType.TEXT)]
+        nodes = split_nodes_image(nodes)
+        nodes = split_nodes_link(nodes)
+        for delimiter, text_type in INLINE_DELIMITERS:
+            nodes = split_nodes_delimiter(nodes, delimiter, text_type)
+        return nodes
+
+    def outcome(self, func, text):
+        try:
+            return func(text)
+        except Exception as e:
+            return str(e)
+
+    def assertSameNodes(self, text):
+        self.assertEqual(
+            self.outcome(text_to_textnodes, text),
+            self.outcome(self.split_passes, text),
+            msg=repr(text),
+        )
+
+    def test_edge_cases(self):
+        for text in [
+            "",
+            "plain text",
+            "`code`",
+            "**bold**_italic_",
+            "![img](a.png)[link](b)",
+            "!![img](a.png)",
+            "[link](/a) and ![img](/b) and [link2](/c)",
+            "**bold with `code` inside**",
+            "`code with **stars** and _under_`",
+            "[link with _under_](/x_y) and _it_",
+            "unmatched `tick",
+            "unmatched ** bold",
+            "![broken](image [link](/ok)",
+        ]:
+            self.assertSameNodes(text)
+
+    def test_random_inline_markdown(self):
+        pieces = ["!", "[", "]", "(", ")", "`", "**", "*", "_", "a", " ", "[a](b)", "![c](d)"]
+        rng = random.Random(42)
+        for _ in range(2000):
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+            self.assertSameNodes(text)
+
+    def test_random_long_runs(self):
+        # Long runs take the span path rather than str.split
+        pieces = ["`", "**", "_", "[a](b)", "![c](d)", "x" * 70, "y " * 150]
+        rng = random.Random(7)
+        for _ in range(500):
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 10)))
+            self.assertSameNodes(text)
+
+    def peak_allocation(self, func, text):
+        tracemalloc.start()
+        nodes = func(text)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak, nodes
+
+    def test_long_runs_are_not_copied(self):
+        text = ("lorem ipsum dolor sit amet " * 400 + "**bold** ") * 10
+        peak, nodes = self.peak_allocation(text_to_textnodes, text)
+        split_peak, split_nodes = self.peak_allocation(self.split_passes, text)
+        self.assertEqual(nodes, split_nodes)
+        self.assertLess(peak, len(text) // 10)
+        self.assertLess(peak * 10, split_peak)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
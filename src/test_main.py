@@ -2,7 +2,9 @@ import unittest
 import os
 import shutil
 import sys
-from main import main
+import tempfile
+from main import main, sync_directory
+from manifest import BuildManifest
 
 class TestMainWithBasepath(unittest.TestCase):
     def setUp(self):
@@ -36,5 +38,67 @@ class TestMainWithBasepath(unittest.TestCase):
         self.assertIn('href="/style.css"', content)
         self.assertIn("<title>Index Title</title>", content)
 
+class TestSyncDirectory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.src = os.path.join(self.tmp, "static")
+        self.dst = os.path.join(self.tmp, "docs")
+        self.manifest = BuildManifest(os.path.join(self.tmp, "manifest.json"))
+        os.makedirs(os.path.join(self.src, "images"))
+        self.write("index.css", "body {}")
+        self.write(os.path.join("images", "a.png"), "png bytes")
+        os.makedirs(self.dst)
+        with open(os.path.join(self.dst, "index.html"), "w") as f:
+            f.write("<html></html>")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write(self, relative_path, text):
+        with open(os.path.join(self.src, relative_path), "w") as f:
+            f.write(text)
+
+    def sync(self, **kwargs):
+        with self.assertLogs(level="INFO") as logs:
+            sync_directory(self.src, self.dst, self.manifest, **kwargs)
+        return [line for line in logs.output if "Synced file" in line]
+
+    def test_initial_sync_copies_everything(self):
+        self.assertEqual(len(self.sync()), 2)
+        with open(os.path.join(self.dst, "images", "a.png")) as f:
+            self.assertEqual(f.read(), "png bytes")
+
+    def test_unchanged_files_are_not_copied(self):
+        self.sync()
+        self.assertEqual(self.sync(), [])
+
+    def test_changed_file_is_copied(self):
+        self.sync()
+        self.write("index.css", "body { color: red; }")
+        synced = self.sync()
+        self.assertEqual(len(synced), 1)
+        self.assertIn("index.css", synced[0])
+
+    def test_checksum_skips_touched_file(self):
+        self.sync()
+        src_path = os.path.join(self.src, "index.css")
+        os.utime(src_path, ns=(0, 0))
+        self.assertEqual(self.sync(checksum=True), [])
+        self.assertEqual(len(self.sync()), 0)
+
+    def test_deleted_asset_is_removed_but_pages_are_kept(self):
+        self.sync()
+        shutil.rmtree(os.path.join(self.src, "images"))
+        self.sync()
+        self.assertFalse(os.path.exists(os.path.join(self.dst, "images")))
+        self.assertTrue(os.path.exists(os.path.join(self.dst, "index.html")))
+        self.assertEqual(list(self.manifest.assets), ["index.css"])
+
+    def test_link_shares_bytes(self):
+        self.sync(link=True)
+        src_stat = os.stat(os.path.join(self.src, "index.css"))
+        dst_stat = os.stat(os.path.join(self.dst, "index.css"))
+        self.assertEqual(src_stat.st_ino, dst_stat.st_ino)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
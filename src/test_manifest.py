@@ -0,0 +1,166 @@
+import unittest
+import os
+import shutil
+import tempfile
+from manifest import GENERATOR_VERSION, BuildManifest, file_digest
+from markdown_utils import generate_pages_recursive
+from markdown_blocks import markdown_to_html_node
+from highlight import Highlighter
+from template import Template
+
+# A page touching every block type, inline markup, escaping and basepath rewriting
+FIXTURE = """# Fixture & <title>
+
+A **bold**, _italic_ and `code` run with a [link](/about) and ![alt "text"](/images/a.png).
+
+> A quote
+> over two lines
+
+- one
+- two
+
+1. first
+2. second
+
+```
+plain code
+
+with a blank line < >
+```
+
+```python
+def f(x):
+    return "x" # done
+```"""
+
+# The fixture's HTML as rendered by RECORDED_VERSION, plain and highlighted
+RECORDED_VERSION = "5"
+RECORDED_HTML = (
+    '<title>Fixture &amp; &lt;title&gt;</title><div><h1>Fixture &amp; &lt;title&gt;</h1>'
+    '<p>A <b>bold</b>, <i>italic</i> and <code>code</code> run with a <a href="/site/about">link</a> and '
+    '<image src="/site/images/a.png" alt="alt &quot;text&quot;"></image>.</p>'
+    '<blockquote>A quote over two lines</blockquote><ul><li>one</li><li>two</li></ul>'
+    '<ol><li>first</li><li>second</li></ol><pre><code>plain code\n\nwith a blank line &lt; &gt;\n</code></pre>'
+    '<pre><code class="language-python">def f(x):\n    return "x" # done\n</code></pre></div>',
+    '<pre><code class="language-python"><span class="k">def</span> f(x):\n    <span class="k">return</span> '
+    '<span class="s">"x"</span> <span class="c"># done</span>\n</code></pre>',
+)
+
+class TestIncrementalBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.content = os.path.join(self.tmp, "content")
+        self.dest = os.path.join(self.tmp, "docs")
+        self.template = os.path.join(self.tmp, "template.html")
+        self.manifest_path = os.path.join(self.tmp, ".cache", "manifest.json")
+        os.makedirs(os.path.join(self.content, "blog", "post"))
+        self.write("index.md", "# Home\n\nWelcome")
+        self.write(os.path.join("blog", "post", "index.md"), "# Post\n\nHello")
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write(self, relative_path, text):
+        with open(os.path.join(self.content, relative_path), "w") as f:
+            f.write(text)
+
+    def build(self, basepath="/"):
+        manifest = BuildManifest.load(self.manifest_path)
+        with self.assertLogs(level="INFO") as logs:
+            generate_pages_recursive(self.content, self.template, self.dest, basepath, manifest)
+        return [line for line in logs.output if "Generated HTML file" in line]
+
+    def test_first_build_renders_everything(self):
+        self.assertEqual(len(self.build()), 2)
+        self.assertTrue(os.path.exists(self.manifest_path))
+
+    def test_unchanged_pages_are_skipped(self):
+        self.build()
+        self.assertEqual(self.build(), [])
+
+    def test_only_changed_page_is_rendered(self):
+        self.build()
+        self.write("index.md", "# Home\n\nWelcome back")
+        generated = self.build()
+        self.assertEqual(len(generated), 1)
+        self.assertIn("index.html", generated[0])
+        with open(os.path.join(self.dest, "index.html")) as f:
+            self.assertIn("Welcome back", f.read())
+
+    def test_template_change_rebuilds_all(self):
+        self.build()
+        with open(self.template, "w") as f:
+            f.write("<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertEqual(len(self.build()), 2)
+
+    def test_basepath_change_rebuilds_all(self):
+        self.build()
+        self.assertEqual(len(self.build("/site/")), 2)
+
+    def test_missing_output_is_regenerated(self):
+        self.build()
+        os.remove(os.path.join(self.dest, "index.html"))
+        self.assertEqual(len(self.build()), 1)
+
+    def test_deleted_source_removes_output(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post", "index.md"))
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertEqual(list(manifest.pages), ["index.md"])
+
+    def test_salt_change_rebuilds_all(self):
+        self.build()
+        manifest = BuildManifest.load(self.manifest_path, salt="highlight")
+        self.assertEqual(manifest.pages, {})
+        with self.assertLogs(level="INFO"):
+            generate_pages_recursive(self.content, self.template, self.dest, "/", manifest)
+        self.assertEqual(len(BuildManifest.load(self.manifest_path, salt="highlight").pages), 2)
+
+    def test_corrupt_manifest_starts_empty(self):
+        os.makedirs(os.path.dirname(self.manifest_path))
+        with open(self.manifest_path, "w") as f:
+            f.write("{not json")
+        with self.assertLogs(level="WARNING"):
+            manifest = BuildManifest.load(self.manifest_path)
+        self.assertEqual(manifest.pages, {})
+
+    def test_assets_are_saved_as_paths(self):
+        manifest = BuildManifest(self.manifest_path, assets={"index.css", "images/a.png"})
+        manifest.save()
+        self.assertEqual(BuildManifest.load(self.manifest_path).assets, {"index.css", "images/a.png"})
+
+    def test_assets_with_sizes_from_older_manifests_load(self):
+        os.makedirs(os.path.dirname(self.manifest_path))
+        with open(self.manifest_path, "w") as f:
+            f.write('{"version": "0", "assets": {"index.css": 12}}')
+        with self.assertLogs(level="INFO"):
+            manifest = BuildManifest.load(self.manifest_path)
+        self.assertEqual(manifest.assets, {"index.css"})
+
+    def test_file_digest(self):
+        self.assertEqual(file_digest(self.template), file_digest(self.template))
+        self.assertNotEqual(file_digest(self.template), file_digest(os.path.join(self.content, "index.md")))
+
+class TestGeneratorVersion(unittest.TestCase):
+    def render(self):
+        html = markdown_to_html_node(FIXTURE).to_html()
+        page = Template("<title>{{ Title }}</title>{{ Content }}", "/site/").render("Fixture & <title>", html)
+        highlighted = markdown_to_html_node(FIXTURE, highlighter=Highlighter()).to_html()
+        return page, highlighted[highlighted.rindex("<pre>"):-len("</div>")]
+
+    def test_rendered_html_matches_recorded_version(self):
+        # Manifests, block caches and render caches trust GENERATOR_VERSION to
+        # tell them when output changed. Re-record RECORDED_HTML only together
+        # with a bump of GENERATOR_VERSION and RECORDED_VERSION.
+        self.assertEqual(self.render(), RECORDED_HTML,
+                         "Rendered HTML changed: bump GENERATOR_VERSION in manifest.py and re-record")
+        self.assertEqual(GENERATOR_VERSION, RECORDED_VERSION,
+                         "GENERATOR_VERSION changed: re-record RECORDED_HTML and RECORDED_VERSION")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
 import unittest
+import io
 from markdown_blocks import *
 
 
@@ -83,6 +84,8 @@ This is the same paragraph on a new line
 
         # More than 6 hashes is paragraph
         self.assertEqual(block_to_block_type("####### Heading level 7"), BlockType.PARAGRAPH)
+        with self.assertRaises(ValueError):
+            heading_to_html_node("####### Heading level 7")
 
     def test_quote_block(self):
         quote = "> This is a quote\n> Still a quote"
@@ -276,6 +279,104 @@ the **same** even with inline stuff
             "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
         )
 
+    def test_code_language_tag(self):
+        md = "```python\nif a < b:\n    pass\n```"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><pre><code class="language-python">if a &lt; b:\n    pass\n</code></pre></div>',
+        )
+
+
+class TestIterBlocks(unittest.TestCase):
+    def test_matches_markdown_to_blocks(self):
+        for md in [
+            "",
+            "one",
+            "\n\n\none\n\n\n\ntwo\nlines\n\n",
+            "  padded  \n\n\tx\n \ny",
+            "- a\n- b\n\n```\ncode\n```\n",
+            "```\nfirst\n\n\nsecond\n```\n\nafter",
+        ]:
+            self.assertEqual(list(iter_blocks(io.StringIO(md))), markdown_to_blocks(md), msg=repr(md))
+            self.assertEqual(list(iter_blocks(md.split("\n"))), markdown_to_blocks(md), msg=repr(md))
+
+    def test_is_lazy(self):
+        def lines():
+            yield "first\n"
+            yield "\n"
+            raise AssertionError("read past the first block")
+        self.assertEqual(next(iter_blocks(lines())), "first")
+
+
+class TestScanBlocks(unittest.TestCase):
+    def test_fenced_code_with_blank_lines_is_one_block(self):
+        md = "# Title\n\n```\ndef f():\n\n    return 1\n```\n\ntext"
+        expected = [(1, "# Title"), (3, "```\ndef f():\n\n    return 1\n```"), (9, "text")]
+        self.assertEqual(list(scan_markdown(md)), expected)
+        self.assertEqual(list(scan_blocks(io.StringIO(md))), expected)
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><h1>Title</h1><pre><code>def f():\n\n    return 1\n</code></pre><p>text</p></div>",
+        )
+
+    def test_line_numbers(self):
+        md = "\n\n  one\n\n\n\ntwo\nthree"
+        self.assertEqual(list(scan_markdown(md)), [(3, "one"), (7, "two\nthree")])
+        self.assertEqual(list(scan_blocks(md.split("\n"), first_line=10)), [(12, "one"), (16, "two\nthree")])
+
+    def test_unclosed_fence_splits_on_blank_lines(self):
+        md = "text\n\n```\ncode\n\nmore"
+        for scan in (scan_markdown, lambda md: scan_blocks(md.split("\n"))):
+            with self.assertLogs(level="WARNING") as logs:
+                blocks = list(scan(md))
+            self.assertEqual(blocks, [(1, "text"), (3, "```\ncode"), (6, "more")])
+            self.assertIn("line 3", logs.output[0])
+
+    def test_conversion_errors_name_the_line(self):
+        located = [(1, "fine"), (7, "a **broken")]
+        with self.assertRaises(MarkdownError) as context:
+            list(located_blocks_to_html_nodes(located, source="page.md"))
+        self.assertEqual(context.exception.line, 7)
+        self.assertTrue(str(context.exception).startswith("page.md, line 7: "))
+
+
+class TestClassifyBlock(unittest.TestCase):
+    def test_returns_lines(self):
+        self.assertEqual(classify_block("- a\n- b"), (BlockType.ULIST, ["- a", "- b"]))
+        self.assertEqual(classify_block("# Title"), (BlockType.HEADING, None))
+        self.assertEqual(classify_block("-a\n- b"), (BlockType.PARAGRAPH, ["-a", "- b"]))
+        self.assertEqual(classify_block(""), (BlockType.PARAGRAPH, [""]))
+
+    def test_long_ordered_list(self):
+        block = "\n".join(f"{i}. item" for i in range(1, 151))
+        self.assertEqual(block_to_block_type(block), BlockType.OLIST)
+        self.assertEqual(block_to_block_type(block.replace("120. ", "121. ")), BlockType.PARAGRAPH)
+
+    def test_converters_accept_lines(self):
+        block = "> quoted\n> text"
+        block_type, lines = classify_block(block)
+        self.assertEqual(quote_to_html_node(block, lines).to_html(), quote_to_html_node(block).to_html())
+        with self.assertRaises(ValueError):
+            quote_to_html_node("> quoted\nnot quoted")
+
+
+class TestTextToChildren(unittest.TestCase):
+    def test_plain_text_is_one_leaf(self):
+        before = dict(INLINE_STATS)
+        for text in ("", "plain text, with (parens), a! mark and 2 < 3"):
+            self.assertEqual(text_to_children(text)[0].value, text_to_textnodes(text)[0].text)
+            self.assertEqual(len(text_to_children(text)), 1)
+        self.assertEqual(INLINE_STATS["plain_text"] - before["plain_text"], 4)
+        self.assertEqual(INLINE_STATS["parsed"], before["parsed"])
+
+    def test_markup_is_parsed(self):
+        before = INLINE_STATS["parsed"]
+        children = text_to_children("plain and **bold** text")
+        self.assertEqual([child.tag for child in children], [None, "b", None])
+        self.assertEqual(INLINE_STATS["parsed"], before + 1)
+        with self.assertRaises(Exception):
+            text_to_children("a ** b")
+
 
 if __name__ == "__main__":
     unittest.main() 
\ No newline at end of file
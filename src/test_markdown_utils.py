@@ -1,5 +1,9 @@
 import unittest
-from markdown_utils import extract_title
+import os
+import shutil
+import tempfile
+from markdown_blocks import MarkdownError, markdown_to_html_node
+from markdown_utils import extract_title, block_title, generate_page, generate_pages_recursive
 
 class TestExtractTitle(unittest.TestCase):
     def test_basic_h1(self):
@@ -42,5 +46,96 @@ Some other text"""
         markdown = "# Title # Extra"
         self.assertEqual(extract_title(markdown), "Title # Extra")
 
+    def test_block_title(self):
+        self.assertEqual(block_title("text\n  # Title  "), "Title")
+        self.assertIsNone(block_title("## Sub\ntext"))
+
+class TestStreamingGeneratePage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.template = os.path.join(self.tmp, "template.html")
+        self.source = os.path.join(self.tmp, "page.md")
+        self.dest = os.path.join(self.tmp, "out", "page.html")
+        with open(self.template, "w") as f:
+            f.write('<title>{{ Title }}</title><link href="/index.css">{{ Content }}')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def render(self, markdown):
+        with open(self.source, "w") as f:
+            f.write(markdown)
+        with self.assertLogs(level="INFO"):
+            generate_page(self.source, self.template, self.dest, "/site/")
+        with open(self.dest) as f:
+            return f.read()
+
+    def test_output_matches_whole_file_conversion(self):
+        body = "\n\n".join(f"Paragraph {i} with a [link](/p/{i})\n\n- item {i}" for i in range(200))
+        markdown = f"Intro before the title\n\n# The Title\n\n{body}\n"
+        content = markdown_to_html_node(markdown).to_html().replace('href="/', 'href="/site/')
+        self.assertEqual(
+            self.render(markdown),
+            f'<title>The Title</title><link href="/site/index.css">{content}',
+        )
+
+    def test_missing_title_leaves_no_output(self):
+        with open(self.source, "w") as f:
+            f.write("No title\n\n## Only a subtitle")
+        with self.assertRaises(ValueError):
+            generate_page(self.source, self.template, self.dest)
+        self.assertEqual(os.listdir(os.path.dirname(self.dest)), [])
+
+    def test_errors_name_the_source_line(self):
+        with open(self.source, "w") as f:
+            f.write("---\ntitle: Page\n---\n# Page\n\nSome **unclosed bold")
+        with self.assertRaises(MarkdownError) as context:
+            with self.assertLogs(level="INFO"):
+                generate_page(self.source, self.template, self.dest)
+        self.assertTrue(str(context.exception).startswith(f"{self.source}, line 6: "))
+
+class TestParallelBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.content = os.path.join(self.tmp, "content")
+        self.template = os.path.join(self.tmp, "template.html")
+        for i in range(6):
+            page_dir = os.path.join(self.content, "blog", f"post{i}")
+            os.makedirs(page_dir)
+            with open(os.path.join(page_dir, "index.md"), "w") as f:
+                f.write(f"# Post {i}\n\nSome **bold** text and a [link](/blog/post{i})\n\n- one\n- two")
+        with open(self.template, "w") as f:
+            f.write('<title>{{ Title }}</title><link href="/index.css">{{ Content }}')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def read_tree(self, root):
+        result = {}
+        for dirpath, dirs, files in os.walk(root):
+            for file in files:
+                path = os.path.join(dirpath, file)
+                with open(path, "rb") as f:
+                    result[os.path.relpath(path, root)] = f.read()
+        return result
+
+    def test_parallel_output_matches_serial(self):
+        serial = os.path.join(self.tmp, "serial")
+        parallel = os.path.join(self.tmp, "parallel")
+        with self.assertLogs(level="INFO"):
+            generate_pages_recursive(self.content, self.template, serial, "/site/")
+            generate_pages_recursive(self.content, self.template, parallel, "/site/", jobs=3)
+        self.assertEqual(len(self.read_tree(serial)), 6)
+        self.assertEqual(self.read_tree(serial), self.read_tree(parallel))
+
+    def test_parallel_failure_reports_markdown_path(self):
+        bad_path = os.path.join(self.content, "blog", "post3", "index.md")
+        with open(bad_path, "w") as f:
+            f.write("No title here")
+        with self.assertLogs(level="ERROR") as logs:
+            with self.assertRaises(ValueError):
+                generate_pages_recursive(self.content, self.template, os.path.join(self.tmp, "out"), jobs=3)
+        self.assertTrue(any(bad_path in line for line in logs.output))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,89 @@
+import unittest
+import io
+import os
+import shutil
+import tempfile
+from block_cache import BlockCache
+from htmlnode import LeafNode, ParentNode
+from markdown_utils import generate_page, generate_pages_recursive
+from profiling import BuildProfiler, TimedWriter, count_leaves
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.content = os.path.join(self.tmp, "content")
+        self.template = os.path.join(self.tmp, "template.html")
+        os.makedirs(self.content)
+        for name, body in (("index", "Welcome **home**"), ("about", "A [link](/x)\n\n- one\n- two")):
+            with open(os.path.join(self.content, f"{name}.md"), "w") as f:
+                f.write(f"# {name}\n\n{body}")
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_generate_page_without_profile_returns_none(self):
+        with self.assertLogs(level="INFO"):
+            result = generate_page(os.path.join(self.content, "index.md"), self.template,
+                                   os.path.join(self.tmp, "index.html"))
+        self.assertIsNone(result)
+
+    def test_generate_page_profile(self):
+        dest = os.path.join(self.tmp, "about.html")
+        with self.assertLogs(level="INFO"):
+            result = generate_page(os.path.join(self.content, "about.md"), self.template, dest, profile=True)
+        self.assertEqual(set(result["stages"]), {"parse", "serialize", "write"})
+        self.assertEqual(result["counters"]["blocks"], 3)
+        self.assertEqual(result["counters"]["plain_text_runs"], 3)
+        self.assertEqual(result["counters"]["parsed_text_runs"], 1)
+        self.assertEqual(result["counters"]["bytes_written"], os.path.getsize(dest))
+        self.assertGreaterEqual(result["seconds"], 0)
+
+    def test_profiler_collects_pages(self):
+        profiler = BuildProfiler()
+        with self.assertLogs(level="INFO"):
+            generate_pages_recursive(self.content, self.template, os.path.join(self.tmp, "docs"), profiler=profiler)
+        self.assertEqual(profiler.counters["pages"], 2)
+        self.assertEqual(len(profiler.slowest_pages(1)), 1)
+        # Summed page time is kept apart from wall-clock build stages
+        self.assertEqual(set(profiler.page_stages), {"parse", "serialize", "write"})
+        self.assertEqual(profiler.stages, {})
+        summary = profiler.summary()
+        self.assertIn("page stage (cpu)", summary)
+        self.assertIn("parse", summary)
+        self.assertIn("slowest 2 page(s):", summary)
+
+    def test_block_cache_hits_keep_inline_node_count(self):
+        block_cache = BlockCache(store_dir=os.path.join(self.tmp, "blocks"))
+        counts = []
+        for cache in (None, block_cache, block_cache, BlockCache(store_dir=os.path.join(self.tmp, "blocks"))):
+            profiler = BuildProfiler()
+            with self.assertLogs(level="INFO"):
+                generate_pages_recursive(self.content, self.template, os.path.join(self.tmp, "docs"),
+                                         profiler=profiler, block_cache=cache)
+            counts.append(profiler.counters["inline_nodes"])
+        self.assertEqual(block_cache.stats()["hits"], 5)
+        self.assertEqual(counts, [counts[0]] * 4)
+
+    def test_write_report(self):
+        profiler = BuildProfiler()
+        profiler.add_stage("copy_static", 0.5)
+        path = os.path.join(self.tmp, "report.json")
+        profiler.write_report(path)
+        with open(path) as f:
+            self.assertIn('"copy_static": 0.5', f.read())
+
+    def test_count_leaves(self):
+        node = ParentNode("div", [ParentNode("p", [LeafNode(None, "a"), LeafNode("b", "c")]), LeafNode(None, "d")])
+        self.assertEqual(count_leaves(node), 3)
+
+    def test_timed_writer(self):
+        fp = io.StringIO()
+        writer = TimedWriter(fp)
+        writer.write("abc")
+        self.assertEqual(fp.getvalue(), "abc")
+        self.assertGreaterEqual(writer.seconds, 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import os
+import time
+import shutil
+import tempfile
+from markdown_utils import generate_pages_recursive
+from render_cache import RenderCache
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tmp, "cache")
+        self.content = os.path.join(self.tmp, "content")
+        self.template = os.path.join(self.tmp, "template.html")
+        os.makedirs(self.content)
+        with open(os.path.join(self.content, "index.md"), "w") as f:
+            f.write("# Home\n\nWelcome [home](/)")
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def build(self, dest, basepath="/"):
+        cache = RenderCache(self.cache_dir)
+        with self.assertLogs(level="INFO"):
+            generate_pages_recursive(self.content, self.template, os.path.join(self.tmp, dest), basepath,
+                                     render_cache=cache)
+        with open(os.path.join(self.tmp, dest, "index.html")) as f:
+            return cache, f.read()
+
+    def test_second_build_reuses_page(self):
+        first_cache, first = self.build("one")
+        self.assertEqual((first_cache.hits, first_cache.misses), (0, 1))
+        second_cache, second = self.build("two")
+        self.assertEqual(second_cache.hits, 1)
+        self.assertEqual(first, second)
+
+    def test_basepath_is_part_of_key(self):
+        self.build("one")
+        cache, html = self.build("two", "/site/")
+        self.assertEqual(cache.hits, 0)
+        self.assertIn('href="/site/"', html)
+
+    def test_key_depends_on_inputs(self):
+        cache = RenderCache(self.cache_dir)
+        key = cache.key("source", "template", "/")
+        self.assertNotEqual(key, cache.key("source2", "template", "/"))
+        self.assertNotEqual(key, cache.key("source", "template2", "/"))
+        self.assertNotEqual(key, RenderCache(self.cache_dir, salt="x").key("source", "template", "/"))
+
+    def test_fetch_miss(self):
+        cache = RenderCache(self.cache_dir)
+        self.assertFalse(cache.fetch("ab" * 32, os.path.join(self.tmp, "out.html")))
+        self.assertFalse(os.path.exists(os.path.join(self.tmp, "out.html.tmp")))
+
+    def test_prune_evicts_least_recently_used(self):
+        page = os.path.join(self.tmp, "page.html")
+        with open(page, "w") as f:
+            f.write("x" * 100)
+        cache = RenderCache(self.cache_dir, max_bytes=250)
+        keys = [cache.key(str(i), "t", "/") for i in range(3)]
+        for i, key in enumerate(keys):
+            cache.store(key, page)
+            os.utime(cache._path(key), (time.time() + i, time.time() + i))
+        with self.assertLogs(level="INFO"):
+            cache.prune()
+        self.assertFalse(os.path.exists(cache._path(keys[0])))
+        self.assertTrue(os.path.exists(cache._path(keys[1])))
+        self.assertTrue(os.path.exists(cache._path(keys[2])))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import unittest
+import os
+import json
+import base64
+import shutil
+import tempfile
+import subprocess
+from feeds import RecordCache
+from manifest import BuildManifest
+from markdown_utils import generate_pages_recursive
+from search_index import (
+    SearchIndexBuilder,
+    decode_postings,
+    encode_varint,
+    term_shard,
+    tokenize,
+)
+
+class TestEncoding(unittest.TestCase):
+    def test_tokenize(self):
+        self.assertEqual(tokenize("Tom's Bombadil_song, 1954!"), ["tom", "s", "bombadil", "song", "1954"])
+        self.assertEqual(tokenize("x" * 41), [])
+        # Decomposed accents are composed first
+        self.assertEqual(tokenize("Re\u0301sume\u0301"), ["résumé"])
+
+    def test_varint(self):
+        out = bytearray()
+        for value in (0, 127, 128, 300):
+            encode_varint(value, out)
+        self.assertEqual(bytes(out), b"\x00\x7f\x80\x01\xac\x02")
+
+    def test_postings_round_trip(self):
+        out = bytearray()
+        for gap, count in ((1, 2), (200, 1), (3, 70000)):
+            encode_varint(gap, out)
+            encode_varint(count, out)
+        self.assertEqual(decode_postings(out), [(0, 2), (200, 1), (203, 70000)])
+
+    def test_term_shard_is_fnv1a(self):
+        self.assertEqual(term_shard("a", 2 ** 32), 0xE40C292C)
+        self.assertLess(term_shard("bombadil", 7), 7)
+
+class TestSearchIndexBuilder(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.dest = os.path.join(self.tmp, "docs")
+        self.content = os.path.join(self.tmp, "content")
+        self.template = os.path.join(self.tmp, "template.html")
+        self.pages = [
+            ("index.md", "# Home\n\nTom and **Goldberry**"),
+            (os.path.join("blog", "tom", "index.md"), "# Tom\n\nTom Tom Bombadil\n\n![tom](/tom.png)"),
+        ]
+        for relative_path, text in self.pages:
+            path = os.path.join(self.content, relative_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(text)
+        with open(self.template, "w") as f:
+            f.write("{{ Content }}")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def build(self, **kwargs):
+        builder = SearchIndexBuilder(self.dest, "/site/")
+        with self.assertLogs(level="INFO") as logs:
+            generate_pages_recursive(self.content, self.template, self.dest, "/site/", search_index=builder, **kwargs)
+            stats = builder.close()
+        self.assertTrue(any("per 1k pages" in line for line in logs.output))
+        return stats, logs.output
+
+    def read_json(self, *path):
+        with open(os.path.join(self.dest, "search-index", *path)) as f:
+            return json.load(f)
+
+    def postings(self, term):
+        meta = self.read_json("meta.json")
+        shard = self.read_json("terms", f"{term_shard(term, meta['shards'])}.json")
+        return decode_postings(base64.b64decode(shard[term]))
+
+    def test_index_files(self):
+        stats, _ = self.build()
+        self.assertEqual(stats["pages"], 2)
+        self.assertEqual(self.postings("tom"), [(0, 1), (1, 3)])
+        self.assertEqual(self.postings("goldberry"), [(0, 1)])
+        self.assertEqual(self.read_json("docs", "0.json"), [["/site/", "Home"], ["/site/blog/tom", "Tom"]])
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "search.js")))
+
+    def test_parallel_build_writes_the_same_index(self):
+        self.build()
+        serial = self.read_json("terms", "0.json")
+        self.build(jobs=2)
+        self.assertEqual(self.read_json("terms", "0.json"), serial)
+
+    def test_skipped_pages_use_cached_records(self):
+        manifest_path = os.path.join(self.tmp, "manifest.json")
+        record_cache = RecordCache(os.path.join(self.tmp, "records"))
+        self.build(manifest=BuildManifest.load(manifest_path), record_cache=record_cache)
+        _, logs = self.build(manifest=BuildManifest.load(manifest_path), record_cache=record_cache)
+        self.assertFalse(any("Generated HTML file" in line for line in logs))
+        self.assertEqual(self.postings("goldberry"), [(0, 1)])
+        self.assertEqual(self.postings("tom"), [(0, 1), (1, 3)])
+
+    @unittest.skipUnless(shutil.which("node"), "node is not installed")
+    def test_loader(self):
+        self.build()
+        script = (
+            "import { readFileSync } from 'fs';"
+            "globalThis.fetch = async (url) => ({ json: async () => JSON.parse(readFileSync(new URL(url))) });"
+            f"const {{ search }} = await import({json.dumps(os.path.join(self.dest, 'search.js'))});"
+            "console.log(JSON.stringify(await search('TOM bombadil')));"
+        )
+        result = subprocess.run(["node", "--input-type=module", "-e", script],
+                                capture_output=True, text=True, check=True)
+        self.assertEqual(json.loads(result.stdout), [{"url": "/site/blog/tom", "title": "Tom", "score": 4}])
+
+    @unittest.skipUnless(shutil.which("node"), "node is not installed")
+    def test_loader_tokenizes_like_python(self):
+        self.build()
+        texts = ["Tom's Bombadil_song, 1954!", "machine_learning", "Re\u0301sume\u0301 ÉTÉ", "नमस्ते ǅx Ⅻ ² 十",
+                 "\U0001d400\U0001d401 " + "\U0001d400" * 40 + " " + "y" * 40, "ΟΔΟΣ 𝔘nicode_2nd"]
+        script = (
+            f"const {{ tokenize }} = await import({json.dumps(os.path.join(self.dest, 'search.js'))});"
+            f"console.log(JSON.stringify({json.dumps(texts)}.map(tokenize)));"
+        )
+        result = subprocess.run(["node", "--input-type=module", "-e", script],
+                                capture_output=True, text=True, check=True)
+        self.assertEqual(json.loads(result.stdout), [tokenize(text) for text in texts])
+
+if __name__ == "__main__":
+    unittest.main()
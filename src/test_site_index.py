@@ -0,0 +1,127 @@
+import unittest
+import os
+import shutil
+import tempfile
+from markdown_utils import generate_pages_recursive
+from site_index import SiteIndex, generate_listings, page_url, slugify
+
+class TestPageUrl(unittest.TestCase):
+    def test_urls(self):
+        self.assertEqual(page_url("index.md"), "/")
+        self.assertEqual(page_url(os.path.join("blog", "tom", "index.md")), "/blog/tom")
+        self.assertEqual(page_url("about.md"), "/about.html")
+
+    def test_slugify(self):
+        self.assertEqual(slugify("Middle Earth!"), "middle-earth")
+
+class TestListingPages(unittest.TestCase):
+    def index(self, count):
+        index = SiteIndex()
+        for i in range(count):
+            index.update(f"blog/post{i}/index.md", str(i), f"Post {i}", {"date": f"2024-01-{i + 1:02d}", "tags": ["a"]})
+        index.update("index.md", "x", "Home", {})
+        return index
+
+    def test_archive_is_paginated_newest_first(self):
+        listings = {path: content for path, _, content in self.index(5).listing_pages(per_page=2)}
+        self.assertEqual(sorted(path for path in listings if path.startswith("blog")),
+                         ["blog/archive/2/index.html", "blog/archive/3/index.html", "blog/archive/index.html"])
+        first = listings["blog/archive/index.html"]
+        self.assertLess(first.index("Post 4"), first.index("Post 3"))
+        self.assertIn('<a href="/blog/archive/2">Older</a>', first)
+        self.assertIn('<a href="/blog/archive">Newer</a> | <a href="/blog/archive/3">Older</a>',
+                      listings["blog/archive/2/index.html"])
+        self.assertIn("tags/a/3/index.html", listings)
+        self.assertIn('<li><a href="/tags/a">a</a> (5)</li>', listings["tags/index.html"])
+
+    def test_markdown_characters_are_kept_as_text(self):
+        index = SiteIndex()
+        index.update("blog/ml/index.md", "x", "Why *this* [works]",
+                     {"date": "2024-01-01", "tags": ["machine_learning"], "summary": "a `b` <c>"})
+        listings = {path: (title, content) for path, title, content in index.listing_pages()}
+        title, content = listings["tags/machine-learning/index.html"]
+        self.assertEqual(title, "Tagged machine_learning")
+        self.assertEqual(content,
+                         '<div><h1>Tagged machine_learning</h1><ul><li>2024-01-01 '
+                         '<a href="/blog/ml">Why *this* [works]</a> - a `b` &lt;c&gt;</li></ul></div>')
+
+    def test_undated_pages_are_not_listed(self):
+        listings = self.index(0).listing_pages()
+        self.assertEqual(listings, [])
+
+class TestGenerateListings(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.content = os.path.join(self.tmp, "content")
+        self.dest = os.path.join(self.tmp, "docs")
+        self.template = os.path.join(self.tmp, "template.html")
+        os.makedirs(os.path.join(self.content, "blog"))
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "blog", "one.md"), "---\ndate: 2024-01-01\ntags: [x]\n---\n# One")
+        self.write(os.path.join(self.content, "blog", "two.md"), "---\ndate: 2024-02-01\n---\n# Two")
+        self.index = SiteIndex(os.path.join(self.tmp, "site_index.json"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def build(self):
+        with self.assertLogs(level="INFO"):
+            generate_pages_recursive(self.content, self.template, self.dest, site_index=self.index)
+            return generate_listings(self.index, self.template, self.dest)
+
+    def test_listings_are_written(self):
+        self.assertEqual(self.build(), 3)
+        archive = self.read(os.path.join(self.dest, "blog", "archive", "index.html"))
+        self.assertTrue(archive.startswith("<title>Blog archive</title>"))
+        self.assertLess(archive.index("/blog/two.html"), archive.index("/blog/one.html"))
+        self.assertIn("One", self.read(os.path.join(self.dest, "tags", "x", "index.html")))
+
+    def test_tag_with_underscore_and_title_with_asterisk(self):
+        self.write(os.path.join(self.content, "blog", "one.md"),
+                   "---\ndate: 2024-01-01\ntags: [machine_learning]\n---\n# One *star")
+        self.build()
+        page = self.read(os.path.join(self.dest, "tags", "machine-learning", "index.html"))
+        self.assertIn("<title>Tagged machine_learning</title>", page)
+        self.assertIn('<a href="/blog/one.html">One *star</a>', page)
+
+    def test_unchanged_pages_are_not_read_again(self):
+        self.build()
+        key = os.path.join("blog", "one.md")
+        self.index.entries[key]["title"] = "Kept"
+        self.build()
+        self.assertEqual(self.index.entries[key]["title"], "Kept")
+        self.write(os.path.join(self.content, "blog", "one.md"), "---\ndate: 2024-01-01\n---\n# First")
+        self.build()
+        self.assertEqual(self.index.entries[key]["title"], "First")
+
+    def test_only_changed_listings_are_rewritten(self):
+        self.build()
+        self.assertEqual(self.build(), 0)
+        self.write(os.path.join(self.content, "blog", "two.md"), "---\ndate: 2024-02-01\n---\n# Second")
+        self.assertEqual(self.build(), 1)
+        self.assertIn("Second", self.read(os.path.join(self.dest, "blog", "archive", "index.html")))
+
+    def test_index_survives_a_reload(self):
+        self.build()
+        reloaded = SiteIndex.load(self.index.path)
+        self.assertEqual(reloaded.entries, self.index.entries)
+        self.assertEqual(reloaded.listings, self.index.listings)
+
+    def test_stale_listings_are_removed(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "one.md"))
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "tags")))
+        self.assertNotIn(os.path.join("blog", "one.md"), self.index.entries)
+
+if __name__ == "__main__":
+    unittest.main()
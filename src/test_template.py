@@ -0,0 +1,79 @@
+import unittest
+import io
+import os
+import tempfile
+from template import Template, rewrite_basepath, rewrite_basepath_chunks
+
+TEMPLATE = '<title>{{ Title }}</title><link href="/index.css"><img src="/logo.png"><article>{{ Content }}</article>'
+
+class TestTemplate(unittest.TestCase):
+    def legacy_render(self, text, title, content, basepath):
+        # The four str.replace passes generate_page used to run per page
+        final_content = text.replace("{{ Title }}", title)
+        final_content = final_content.replace("{{ Content }}", content)
+        final_content = final_content.replace('href="/', f'href="{basepath}')
+        return final_content.replace('src="/', f'src="{basepath}')
+
+    def test_render_default_basepath(self):
+        template = Template(TEMPLATE)
+        self.assertEqual(
+            template.render("Home", "<p>Hi</p>"),
+            '<title>Home</title><link href="/index.css"><img src="/logo.png"><article><p>Hi</p></article>',
+        )
+
+    def test_static_segments_rewritten_at_compile_time(self):
+        template = Template(TEMPLATE, "/site/")
+        self.assertIn('</title><link href="/site/index.css"><img src="/site/logo.png"><article>', template.segments)
+
+    def test_render_matches_legacy_replace(self):
+        content = '<p><a href="/about">About</a> <img src="/a.png" alt="a"></p>'
+        for basepath in ("/", "/Static-Site-Generator/"):
+            template = Template(TEMPLATE, basepath)
+            self.assertEqual(
+                template.render("Title", content),
+                self.legacy_render(TEMPLATE, "Title", content, basepath),
+            )
+
+    def test_repeated_placeholder(self):
+        template = Template("{{ Title }}|{{ Title }}|{{ Content }}")
+        self.assertEqual(template.render("T", "C"), "T|T|C")
+
+    def test_title_is_escaped(self):
+        template = Template("<title>{{ Title }}</title>{{ Content }}")
+        self.assertEqual(template.render("Tom & <Goldberry>", "<p>"), "<title>Tom &amp; &lt;Goldberry&gt;</title><p>")
+        fp = io.StringIO()
+        template.write(fp, "Tom & <Goldberry>", ["<p>"])
+        self.assertEqual(fp.getvalue(), template.render("Tom & <Goldberry>", "<p>"))
+
+    def test_no_placeholders(self):
+        template = Template('<a href="/x">x</a>', "/b/")
+        self.assertEqual(template.render("T", "C"), '<a href="/b/x">x</a>')
+
+    def test_from_file_missing(self):
+        with self.assertLogs(level="ERROR"):
+            with self.assertRaises(FileNotFoundError):
+                Template.from_file(os.path.join(tempfile.gettempdir(), "missing-template.html"))
+
+    def test_write_matches_render(self):
+        content = '<p><a href="/about">About</a> <img src="/a.png"></p>'
+        chunks = ['<p><a hr', 'ef="', '/about">About</a> <img s', 'rc="/a.png"></p>']
+        for text in (TEMPLATE, "{{ Content }}{{ Title }}{{ Content }}"):
+            template = Template(text, "/site/")
+            fp = io.StringIO()
+            template.write(fp, "Title", iter(chunks))
+            self.assertEqual(fp.getvalue(), template.render("Title", content))
+
+    def test_rewrite_chunks_matches_joined_rewrite(self):
+        html = '<a href="/x">h</a><img src="/y"> href= src="/'
+        for size in range(1, len(html) + 1):
+            chunks = [html[i:i + size] for i in range(0, len(html), size)]
+            self.assertEqual(
+                "".join(rewrite_basepath_chunks(chunks, "/b/")),
+                rewrite_basepath(html, "/b/"),
+            )
+
+    def test_rewrite_basepath(self):
+        self.assertEqual(rewrite_basepath('href="/a" src="/b"', "/c/"), 'href="/c/a" src="/c/b"')
+
+if __name__ == "__main__":
+    unittest.main()
@@ -59,5 +59,32 @@ class TestTextNode(unittest.TestCase):
         self.assertEqual(html_node.value, "")
         self.assertEqual(html_node.props, {"src": "https://www.boot.dev/courses", "alt": "This is a image node"})
 
+    def test_slots(self):
+        node = TextNode("text", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.extra = 1
+
+    def test_span_is_sliced_when_read(self):
+        source = "x" * 100 + "y" * 100
+        node = TextNode.span(source, 100, 200, TextType.BOLD)
+        self.assertIs(node._text, source)
+        self.assertEqual(node.text, "y" * 100)
+        self.assertEqual(node, TextNode("y" * 100, TextType.BOLD))
+        self.assertEqual(text_node_to_html_node(node).to_html(), "<b>" + "y" * 100 + "</b>")
+
+    def test_short_span_is_copied(self):
+        node = TextNode.span("a short text", 2, 7, TextType.TEXT)
+        self.assertEqual(node._text, "short")
+
+    def test_text_can_be_replaced(self):
+        node = TextNode.span("z" * 100, 0, 100, TextType.TEXT)
+        node.text = "new"
+        self.assertEqual(node.text, "new")
+
+    def test_repr(self):
+        node = TextNode("text", TextType.LINK, "/a")
+        self.assertEqual(repr(node), "TextNode(text, link, /a)")
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
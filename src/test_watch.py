@@ -0,0 +1,105 @@
+import unittest
+import os
+import shutil
+import tempfile
+from manifest import BuildManifest
+from block_cache import BlockCache
+from render_cache import RenderCache
+from markdown_utils import generate_pages_recursive
+from watch import PollingWatcher, SiteWatcher, snapshot
+
+class TestSiteWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.content = os.path.join(self.tmp, "content")
+        self.static = os.path.join(self.tmp, "static")
+        self.dest = os.path.join(self.tmp, "docs")
+        self.template = os.path.join(self.tmp, "template.html")
+        os.makedirs(os.path.join(self.content, "blog"))
+        os.makedirs(self.static)
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nHello")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.manifest = BuildManifest(os.path.join(self.tmp, "manifest.json"))
+        with self.assertLogs(level="INFO"):
+            generate_pages_recursive(self.content, self.template, self.dest, "/", self.manifest)
+        self.watcher = SiteWatcher(self.content, self.static, self.template, self.dest, "/", self.manifest)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def handle(self, *paths):
+        with self.assertLogs(level="INFO") as logs:
+            self.watcher.handle(set(paths))
+        return [line for line in logs.output if "Generated HTML file" in line]
+
+    def test_changed_page_only_rerenders_that_page(self):
+        path = os.path.join(self.content, "index.md")
+        self.write(path, "# Home\n\nWelcome back")
+        generated = self.handle(path)
+        self.assertEqual(len(generated), 1)
+        self.assertIn("Welcome back", self.read(os.path.join(self.dest, "index.html")))
+
+    def test_deleted_page_removes_output(self):
+        path = os.path.join(self.content, "blog", "post.md")
+        os.remove(path)
+        self.handle(path)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+        self.assertNotIn(os.path.join("blog", "post.md"), self.manifest.pages)
+
+    def test_template_change_rebuilds_all_pages(self):
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertEqual(len(self.handle(self.template)), 2)
+        self.assertTrue(self.read(os.path.join(self.dest, "index.html")).startswith("<h1>Home</h1>"))
+
+    def test_changed_asset_is_copied(self):
+        path = os.path.join(self.static, "index.css")
+        self.handle(path)
+        self.assertEqual(self.read(os.path.join(self.dest, "index.css")), "body {}")
+        os.remove(path)
+        self.handle(path)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.css")))
+
+    def test_changed_page_uses_block_cache(self):
+        block_cache = BlockCache(16)
+        self.watcher = SiteWatcher(self.content, self.static, self.template, self.dest, "/", self.manifest,
+                                   block_cache=block_cache)
+        path = os.path.join(self.content, "index.md")
+        self.write(path, "# Home\n\nWelcome back")
+        self.handle(path)
+        self.handle(path)
+        self.assertEqual(block_cache.stats()["hits"], 2)
+
+    def test_changed_page_reuses_render_cache(self):
+        render_cache = RenderCache(os.path.join(self.tmp, "render"))
+        self.watcher = SiteWatcher(self.content, self.static, self.template, self.dest, "/", self.manifest,
+                                   render_cache=render_cache)
+        path = os.path.join(self.content, "index.md")
+        self.write(path, "# Home\n\nWelcome back")
+        self.assertEqual(len(self.handle(path)), 1)
+        self.write(path, "# Home\n\nWelcome")
+        self.handle(path)
+        self.write(path, "# Home\n\nWelcome back")
+        self.assertEqual(self.handle(path), [])
+        self.assertIn("Welcome back", self.read(os.path.join(self.dest, "index.html")))
+
+    def test_polling_watcher_reports_changes(self):
+        watcher = PollingWatcher([self.content, self.template], interval=0.01)
+        path = os.path.join(self.content, "new.md")
+        self.write(path, "# New")
+        self.assertEqual(watcher.wait(), {path})
+
+    def test_snapshot_includes_single_files(self):
+        self.assertIn(self.template, snapshot([self.template]))
+
+if __name__ == "__main__":
+    unittest.main()
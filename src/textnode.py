@@ -11,11 +11,48 @@ class TextType(Enum):
     IMAGE = "image"
 
 
+# Shorter spans are sliced right away: their two offsets would take more
+# memory than the copy
+SPAN_MIN_LENGTH = 64
+
 class TextNode:
+    """
+    A run of inline text and its type.
+
+    A node built with span() can just record where its text sits in the
+    source string; the text is sliced out the first time it is read, usually
+    when the node is turned into HTML, and the source is then let go.
+    """
+
+    __slots__ = ("_text", "text_type", "url", "start", "end")
+
     def __init__(self, text, text_type, url=None):
-        self.text = text
+        self._text = text
         self.text_type = text_type
         self.url = url
+        self.start = None
+
+    @classmethod
+    def span(cls, source, start, end, text_type, url=None):
+        """Create a node whose text is source[start:end], copying it only once read."""
+        if end - start < SPAN_MIN_LENGTH:
+            return cls(source[start:end], text_type, url)
+        node = cls(source, text_type, url)
+        node.start = start
+        node.end = end
+        return node
+
+    @property
+    def text(self):
+        if self.start is not None:
+            self._text = self._text[self.start:self.end]
+            self.start = None
+        return self._text
+
+    @text.setter
+    def text(self, text):
+        self._text = text
+        self.start = None
 
     def __eq__(self, Node):
         return self.text == Node.text and self.text_type == Node.text_type and self.url == Node.url
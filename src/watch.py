@@ -0,0 +1,255 @@
+import os
+import time
+import shutil
+import logging
+from markdown_utils import generate_page, generate_pages_recursive, page_template_path
+from frontmatter import scan_front_matter
+from manifest import file_digest, remove_empty_parents
+from template import Template
+
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
+def snapshot(paths):
+    """
+    Record the size and modification time of every file under the given paths.
+
+    Args:
+        paths (list): Files or directories to scan.
+
+    Returns:
+        dict: Maps each file path to a (mtime_ns, size) tuple.
+    """
+    state = {}
+    for path in paths:
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            state[path] = (stat.st_mtime_ns, stat.st_size)
+            continue
+        for root, dirs, files in os.walk(path):
+            for file in files:
+                file_path = os.path.join(root, file)
+                try:
+                    stat = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+                state[file_path] = (stat.st_mtime_ns, stat.st_size)
+    return state
+
+class PollingWatcher:
+    """Detect changed files by rescanning the watched paths at an interval."""
+
+    def __init__(self, paths, interval=0.25):
+        self.paths = paths
+        self.interval = interval
+        self.state = snapshot(paths)
+
+    def wait(self):
+        """
+        Block until at least one file is created, modified or deleted.
+
+        Returns:
+            set: Paths of the changed files.
+        """
+        while True:
+            time.sleep(self.interval)
+            state = snapshot(self.paths)
+            changed = {path for path in state.keys() | self.state.keys()
+                       if state.get(path) != self.state.get(path)}
+            self.state = state
+            if changed:
+                return changed
+
+class InotifyWatcher:
+    """Detect changed files with Linux inotify through the inotify_simple package."""
+
+    def __init__(self, paths, debounce=0.05):
+        self.inotify = inotify_simple.INotify()
+        self.debounce = debounce
+        self.mask = (inotify_simple.flags.CREATE | inotify_simple.flags.CLOSE_WRITE
+                     | inotify_simple.flags.DELETE | inotify_simple.flags.MOVED_FROM
+                     | inotify_simple.flags.MOVED_TO)
+        self.dirs = {}
+        # Watched single files, by directory, e.g. {".": {"template.html"}}
+        self.files = {}
+        for path in paths:
+            if os.path.isdir(path):
+                for root, dirs, files in os.walk(path):
+                    self._add_dir(root)
+            else:
+                directory = os.path.dirname(path) or "."
+                self.files.setdefault(directory, set()).add(os.path.basename(path))
+                self._add_dir(directory)
+
+    def _add_dir(self, directory):
+        if directory not in self.dirs.values():
+            self.dirs[self.inotify.add_watch(directory, self.mask)] = directory
+
+    def wait(self):
+        changed = set()
+        while not changed:
+            for event in self.inotify.read(read_delay=int(self.debounce * 1000)):
+                directory = self.dirs.get(event.wd)
+                if directory is None or not event.name:
+                    continue
+                if directory in self.files and event.name not in self.files[directory]:
+                    continue
+                path = os.path.join(directory, event.name) if directory != "." else event.name
+                if event.mask & inotify_simple.flags.ISDIR:
+                    if os.path.isdir(path):
+                        # Watch new directories and pick up files created in them
+                        for root, dirs, files in os.walk(path):
+                            self._add_dir(root)
+                            changed.update(os.path.join(root, file) for file in files)
+                    continue
+                changed.add(path)
+        return changed
+
+def make_watcher(paths):
+    """
+    Create an inotify watcher when inotify_simple is installed, else a polling one.
+
+    Args:
+        paths (list): Files or directories to watch.
+
+    Returns:
+        InotifyWatcher | PollingWatcher: The watcher.
+    """
+    if inotify_simple is not None:
+        try:
+            return InotifyWatcher(paths)
+        except OSError as e:
+            logging.warning(f"inotify unavailable ({str(e)}), falling back to polling")
+    return PollingWatcher(paths)
+
+class SiteWatcher:
+    """
+    Keep docs/ up to date while content/, static/ and the template are edited.
+
+    A changed Markdown file re-renders only its page, a changed static file is
+    re-copied on its own and a template change re-renders every page. Pages
+    are rendered with the same caches, highlighter and images as the build
+    that started the watch.
+    """
+
+    def __init__(self, content_dir, static_dir, template_path, dest_dir_path,
+                 basepath="/", manifest=None, jobs=1, include_drafts=False, highlighter=None,
+                 images=None, block_cache=None, render_cache=None):
+        self.content_dir = os.path.normpath(content_dir)
+        self.static_dir = os.path.normpath(static_dir)
+        self.template_path = os.path.normpath(template_path)
+        self.dest_dir_path = dest_dir_path
+        self.basepath = basepath
+        self.manifest = manifest
+        self.jobs = jobs
+        self.include_drafts = include_drafts
+        self.highlighter = highlighter
+        self.images = images
+        self.block_cache = block_cache
+        self.render_cache = render_cache
+        self.template = Template.from_file(template_path, basepath)
+
+    def run(self, watcher=None):
+        """Watch for changes and rebuild until interrupted with Ctrl+C."""
+        watcher = watcher or make_watcher([self.content_dir, self.static_dir, self.template_path])
+        logging.info(f"Watching {self.content_dir}, {self.static_dir} and {self.template_path} "
+                     f"with {type(watcher).__name__}")
+        try:
+            while True:
+                changed = watcher.wait()
+                start = time.perf_counter()
+                try:
+                    self.handle(changed)
+                except Exception as e:
+                    # Keep watching; the next save usually fixes the page
+                    logging.error(f"Rebuild failed: {str(e)}")
+                    continue
+                logging.info(f"Rebuilt {len(changed)} change(s) in {(time.perf_counter() - start) * 1000:.1f} ms")
+        except KeyboardInterrupt:
+            logging.info("Stopped watching")
+
+    def handle(self, changed):
+        """
+        Rebuild the outputs affected by a set of changed paths.
+
+        Args:
+            changed (set): Paths of created, modified or deleted files.
+        """
+        changed = {os.path.normpath(path) for path in changed}
+        if self.template_path in changed:
+            logging.info(f"Template {self.template_path} changed, rebuilding all pages")
+            self.template = Template.from_file(self.template_path, self.basepath)
+            generate_pages_recursive(self.content_dir, self.template_path, self.dest_dir_path,
+                                     self.basepath, self.manifest, self.jobs,
+                                     block_cache=self.block_cache, render_cache=self.render_cache,
+                                     include_drafts=self.include_drafts, highlighter=self.highlighter,
+                                     images=self.images)
+            # Only deleted pages still need handling after a full rebuild
+            changed = {path for path in changed
+                       if not (self._under(path, self.content_dir) and os.path.exists(path))}
+
+        for path in sorted(changed):
+            if self._under(path, self.content_dir) and path.endswith(".md"):
+                self._update_page(path)
+            elif self._under(path, self.static_dir):
+                self._update_asset(path)
+
+        if self.manifest is not None:
+            self.manifest.save()
+
+    def _under(self, path, directory):
+        return path.startswith(directory + os.sep)
+
+    def _update_page(self, markdown_path):
+        relative_path = os.path.relpath(markdown_path, self.content_dir)
+        dest_path = os.path.join(self.dest_dir_path, os.path.splitext(relative_path)[0] + ".html")
+        metadata = scan_front_matter(markdown_path) if os.path.exists(markdown_path) else None
+        if metadata is None or (metadata.get("draft") is True and not self.include_drafts):
+            self._remove_output(dest_path)
+            if self.manifest is not None:
+                self.manifest.pages.pop(relative_path, None)
+            return
+        source_hash = template_hash = None
+        images_key = ""
+        if self.manifest is not None or self.render_cache is not None:
+            source_hash = file_digest(markdown_path)
+            template_hash = file_digest(page_template_path(self.template_path, metadata))
+            if self.images is not None:
+                images_key = self.images.file_key(markdown_path)
+        cache_key = None
+        if self.render_cache is not None:
+            cache_key = self.render_cache.key(source_hash, template_hash, self.basepath, images_key)
+        if cache_key is not None and self.render_cache.fetch(cache_key, dest_path):
+            logging.info(f"Copied {dest_path} from render cache")
+        else:
+            generate_page(markdown_path, self.template_path, dest_path, self.basepath, self.template,
+                          block_cache=self.block_cache, highlighter=self.highlighter, images=self.images)
+            if cache_key is not None:
+                self.render_cache.store(cache_key, dest_path)
+        if self.manifest is not None:
+            self.manifest.record(relative_path, source_hash, template_hash, self.basepath, dest_path, images_key)
+
+    def _update_asset(self, src_path):
+        relative_path = os.path.relpath(src_path, self.static_dir)
+        dst_path = os.path.join(self.dest_dir_path, relative_path)
+        if not os.path.exists(src_path):
+            self._remove_output(dst_path)
+            if self.manifest is not None:
+                self.manifest.assets.discard(relative_path)
+            return
+        os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+        if os.path.lexists(dst_path):
+            # Never write through a hardlink made by --link-assets
+            os.remove(dst_path)
+        shutil.copy2(src_path, dst_path)
+        logging.info(f"Copied file: {src_path} to {dst_path}")
+        if self.manifest is not None:
+            self.manifest.assets.add(relative_path)
+
+    def _remove_output(self, path):
+        if os.path.exists(path):
+            logging.info(f"Removing {path}")
+            os.remove(path)
+            remove_empty_parents(os.path.dirname(path), self.dest_dir_path)